@@ -1,5 +1,7 @@
+import click
 from flask import Flask
 import os
+from datetime import datetime
 from config import Config
 from models.models import db
 from flask_jwt_extended import JWTManager
@@ -8,14 +10,59 @@ from routes.auth import auth_bp
 from routes.university import university_bp
 from routes.employer import employer_bp
 from routes.applicant import applicant_bp
+from routes.tasks import tasks_bp
+from routes.events import events_bp
+from utils.token_cache import init_revocation_cache, get_revocation_cache, start_revocation_sync
+from utils.profile_cache import init_profile_cache
+from utils.database import configure_engine, init_database
+from utils.passwords import init_password_hasher
+from utils.throttle import init_auth_throttle
+from utils.blob_store import init_blob_store
+from utils.ledger import init_ledger
+from utils.certificates import init_certificate_cache
+from utils.cert_signing import init_certificate_signer
+from utils.response_cache import init_response_cache
+from utils.recommender import init_recommender, get_recommender
+from utils.resume_text import init_resume_text_cache
+from utils.json_provider import init_json_provider
+from utils.instrumentation import init_instrumentation
+from utils.tasks import init_task_queue
+from utils.events import init_event_bus
+import utils.notifications  # registers the notification tasks
+from commands import register_commands
 
-def create_app():
+def _loaded_by_cli_command():
+    """True while `flask <command>` (anything but `flask run`) is loading the app."""
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and ctx.info_name != 'run'
+
+def create_app(start_background=None):
+    """
+    Build the app without touching the schema (see `flask init-db`). Pre-fork
+    servers that preload the app pass start_background=False and call
+    init_worker() in each worker, since threads don't survive fork().
+    By default they are also left off for CLI commands (init-db, run-tasks,
+    ...), which are one-off processes.
+    """
+    cli = _loaded_by_cli_command()
+    if start_background is None:
+        start_background = not cli
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_json_provider(app)
     
-    CORS(app) # 2. Enable CORS for all routes
+    CORS(app, expose_headers=['X-Next-Cursor', 'Link', 'ETag', 'Content-Disposition', 'Server-Timing']) # 2. Enable CORS for all routes
     
     db.init_app(app)
+    init_profile_cache(app)
+    init_password_hasher(app)
+    init_auth_throttle(app)
+    init_blob_store(app)
+    init_certificate_cache(app)
+    init_certificate_signer(app)
+    init_response_cache(app)
+    init_recommender(app)
+    init_resume_text_cache(app)
     jwt = JWTManager(app)
 
     @jwt.token_in_blocklist_loader
@@ -25,6 +72,14 @@ def create_app():
         if not jti:
             return True
         from models.models import TokenBlocklist
+        cache = get_revocation_cache(app)
+        if cache is not None:
+            cache.sync_if_stale(db, TokenBlocklist)
+            iat = jwt_payload.get('iat')
+            issued_at = datetime.utcfromtimestamp(iat) if iat else None
+            revoked = cache.is_revoked(jti, issued_at)
+            if revoked is not None:
+                return revoked
         return TokenBlocklist.query.filter_by(jti=jti).first() is not None
 
     # Blueprints
@@ -32,19 +87,43 @@ def create_app():
     app.register_blueprint(university_bp, url_prefix='/university')
     app.register_blueprint(employer_bp, url_prefix='/employer')
     app.register_blueprint(applicant_bp, url_prefix='/applicant')
+    app.register_blueprint(tasks_bp, url_prefix='/tasks')
+    app.register_blueprint(events_bp, url_prefix='/events')
+    register_commands(app)
 
     with app.app_context():
-        # ensure the directory for the sqlite file exists
-        uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
-        if uri.startswith('sqlite:///'):
-            db_path = uri.replace('sqlite:///', '')
-            db_dir = os.path.dirname(db_path)
-            if db_dir and not os.path.exists(db_dir):
-                os.makedirs(db_dir, exist_ok=True)
-        db.create_all()
+        configure_engine(app, db)
+        init_instrumentation(app, db)
+
+    # Warm the in-process revocation cache from the blocklist table
+    from models.models import TokenBlocklist
+    init_revocation_cache(app, db, TokenBlocklist, start=start_background, warm=not cli)
+    init_ledger(app, start=start_background)
+    init_task_queue(app, start=start_background)
+    init_event_bus(app, start=start_background)
+    if start_background:
+        get_recommender(app).warm(app)
     
     return app
 
+
+def init_worker(app):
+    """Per-process setup after fork: fresh DB connections and the background threads."""
+    from models.models import TokenBlocklist
+    with app.app_context():
+        # pooled connections inherited from the parent belong to it; drop them without closing
+        db.engine.dispose(close=False)
+    start_revocation_sync(app, db, TokenBlocklist)
+    app.extensions['ledger_batcher'].start()
+    app.extensions['task_queue'].start()
+    app.extensions['event_bus'].start()
+    get_recommender(app).warm(app)
+
+
 if __name__ == '__main__':
+    # Development server only. Production: gunicorn -c gunicorn.conf.py wsgi:app
+    # Debugger and reloader follow FLASK_DEBUG instead of being always on.
     app = create_app()
-    app.run(debug=True)
\ No newline at end of file
+    with app.app_context():
+        init_database(app, db, log=app.logger.info)
+    app.run(host=os.environ.get('HOST', '127.0.0.1'), port=int(os.environ.get('PORT', 5000)))
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Seed a synthetic dataset and replay a mixed workload derived from the Postman
+collection and test.http, in-process and/or against a multi-worker server.
+
+    cd backend
+    python -m benchmark --mode both --requests 5000
+    python -m benchmark --save benchmark/baselines/inprocess.json
+    python -m benchmark --compare benchmark/baselines/inprocess.json
+
+Everything runs against a throwaway database in a temp directory.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(mode, summary):
+    overall = summary['overall']
+    print(f"\n== {mode}: {overall['requests']} requests in {overall['seconds']}s, "
+          f"{overall['rps']} req/s, p50 {overall['p50_ms']}ms p95 {overall['p95_ms']}ms p99 {overall['p99_ms']}ms")
+    print(f"{'endpoint':58} {'n':>6} {'5xx':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>7}")
+    for key, row in summary['endpoints'].items():
+        queries = '-' if row['queries_per_request'] is None else row['queries_per_request']
+        print(f"{key[:58]:58} {row['count']:>6} {row['errors']:>4} {row['p50_ms']:>8} "
+              f"{row['p95_ms']:>8} {row['p99_ms']:>8} {queries:>7}")
+
+
+def compare(results, baseline, threshold):
+    """Print deltas against a saved run; returns the regressions found."""
+    regressions = []
+
+    def pct(new, old):
+        return (new - old) / old * 100 if old else 0.0
+
+    for mode, summary in results['runs'].items():
+        base = baseline.get('runs', {}).get(mode)
+        if not base:
+            continue
+        rps_delta = pct(summary['overall']['rps'], base['overall']['rps'])
+        print(f"\n== {mode} vs baseline ({baseline['meta'].get('git_revision')}): "
+              f"rps {base['overall']['rps']} -> {summary['overall']['rps']} ({rps_delta:+.1f}%)")
+        if rps_delta < -threshold:
+            regressions.append(f"{mode}: throughput {rps_delta:+.1f}%")
+        for key, row in summary['endpoints'].items():
+            old = base['endpoints'].get(key)
+            if not old:
+                continue
+            p50, p95 = pct(row['p50_ms'], old['p50_ms']), pct(row['p95_ms'], old['p95_ms'])
+            flag = ''
+            if p95 > threshold:
+                flag = '  REGRESSION'
+                regressions.append(f"{mode}: {key} p95 {p95:+.1f}%")
+            print(f"{key[:58]:58} p50 {old['p50_ms']:>8} -> {row['p50_ms']:>8} ({p50:+6.1f}%)  "
+                  f"p95 {old['p95_ms']:>8} -> {row['p95_ms']:>8} ({p95:+6.1f}%){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mode', choices=['inprocess', 'http', 'both'], default='inprocess')
+    parser.add_argument('--requests', type=int, default=3000, help='timed requests per mode')
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--applicants', type=int, default=500)
+    parser.add_argument('--employers', type=int, default=50)
+    parser.add_argument('--universities', type=int, default=10)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--applications', type=int, default=5000)
+    parser.add_argument('--verifications', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=4, help='server processes (http mode)')
+    parser.add_argument('--threads', type=int, default=1, help='threads per server process (http mode)')
+    parser.add_argument('--server', choices=['builtin', 'gunicorn'], default='builtin',
+                        help='pre-fork server for http mode; gunicorn uses gunicorn.conf.py')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads (http mode)')
+    parser.add_argument('--include-all', action='store_true',
+                        help='also replay auth, delete and upload requests')
+    parser.add_argument('--list', action='store_true', help='print the workload and exit')
+    parser.add_argument('--save', metavar='PATH', help='write results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='diff against a saved run')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='percent p95/throughput change reported as a regression')
+    args = parser.parse_args(argv)
+    if args.server == 'gunicorn' and importlib.util.find_spec('gunicorn') is None:
+        parser.error("--server gunicorn needs gunicorn installed (pip install gunicorn)")
+
+    from benchmark.workload import default_workload
+    operations = default_workload(include_all=args.include_all)
+    if args.list:
+        for op in operations:
+            print(f"{op.weight:>3}  {op.key:58} {op.role or 'public':10} {op.name}")
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix='tu-bench-')
+    # Never touch a configured database: the run always gets its own
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    from benchmark.runner import configure, run_in_process, run_http, start_server
+    configure(workdir)
+    from app import create_app
+    from benchmark.seed import seed
+    from models.models import db
+    from utils.database import init_database
+
+    app = create_app()
+    with app.app_context():
+        init_database(app, db)
+    sizes = {k: getattr(args, k) for k in ('applicants', 'employers', 'universities', 'jobs',
+                                           'applications', 'verifications')}
+    print(f"Seeding {sizes} into {workdir}")
+    data = seed(app, **sizes)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'dataset': data.counts(),
+            'requests': args.requests,
+            'workers': args.workers,
+            'threads': args.threads,
+            'server': args.server,
+            'concurrency': args.concurrency,
+            'workload': {op.key: op.weight for op in operations},
+        },
+        'runs': {},
+    }
+
+    if args.mode in ('inprocess', 'both'):
+        results['runs']['inprocess'] = run_in_process(app, data, operations, args.requests, args.warmup)
+        print_summary('inprocess', results['runs']['inprocess'])
+
+    if args.mode in ('http', 'both'):
+        port = _free_port()
+        server = start_server(workdir, port, args.workers, args.threads, args.server)
+        try:
+            results['runs']['http'] = run_http('127.0.0.1', port, data, operations, args.requests,
+                                               args.concurrency, args.warmup)
+        finally:
+            server.terminate()
+            server.wait()
+        print_summary(f"http ({args.server}, {args.workers} workers x {args.threads} threads, "
+                      f"{args.concurrency} clients)", results['runs']['http'])
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
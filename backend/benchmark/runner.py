@@ -0,0 +1,182 @@
+import http.client
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# utils.instrumentation reports the request's SQL statement count in Server-Timing
+_QUERY_COUNT_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def configure(workdir):
+    """
+    Point the app at a scratch directory (database, uploads, signing key).
+    Must run before config is imported; the server workers call it too.
+    """
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'bench.db'))
+    os.environ.setdefault('CERT_SIGNING_KEY_PATH', os.path.join(workdir, 'cert_signing_key.pem'))
+    os.environ.setdefault('UPLOAD_FOLDER', os.path.join(workdir, 'uploads'))
+    import config
+    config.Config.SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL']
+    config.Config.UPLOAD_FOLDER = os.environ['UPLOAD_FOLDER']
+    config.Config.CERT_SIGNING_KEY_PATH = os.environ['CERT_SIGNING_KEY_PATH']
+
+
+def query_count(server_timing):
+    """Statements executed by the request, or None when instrumentation is off."""
+    match = _QUERY_COUNT_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # nearest-rank
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Stats:
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds, status, queries):
+        with self._lock:
+            self._samples.setdefault(key, []).append((seconds, status, queries))
+
+    def summary(self, elapsed):
+        endpoints = {}
+        total = 0
+        for key, samples in sorted(self._samples.items()):
+            latencies = sorted(s[0] * 1000 for s in samples)
+            queries = [s[2] for s in samples if s[2] is not None]
+            statuses = {}
+            for _, status, _ in samples:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            endpoints[key] = {
+                'count': len(samples),
+                'errors': sum(1 for s in samples if s[1] >= 500),
+                'statuses': statuses,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+            }
+            total += len(samples)
+        all_latencies = sorted(s[0] * 1000 for samples in self._samples.values() for s in samples)
+        overall = {
+            'requests': total,
+            'seconds': round(elapsed, 3),
+            'rps': round(total / elapsed, 1) if elapsed else None,
+            'p50_ms': round(percentile(all_latencies, 50) or 0, 3),
+            'p95_ms': round(percentile(all_latencies, 95) or 0, 3),
+            'p99_ms': round(percentile(all_latencies, 99) or 0, 3),
+        }
+        return {'overall': overall, 'endpoints': endpoints}
+
+
+def _schedule(operations, count, rng):
+    return rng.choices(operations, weights=[op.weight for op in operations], k=count)
+
+
+def run_in_process(app, data, operations, requests, warmup=200, seed=1):
+    """Replay the workload through the Flask test client on this thread."""
+    rng = random.Random(seed)
+    client = app.test_client()
+
+    def call(op):
+        token, path, body = op.render(data, rng)
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        started = time.perf_counter()
+        response = client.open(path, method=op.method, json=body, headers=headers)
+        seconds = time.perf_counter() - started
+        response.close()
+        return seconds, response.status_code, query_count(', '.join(response.headers.getlist('Server-Timing')))
+
+    for op in _schedule(operations, warmup, rng):
+        call(op)
+    stats = Stats()
+    started = time.perf_counter()
+    for op in _schedule(operations, requests, rng):
+        stats.record(op.key, *call(op))
+    return stats.summary(time.perf_counter() - started)
+
+
+def run_http(host, port, data, operations, requests, concurrency=8, warmup=200, seed=1):
+    """Replay the workload over HTTP from `concurrency` client threads."""
+    rng = random.Random(seed)
+    # Render everything up front so client-side work doesn't skew the timings
+    rendered = [(op, op.render(data, rng)) for op in _schedule(operations, warmup + requests, rng)]
+    warm, timed = rendered[:warmup], rendered[warmup:]
+    stats = Stats()
+
+    def worker(items, record):
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        for op, (token, path, body) in items:
+            headers = {'Content-Type': 'application/json'}
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+            payload = json.dumps(body) if body is not None else None
+            started = time.perf_counter()
+            try:
+                conn.request(op.method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                queries = query_count(response.getheader('Server-Timing'))
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status, queries = 599, None
+            if record:
+                stats.record(op.key, time.perf_counter() - started, status, queries)
+        conn.close()
+
+    def run(items, record):
+        threads = [threading.Thread(target=worker, args=(items[i::concurrency], record))
+                   for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    run(warm, False)
+    started = time.perf_counter()
+    run(timed, True)
+    return stats.summary(time.perf_counter() - started)
+
+
+def start_server(workdir, port, workers, threads=1, server='builtin'):
+    """
+    Launch benchmark.server, or gunicorn with the production config, in a
+    subprocess and wait until it accepts connections.
+    """
+    env = dict(os.environ, BENCH_WORKDIR=workdir)
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if server == 'gunicorn':
+        env['GUNICORN_ACCESS_LOG'] = os.devnull
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+                   '--workers', str(workers), '--threads', str(threads), 'wsgi:app']
+    else:
+        command = [sys.executable, '-m', 'benchmark.server', '--port', str(port),
+                   '--workers', str(workers), '--threads', str(threads)]
+    proc = subprocess.Popen(command, cwd=backend_dir, env=env)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("benchmark server exited during startup")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/university/certificate-keys')
+            conn.getresponse().read()
+            conn.close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("benchmark server did not start within 60s")
@@ -0,0 +1,145 @@
+import random
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert, select
+from models.models import (db, User, Applicant, Employer, University, Job, JobApplication,
+                           VerificationRequest, APPLICATION_STATUSES)
+from utils.helpers import generate_hash
+from utils.passwords import get_password_hasher
+from utils.search import init_job_search
+from utils.counters import rebuild_counters
+
+PASSWORD = 'benchmark-password'
+
+LOCATIONS = ('London', 'Leeds', 'Manchester', 'Remote', 'Bristol', 'Glasgow', 'Cardiff', 'Belfast')
+JOB_TYPES = ('Full-time', 'Part-time', 'Contract')
+TITLE_WORDS = ('Python', 'Backend', 'Data', 'Frontend', 'Senior', 'Junior', 'Cloud', 'Platform',
+               'Mobile', 'Security', 'Developer', 'Engineer', 'Analyst', 'Designer', 'Manager')
+DEGREES = ('BSc Computer Science', 'BEng Software Engineering', 'MSc Data Science', 'BA Design')
+
+
+class SeedData:
+    """Ids and tokens of the seeded dataset, used to fill request templates."""
+
+    def __init__(self):
+        self.tokens = {'applicant': [], 'employer': [], 'university': []}
+        self.jobs_by_employer = {}          # employer token index -> [job ids]
+        self.applications_by_employer = {}  # employer token index -> [application ids]
+        self.requests_by_university = {}    # university token index -> [request ids]
+        self.job_ids = []
+        self.university_ids = []
+        self.request_ids = []
+        self.verified_hashes = []
+
+    def counts(self):
+        return {
+            'applicants': len(self.tokens['applicant']),
+            'employers': len(self.tokens['employer']),
+            'universities': len(self.tokens['university']),
+            'jobs': len(self.job_ids),
+            'applications': sum(len(v) for v in self.applications_by_employer.values()),
+            'verification_requests': len(self.request_ids),
+        }
+
+
+def _insert_users(role, count, pw_hash, now):
+    rows = [{"email": f"bench-{role}-{i}@example.com", "password": pw_hash, "role": role,
+             "created_at": now, "updated_at": now} for i in range(count)]
+    return db.session.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), rows).all()
+
+
+def seed(app, applicants=500, employers=50, universities=10, jobs=2000,
+         applications=5000, verifications=2000, rng=None):
+    """
+    Bulk-insert a synthetic dataset into the app's (empty) database and
+    return a SeedData. All users share PASSWORD, hashed once.
+    """
+    rng = rng or random.Random(0)
+    data = SeedData()
+    now = datetime.utcnow()
+
+    def stamp(i, total):
+        # Spread created_at over the last 90 days so cursor paging has real work to do
+        return now - timedelta(days=90) + timedelta(seconds=int(90 * 86400 * i / max(total, 1)))
+
+    with app.app_context():
+        pw_hash = get_password_hasher(app).hash(PASSWORD)
+
+        profile_ids = {}
+        for role, count, model, name_column in (
+                ('applicant', applicants, Applicant, 'full_name'),
+                ('employer', employers, Employer, 'company_name'),
+                ('university', universities, University, 'uni_name')):
+            user_ids = _insert_users(role, count, pw_hash, now)
+            profile_ids[role] = db.session.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                [{"user_id": uid, name_column: f"{role.title()} {i}", "created_at": now, "updated_at": now}
+                 for i, uid in enumerate(user_ids)]).all()
+            data.tokens[role] = [create_access_token(identity=str(uid), additional_claims={"role": role})
+                                 for uid in user_ids]
+
+        employer_ids = profile_ids['employer']
+        job_rows = []
+        for i in range(jobs):
+            salary_min = rng.randrange(20, 80) * 1000
+            job_rows.append({
+                "employer_id": employer_ids[i % len(employer_ids)],
+                "title": ' '.join(rng.sample(TITLE_WORDS, 3)),
+                "description": ' '.join(rng.choices(TITLE_WORDS, k=40)),
+                "location": rng.choice(LOCATIONS),
+                "salary_min": salary_min,
+                "salary_max": salary_min + rng.randrange(5, 40) * 1000,
+                "job_type": rng.choice(JOB_TYPES),
+                "status": 'OPEN' if rng.random() < 0.85 else 'CLOSED',
+                "created_at": stamp(i, jobs),
+                "updated_at": stamp(i, jobs),
+            })
+        data.job_ids = db.session.scalars(insert(Job).returning(Job.id, sort_by_parameter_order=True),
+                                          job_rows).all()
+        employer_index = {eid: i for i, eid in enumerate(employer_ids)}
+        job_owner = {}
+        for job_id, row in zip(data.job_ids, job_rows):
+            owner = employer_index[row['employer_id']]
+            job_owner[job_id] = owner
+            data.jobs_by_employer.setdefault(owner, []).append(job_id)
+
+        pairs = set()
+        max_pairs = len(data.job_ids) * len(profile_ids['applicant'])
+        while len(pairs) < min(applications, max_pairs):
+            pairs.add((rng.choice(data.job_ids), rng.choice(profile_ids['applicant'])))
+        pairs = sorted(pairs)
+        app_ids = db.session.scalars(
+            insert(JobApplication).returning(JobApplication.id, sort_by_parameter_order=True),
+            [{"job_id": job_id, "applicant_id": applicant_id, "status": rng.choice(APPLICATION_STATUSES),
+              "cover_letter": "I would like to apply.", "created_at": stamp(i, len(pairs)),
+              "updated_at": stamp(i, len(pairs))}
+             for i, (job_id, applicant_id) in enumerate(pairs)]).all()
+        for app_id, (job_id, _) in zip(app_ids, pairs):
+            data.applications_by_employer.setdefault(job_owner[job_id], []).append(app_id)
+
+        data.university_ids = profile_ids['university']
+        uni_names = dict(db.session.execute(select(University.id, University.uni_name)).all())
+        request_rows = []
+        for i in range(verifications):
+            uni_id = rng.choice(data.university_ids)
+            row = {"employer_id": rng.choice(employer_ids), "university_id": uni_id,
+                   "student_name": f"Student {i}", "degree": rng.choice(DEGREES),
+                   "year": rng.randrange(2010, 2026), "status": 'PENDING', "cert_hash": None,
+                   "created_at": stamp(i, verifications), "updated_at": stamp(i, verifications)}
+            if rng.random() < 0.5:
+                row["status"] = 'VERIFIED'
+                row["cert_hash"] = generate_hash(row["student_name"], uni_names[uni_id], row["degree"], row["year"])
+                data.verified_hashes.append(row["cert_hash"])
+            request_rows.append(row)
+        data.request_ids = db.session.scalars(
+            insert(VerificationRequest).returning(VerificationRequest.id, sort_by_parameter_order=True),
+            request_rows).all()
+        uni_index = {uid: i for i, uid in enumerate(data.university_ids)}
+        for req_id, row in zip(data.request_ids, request_rows):
+            data.requests_by_university.setdefault(uni_index[row['university_id']], []).append(req_id)
+
+        db.session.commit()
+        # Rebuild the job search index and dashboard counters for the bulk-inserted rows
+        init_job_search(db)
+        rebuild_counters()
+    return data
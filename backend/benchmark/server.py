@@ -0,0 +1,72 @@
+"""
+Pre-forking multi-worker WSGI server used by `python -m benchmark --mode http`.
+
+The parent builds the app and binds the socket, then forks N workers that
+each get fresh DB connections and background threads (app.init_worker) and
+accept from the shared socket: the same model as gunicorn with preload_app,
+for machines where gunicorn is not installed.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+
+
+def _worker(app, sock, threads):
+    from werkzeug.serving import make_server
+    from app import init_worker
+    init_worker(app)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', sock.getsockname()[1], app, threaded=threads > 1, fd=sock.fileno())
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    from benchmark.runner import configure
+    configure(os.environ['BENCH_WORKDIR'])
+    from app import create_app
+    from models.models import db
+    app = create_app(start_background=False)
+    with app.app_context():
+        db.engine.dispose()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', args.port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+
+    children = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _worker(app, sock, args.threads)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POSTMAN_COLLECTION = os.path.join(BACKEND_DIR, 'postman', 'TU_Backend_Complete.postman_collection.json')
+HTTP_FILE = os.path.join(os.path.dirname(BACKEND_DIR), 'test.http')
+
+# Path segment -> id placeholder for the segment that follows it
+_ID_SEGMENTS = {
+    'job': '{job_id}',
+    'apply-job': '{any_job_id}',
+    'application': '{application_id}',
+    'verify-request': '{request_id}',
+    'certificate': '{any_request_id}',
+    'certificate-verification': '{cert_hash}',
+}
+
+# Not replayed by default: they destroy seeded data, revoke the token in use,
+# need multipart uploads, or are deliberately slow and rate limited (password hashing)
+_SKIPPED = re.compile(r'^(DELETE |POST /auth/|POST /applicant/upload-resume|PUT /applicant/resume)')
+
+# Relative frequency by method: browsing dominates real traffic
+METHOD_WEIGHTS = {'GET': 10, 'POST': 2, 'PUT': 1, 'DELETE': 1}
+
+
+class Operation:
+    def __init__(self, name, method, template, role, body=None, weight=1):
+        self.name = name
+        self.method = method
+        self.template = template
+        self.role = role
+        self.body = body
+        self.weight = weight
+
+    @property
+    def key(self):
+        return f"{self.method} {self.template}"
+
+    def render(self, data, rng):
+        """Fill the template from the seeded data: (token or None, path, json body)."""
+        role = self.role or 'applicant'
+        owner = rng.randrange(len(data.tokens[role]))
+        token = data.tokens[role][owner]
+        values = {}
+        if '{job_id}' in self.template:
+            values['job_id'] = rng.choice(data.jobs_by_employer.get(owner) or data.job_ids) \
+                if role == 'employer' else rng.choice(data.job_ids)
+        if '{any_job_id}' in self.template:
+            values['any_job_id'] = rng.choice(data.job_ids)
+        if '{application_id}' in self.template:
+            values['application_id'] = rng.choice(data.applications_by_employer.get(owner) or [0])
+        if '{request_id}' in self.template:
+            values['request_id'] = rng.choice(data.requests_by_university.get(owner) or [0])
+        if '{any_request_id}' in self.template:
+            values['any_request_id'] = rng.choice(data.request_ids)
+        if '{cert_hash}' in self.template:
+            values['cert_hash'] = rng.choice(data.verified_hashes or ['0' * 64])
+        body = dict(self.body) if self.body else None
+        if body and 'university_id' in body:
+            body['university_id'] = rng.choice(data.university_ids)
+        return (token if self.role else None), self.template.format(**values), body
+
+
+def _template(path):
+    """'/employer/job/1/applications' -> '/employer/job/{job_id}/applications'."""
+    segments = path.strip('/').split('/')
+    for i in range(1, len(segments)):
+        placeholder = _ID_SEGMENTS.get(segments[i - 1])
+        if placeholder:
+            segments[i] = placeholder
+    return '/' + '/'.join(segments)
+
+
+def _role(path):
+    prefix = path.strip('/').split('/')[0]
+    if prefix in ('applicant', 'employer', 'university'):
+        # Checking a certificate by hash is the one unauthenticated endpoint
+        if '/certificate-verification/' in path:
+            return None
+        return prefix
+    return None
+
+
+def _json_body(raw):
+    try:
+        body = json.loads(raw) if raw and raw.strip() else None
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def from_postman(path=POSTMAN_COLLECTION):
+    with open(path) as f:
+        collection = json.load(f)
+    found = []
+
+    def walk(items):
+        for item in items:
+            if 'item' in item:
+                walk(item['item'])
+                continue
+            request = item['request']
+            url = request['url']['raw'] if isinstance(request['url'], dict) else request['url']
+            url_path = re.sub(r'^\{\{baseUrl\}\}|^https?://[^/]+', '', url).split('?')[0]
+            body = request.get('body') or {}
+            found.append((item['name'], request['method'], url_path,
+                          _json_body(body.get('raw')) if body.get('mode') == 'raw' else None))
+
+    walk(collection['item'])
+    return found
+
+
+def from_http_file(path=HTTP_FILE):
+    """Requests from a REST-client .http file ('### name' blocks)."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        blocks = re.split(r'^###\s*', f.read(), flags=re.M)
+    found = []
+    for block in blocks:
+        lines = block.strip().splitlines()
+        if len(lines) < 2:
+            continue
+        match = re.match(r'(GET|POST|PUT|DELETE|PATCH)\s+(\S+)', lines[1])
+        if not match:
+            continue
+        url_path = re.sub(r'^https?://[^/]+', '', match.group(2)).split('?')[0]
+        body = '\n'.join(lines[lines.index('') + 1:]) if '' in lines else ''
+        found.append((lines[0].strip(), match.group(1), url_path, _json_body(body)))
+    return found
+
+
+def default_workload(include_all=False):
+    """
+    Mixed workload from the Postman collection and test.http, one Operation per
+    distinct method + path template, weighted by METHOD_WEIGHTS.
+    """
+    operations = {}
+    for name, method, url_path, body in from_postman() + from_http_file():
+        template = _template(url_path)
+        op = Operation(name, method, template, _role(url_path), body, METHOD_WEIGHTS.get(method, 1))
+        # Same endpoint with a different body (e.g. verify vs. reject) is a separate operation
+        identity = (op.key, json.dumps(body, sort_keys=True))
+        if identity in operations or (not include_all and _SKIPPED.match(op.key)):
+            continue
+        operations[identity] = op
+    return list(operations.values())
@@ -0,0 +1,88 @@
+import time
+import click
+from flask import current_app
+from models.models import db
+from utils.bulk_import import import_users
+from utils.passwords import get_password_hasher
+from utils.ledger import anchor_pending, verify_chain
+from utils.migrations import MIGRATIONS, applied_versions, upgrade
+from utils.database import init_database
+from utils.tasks import get_task_queue
+from utils.counters import rebuild_counters
+from utils.resume_text import queue_missing_extractions
+
+
+def register_commands(app):
+    @app.cli.command('import-users')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']),
+                  help='Defaults to the file extension.')
+    def import_users_command(path, fmt):
+        """Bulk-create users of any role from a CSV or JSONL file."""
+        fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        with open(path, 'rb') as stream:
+            result = import_users(stream, fmt, get_password_hasher(current_app),
+                                  batch_size=current_app.config.get('BULK_IMPORT_BATCH_SIZE', 500))
+        for error in result['errors']:
+            click.echo(f"line {error['line']}: {error['email']}: {error['error']}", err=True)
+        click.echo(f"Created {result['created']} users, {result['failed']} failed")
+
+    @app.cli.command('anchor-ledger')
+    def anchor_ledger_command():
+        """Anchor every pending VERIFIED certificate into ledger blocks now."""
+        blocks = 0
+        while anchor_pending(current_app.config.get('LEDGER_MAX_BATCH', 1024)) is not None:
+            blocks += 1
+        click.echo(f"Anchored {blocks} new block(s)")
+
+    @app.cli.command('verify-ledger')
+    def verify_ledger_command():
+        """Recompute Merkle roots and block links; exits non-zero on tampering."""
+        bad_height = verify_chain()
+        if bad_height is not None:
+            raise click.ClickException(f"Ledger mismatch at block {bad_height}")
+        click.echo("Ledger OK")
+
+    @app.cli.command('run-tasks')
+    @click.option('--limit', type=int, default=None, help='Stop after this many tasks.')
+    @click.option('--watch', is_flag=True, help='Keep running as a task worker (TASK_WORKERS threads).')
+    def run_tasks_command(limit, watch):
+        """Run due background tasks on this process until none are left."""
+        queue = get_task_queue(current_app)
+        if watch:
+            # only the task threads; the web server's other background work stays off
+            queue.start()
+            while True:
+                time.sleep(3600)
+        count = queue.run_pending(limit)
+        click.echo(f"Ran {count} task(s)")
+
+    @app.cli.command('extract-resumes')
+    def extract_resumes_command():
+        """Queue text extraction for stored resumes uploaded before it ran on upload."""
+        click.echo(f"Queued {queue_missing_extractions()} resume(s); run-tasks extracts them")
+
+    @app.cli.command('rebuild-counters')
+    def rebuild_counters_command():
+        """Recompute the dashboard's application and verification counters from the rows."""
+        applications, verifications = rebuild_counters()
+        click.echo(f"Rebuilt {applications} job and {verifications} employer counter row(s)")
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create directories, tables and indexes and apply migrations; run once per deploy."""
+        applied = init_database(current_app, db, log=click.echo)
+        click.echo(f"Database ready ({len(applied)} migration(s) applied)")
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command():
+        """Apply pending schema migrations."""
+        applied = upgrade(db, log=click.echo)
+        click.echo(f"{len(applied)} migration(s) applied")
+
+    @app.cli.command('db-status')
+    def db_status_command():
+        """List schema migrations and whether each has been applied."""
+        done = applied_versions(db)
+        for version, name, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+            click.echo(f"{version:>4}  {'applied' if version in done else 'pending':8} {name}")
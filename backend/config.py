@@ -7,10 +7,135 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 instance_dir = os.path.join(basedir, 'instance')
 os.makedirs(instance_dir, exist_ok=True)
 
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_uri():
+    # use an absolute path so SQLAlchemy doesn't depend on working directory
+    uri = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(instance_dir, 'database.db'))
+    # Heroku-style URLs use the scheme SQLAlchemy dropped in 1.4
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def engine_options(uri):
+    """Pool settings from the environment; the same keys work for SQLite and server DBs."""
+    options = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    # in-memory SQLite uses a singleton pool that rejects sizing arguments
+    if uri not in ('sqlite://', 'sqlite:///:memory:'):
+        options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 5))
+        options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+        options['pool_timeout'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    return options
+
+
 class Config:
     SECRET_KEY = 'your-secret-key' # Change this for production
-    # use an absolute path so SQLAlchemy doesn't depend on working directory
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(instance_dir, 'database.db')
+    SQLALCHEMY_DATABASE_URI = database_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite connection tuning, applied by utils.database on every new connection
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
     JWT_SECRET_KEY = 'jwt-secret-key'
-    UPLOAD_FOLDER = 'uploads/resumes'
\ No newline at end of file
+    # Password hashing runs in a process pool; changing the method/work factor
+    # re-hashes each user's password on their next successful login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+    # Rows hashed and inserted per transaction by bulk user imports
+    BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', 500))
+    # /auth/register and /auth/login attempts allowed per window, checked before hashing
+    AUTH_RATE_LIMIT_PER_IP = int(os.environ.get('AUTH_RATE_LIMIT_PER_IP', 30))
+    AUTH_RATE_LIMIT_PER_EMAIL = int(os.environ.get('AUTH_RATE_LIMIT_PER_EMAIL', 10))
+    AUTH_RATE_WINDOW_SECONDS = int(os.environ.get('AUTH_RATE_WINDOW_SECONDS', 60))
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads/resumes')
+    # Whole-request cap enforced by Flask, and per-resume cap enforced while streaming
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+    RESUME_MAX_BYTES = int(os.environ.get('RESUME_MAX_BYTES', 10 * 1024 * 1024))
+    # Let a fronting nginx/Apache send resume files itself (X-Sendfile)
+    USE_X_SENDFILE = _env_bool('USE_X_SENDFILE', False)
+    # role_required caches each caller's profile row for this many seconds
+    PROFILE_CACHE_TTL = int(os.environ.get('PROFILE_CACHE_TTL', 60))
+    PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', 10000))
+    # Encode JSON responses with orjson when it is installed (pip install orjson)
+    FAST_JSON = _env_bool('FAST_JSON', True)
+    # Cached GET responses: 'memory' (per worker), 'sqlite' (shared by the
+    # workers on one host, file at RESPONSE_CACHE_PATH) or 'none'.
+    # gunicorn.conf.py picks 'sqlite' when it runs more than one worker.
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 10000))
+    # /applicant/recommended-jobs: how often each worker pulls job edits made
+    # elsewhere, and how much of the profile/postings a query looks at
+    RECOMMENDER_REFRESH_SECONDS = int(os.environ.get('RECOMMENDER_REFRESH_SECONDS', 10))
+    RECOMMENDER_PROFILE_TERMS = int(os.environ.get('RECOMMENDER_PROFILE_TERMS', 24))
+    RECOMMENDER_MAX_POSTINGS = int(os.environ.get('RECOMMENDER_MAX_POSTINGS', 2000))
+    RECOMMENDER_PROFILE_APPLICATIONS = int(os.environ.get('RECOMMENDER_PROFILE_APPLICATIONS', 50))
+    # ?rank=relevance on a job's applications: token counts of extracted resume
+    # text (stored once per file in resume_text) are cached per worker
+    RESUME_TERMS_CACHE_TTL = int(os.environ.get('RESUME_TERMS_CACHE_TTL', 3600))
+    RESUME_TERMS_CACHE_SIZE = int(os.environ.get('RESUME_TERMS_CACHE_SIZE', 5000))
+    # Background tasks (notifications, resume cleanup/extraction) live in the
+    # task table; each worker process runs TASK_WORKERS threads against it
+    # (0: only `flask run-tasks` executes them). Failures retry with
+    # exponential backoff, and a RUNNING task is reclaimed after the lease
+    TASK_WORKERS = int(os.environ.get('TASK_WORKERS', 2))
+    TASK_POLL_SECONDS = float(os.environ.get('TASK_POLL_SECONDS', 1.0))
+    TASK_LEASE_SECONDS = int(os.environ.get('TASK_LEASE_SECONDS', 300))
+    TASK_BACKOFF_SECONDS = float(os.environ.get('TASK_BACKOFF_SECONDS', 2.0))
+    TASK_MAX_BACKOFF_SECONDS = int(os.environ.get('TASK_MAX_BACKOFF_SECONDS', 600))
+    TASK_RETENTION_HOURS = int(os.environ.get('TASK_RETENTION_HOURS', 72))
+    # /events/stream (Server-Sent Events). Each open stream holds a server
+    # thread, so streams per process are capped and closed after
+    # SSE_MAX_STREAM_SECONDS (browsers reconnect with Last-Event-ID). Events
+    # stay in stream_event for replay for SSE_RETENTION_HOURS
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 16))
+    SSE_MAX_STREAM_SECONDS = int(os.environ.get('SSE_MAX_STREAM_SECONDS', 300))
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+    SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', 100))
+    SSE_POLL_SECONDS = float(os.environ.get('SSE_POLL_SECONDS', 1.0))
+    SSE_REPLAY_LIMIT = int(os.environ.get('SSE_REPLAY_LIMIT', 500))
+    SSE_RETENTION_HOURS = int(os.environ.get('SSE_RETENTION_HOURS', 24))
+    # Per-request timing: Server-Timing headers, JSON log lines on the
+    # 'slow_requests' logger past these thresholds, and Prometheus /metrics
+    INSTRUMENTATION_ENABLED = _env_bool('INSTRUMENTATION_ENABLED', True)
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 100))
+    METRICS_ENABLED = _env_bool('METRICS_ENABLED', True)
+    # Page size for cursor-paginated listings (?limit= is capped at MAX_PAGE_SIZE)
+    DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 20))
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+    # Upper bound on items in one bulk verification request/approval call
+    BULK_VERIFICATION_MAX = int(os.environ.get('BULK_VERIFICATION_MAX', 10000))
+    # Public certificate lookups are cached; unknown hashes for a shorter time
+    CERT_CACHE_TTL = int(os.environ.get('CERT_CACHE_TTL', 300))
+    CERT_NEGATIVE_CACHE_TTL = int(os.environ.get('CERT_NEGATIVE_CACHE_TTL', 30))
+    CERT_CACHE_SIZE = int(os.environ.get('CERT_CACHE_SIZE', 50000))
+    # Withdrawn verdicts are announced to the other workers on this host through this file
+    # (default: instance/certificates.stamp). Empty: no stamp, keep CERT_CACHE_TTL short
+    CERT_CACHE_STAMP_PATH = os.environ.get('CERT_CACHE_STAMP_PATH')
+    # Signed certificate tokens: EdDSA (public-key, needs 'cryptography') or HS256
+    CERT_SIGNING_ALGORITHM = os.environ.get('CERT_SIGNING_ALGORITHM', 'EdDSA')
+    CERT_SIGNING_KEY_PATH = os.environ.get('CERT_SIGNING_KEY_PATH')  # default: instance/cert_signing_key.pem
+    CERT_TOKEN_ISSUER = os.environ.get('CERT_TOKEN_ISSUER', 'tu-backend')
+    CERT_REVOCATION_LIST_TTL = int(os.environ.get('CERT_REVOCATION_LIST_TTL', 60))
+    # Verified certificate hashes are batched into Merkle ledger blocks this often
+    LEDGER_BATCH_SECONDS = int(os.environ.get('LEDGER_BATCH_SECONDS', 5))
+    LEDGER_MAX_BATCH = int(os.environ.get('LEDGER_MAX_BATCH', 1024))
+    # Revoked JTIs are cached in-process; how often to purge expired entries
+    # and pick up revocations made by other workers (0 disables the thread)
+    JWT_REVOCATION_SYNC_SECONDS = int(os.environ.get('JWT_REVOCATION_SYNC_SECONDS', 30))
+    JWT_REVOCATION_CACHE_SIZE = int(os.environ.get('JWT_REVOCATION_CACHE_SIZE', 100000))
+    # Logouts are announced to the other workers on this host through this file
+    # (default: instance/revocations.stamp). Empty: no stamp, unknown JTIs are checked in the database
+    JWT_REVOCATION_STAMP_PATH = os.environ.get('JWT_REVOCATION_STAMP_PATH')
@@ -0,0 +1,69 @@
+"""
+gunicorn settings: `gunicorn -c gunicorn.conf.py wsgi:app` from backend/.
+Every value can be overridden from the environment or the command line.
+
+The app is imported once in the master (preload_app) and forked, so workers
+start in milliseconds and share its memory. Run `flask --app app init-db`
+before starting or reloading; workers never create or migrate the schema.
+
+Reloading, sent to the master process:
+  HUP   re-read this file and replace workers gracefully. With preload_app
+        the code is not re-imported, so for a code deploy instead:
+  USR2  start a new master with the new code next to the old one, then
+  TERM  the old master once the new workers are serving (QUIT is immediate).
+"""
+import os
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+workers = int(os.environ.get('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then to bound slow leaks; jitter avoids restarting them all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+# Gunicorn's default format with the path instead of the request line: /events/stream
+# carries the access token as ?jwt=, which must not end up in the logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+# Per-worker resources, sized before config.py reads them. Each request thread
+# holds at most one connection, plus one each for the revocation and ledger
+# threads; total connections are workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+os.environ.setdefault('DB_POOL_SIZE', str(threads + 2))
+os.environ.setdefault('DB_MAX_OVERFLOW', '2')
+# An open /events/stream holds one of the threads; leave at least half for other requests.
+# Waiting streams are cheap, so raise GUNICORN_THREADS to serve more of them.
+os.environ.setdefault('SSE_MAX_STREAMS', str(max(1, threads // 2)))
+# A per-worker memory cache would keep serving a response another worker just invalidated
+os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'sqlite' if workers > 1 else 'memory')
+# Split the password hashing processes across workers instead of per worker
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        # The master never serves requests; close the connections it opened while loading
+        from wsgi import app
+        from models.models import db
+        with app.app_context():
+            db.engine.dispose()
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from app import init_worker
+    init_worker(app)
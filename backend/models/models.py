@@ -13,7 +13,7 @@ class User(db.Model):
 
 class Applicant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True, index=True)
     full_name = db.Column(db.String(100))
     resume_path = db.Column(db.String(200), nullable=True)
     phone = db.Column(db.String(20), nullable=True)
@@ -21,9 +21,11 @@ class Applicant(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    user = db.relationship('User')
+
 class Employer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True, index=True)
     company_name = db.Column(db.String(100))
     company_email = db.Column(db.String(120), nullable=True)
     industry = db.Column(db.String(100), nullable=True)
@@ -32,7 +34,7 @@ class Employer(db.Model):
 
 class University(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True, index=True)
     uni_name = db.Column(db.String(100))
     uni_email = db.Column(db.String(120), nullable=True)
     uni_code = db.Column(db.String(50), nullable=True)
@@ -40,8 +42,15 @@ class University(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Job(db.Model):
+    # Composite indexes backing the keyset-paginated /applicant/view-jobs listing
+    __table_args__ = (
+        db.Index('ix_job_status_created_at', 'status', 'created_at', 'id'),
+        db.Index('ix_job_status_location_created_at', 'status', 'location', 'created_at', 'id'),
+        db.Index('ix_job_status_job_type_created_at', 'status', 'job_type', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    employer_id = db.Column(db.Integer, db.ForeignKey('employer.id'), nullable=False)
+    employer_id = db.Column(db.Integer, db.ForeignKey('employer.id'), nullable=False, index=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     location = db.Column(db.String(100), nullable=True)
@@ -50,9 +59,19 @@ class Job(db.Model):
     job_type = db.Column(db.String(50), nullable=True)  # Full-time, Part-time, Contract
     status = db.Column(db.String(20), default='OPEN')  # OPEN, CLOSED, FILLED
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # indexed for the recommender's changed-since sync
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+APPLICATION_STATUSES = ('PENDING', 'REVIEWED', 'ACCEPTED', 'REJECTED')
 
 class JobApplication(db.Model):
+    # One application per applicant and job; the listings page newest-first per job / per applicant
+    __table_args__ = (
+        db.Index('uq_job_application_job_applicant', 'job_id', 'applicant_id', unique=True),
+        db.Index('ix_job_application_job_created_at', 'job_id', 'created_at', 'id'),
+        db.Index('ix_job_application_applicant_created_at', 'applicant_id', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
     applicant_id = db.Column(db.Integer, db.ForeignKey('applicant.id'), nullable=False)
@@ -61,20 +80,131 @@ class JobApplication(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Many-to-one only, so listings can eager-load without changing delete behaviour
+    job = db.relationship('Job')
+    applicant = db.relationship('Applicant')
+
 class VerificationRequest(db.Model):
+    # University listings filter by (university_id, status)
+    __table_args__ = (
+        db.Index('ix_verification_request_university_status', 'university_id', 'status'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    employer_id = db.Column(db.Integer, db.ForeignKey('employer.id'), nullable=False)
+    employer_id = db.Column(db.Integer, db.ForeignKey('employer.id'), nullable=False, index=True)
     university_id = db.Column(db.Integer, db.ForeignKey('university.id'), nullable=False)
     student_name = db.Column(db.String(100))
     degree = db.Column(db.String(100))
     year = db.Column(db.Integer)
     status = db.Column(db.String(20), default='PENDING')
-    cert_hash = db.Column(db.String(64), nullable=True)  # Blockchain hash
+    cert_hash = db.Column(db.String(64), nullable=True, index=True)  # Blockchain hash
     rejection_reason = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+VERIFICATION_STATUSES = ('PENDING', 'VERIFIED', 'REJECTED')
+
+# Running totals behind /employer/dashboard, adjusted in the same transaction
+# as the rows they count (utils.counters); `flask rebuild-counters` recomputes them
+class JobApplicationCounter(db.Model):
+    job_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class VerificationRequestCounter(db.Model):
+    employer_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class LedgerBlock(db.Model):
+    """Append-only block header: one Merkle root over a batch of certificate hashes."""
+    height = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    prev_hash = db.Column(db.String(64), nullable=False)
+    merkle_root = db.Column(db.String(64), nullable=False)
+    block_hash = db.Column(db.String(64), unique=True, nullable=False)
+    leaf_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class LedgerEntry(db.Model):
+    """Position of one VERIFIED certificate's hash inside a ledger block."""
+    __table_args__ = (
+        db.UniqueConstraint('block_height', 'leaf_index'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    block_height = db.Column(db.Integer, db.ForeignKey('ledger_block.height'), nullable=False, index=True)
+    leaf_index = db.Column(db.Integer, nullable=False)
+    verification_request_id = db.Column(db.Integer, db.ForeignKey('verification_request.id'),
+                                        unique=True, nullable=False)
+    cert_hash = db.Column(db.String(64), nullable=False)
+
+
+class CertificateRevocation(db.Model):
+    """A certificate hash withdrawn after a signed certificate token may have been issued for it."""
+    id = db.Column(db.Integer, primary_key=True)
+    cert_hash = db.Column(db.String(64), nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ResumeBlob(db.Model):
+    """A stored resume file, addressed by its SHA-256 and shared by every applicant who uploaded it."""
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ResumeText(db.Model):
+    """Plain text extracted from a stored resume, parsed once per content hash."""
+    sha256 = db.Column(db.String(64), primary_key=True)
+    text = db.Column(db.Text, nullable=False, default='')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+TASK_STATUSES = ('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED')
+
+class Task(db.Model):
+    """A unit of background work (see utils.tasks); workers claim due PENDING rows."""
+    __table_args__ = (
+        db.Index('ix_task_status_run_at', 'status', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    status = db.Column(db.String(20), nullable=False, default='PENDING')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Enqueueing the same key twice returns the first task instead of adding another
+    idempotency_key = db.Column(db.String(200), nullable=True, unique=True)
+    user_id = db.Column(db.Integer, nullable=True, index=True)  # who caused it; may see its status
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StreamEvent(db.Model):
+    """A status change pushed to one user's event stream (see utils.events)."""
+    # Ids double as SSE event ids: AUTOINCREMENT so purging old rows never lets one be reused
+    __table_args__ = (
+        db.Index('ix_stream_event_user_id_id', 'user_id', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    event = db.Column(db.String(50), nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
 class TokenBlocklist(db.Model):
     """Tracks revoked JWT tokens by their JTI (JWT ID)."""
     id = db.Column(db.Integer, primary_key=True)
@@ -1,42 +1,49 @@
-import os
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.models import db, Applicant, Job, JobApplication
+from flask import Blueprint, request, jsonify, current_app, g
+from flask_jwt_extended import jwt_required
+from models.models import db, Applicant, Job, JobApplication, APPLICATION_STATUSES
 from utils.decorators import role_required
-from werkzeug.utils import secure_filename
+from utils.profile_cache import lock_profile
+from utils.pagination import (PaginationError, get_page_size, get_fields, get_offset,
+                              get_status_filter, keyset_filter, encode_cursor,
+                              paginated_response)
+from utils.search import search_open_jobs
+from utils.recommender import get_recommender
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from utils.blob_store import get_blob_store, acquire_blob, release_blob, send_resume, FileTooLarge
+from utils.response_cache import cached_response, invalidate
+from utils.tasks import enqueue
+from utils.counters import count_application
+from utils.serializers import JOB, MY_APPLICATION, APPLICANT_PROFILE
 
 applicant_bp = Blueprint('applicant', __name__)
 
 @applicant_bp.route('/profile', methods=['GET'])
 @jwt_required()
 @role_required('applicant')
+@cached_response(lambda: [f"applicant:{g.profile.id}:profile"])
 def get_profile():
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant profile not found"}), 404
     
-    return jsonify({
-        "id": applicant.id,
-        "full_name": applicant.full_name,
-        "phone": applicant.phone,
-        "resume_path": applicant.resume_path,
-        "email_verified": applicant.email_verified,
-        "created_at": applicant.created_at.isoformat() if applicant.created_at else None,
-        "updated_at": applicant.updated_at.isoformat() if applicant.updated_at else None
-    }), 200
+    try:
+        fields = get_fields(APPLICANT_PROFILE.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(APPLICANT_PROFILE.dump(applicant, fields)), 200
 
 @applicant_bp.route('/profile', methods=['PUT'])
 @jwt_required()
 @role_required('applicant')
 def update_profile():
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant profile not found"}), 404
     
+    applicant = lock_profile(applicant)
     data = request.get_json()
     if 'full_name' in data:
         applicant.full_name = data['full_name']
@@ -44,8 +51,48 @@ def update_profile():
         applicant.phone = data['phone']
     
     db.session.commit()
+    invalidate(f"applicant:{applicant.id}:profile")
     return jsonify({"message": "Profile updated successfully"}), 200
 
+def _replace_resume(applicant, file):
+    """
+    Stream the upload into the content-addressed store and point the applicant
+    at it. Returns the new path; raises FileTooLarge past RESUME_MAX_BYTES.
+    """
+    store = get_blob_store(current_app)
+    staged = store.write_stream(file.stream)
+
+    try:
+        with store.lock():
+            # The current path decides which blob loses a reference; never take it from the cache
+            applicant = lock_profile(applicant)
+            old_path = applicant.resume_path
+            old_hash = store.hash_from_path(old_path)
+            acquire_blob(staged, file.mimetype)
+            if old_hash:
+                release_blob(old_hash)
+            applicant.resume_path = store.path_for(staged.sha256)
+            _queue_resume_removal(old_path, old_hash)
+            enqueue('extract_resume_text', {"sha256": staged.sha256}, key=f"resume-text:{staged.sha256}")
+            db.session.commit()
+            store.place(staged)
+    except Exception:
+        db.session.rollback()
+        store.discard(staged)
+        raise
+
+    invalidate(f"applicant:{applicant.id}:profile")
+    return applicant.resume_path
+
+def _queue_resume_removal(path, sha256):
+    """Unlink the old file in the background once the swap commits (shared blobs survive)."""
+    if path:
+        enqueue('remove_resume_file', {"path": path, "sha256": sha256})
+
+def _resume_too_large():
+    limit = current_app.config.get('RESUME_MAX_BYTES')
+    return jsonify({"error": f"Resume exceeds the {limit} byte limit"}), 413
+
 @applicant_bp.route('/upload-resume', methods=['POST'])
 @jwt_required()
 @role_required('applicant')
@@ -54,24 +101,16 @@ def upload_resume():
         return jsonify({"error": "No file part"}), 400
     
     file = request.files['resume']
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant not found"}), 404
     
     if file:
-        filename = secure_filename(f"user_{user_id}_{file.filename}")
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads/resumes')
-        if not os.path.isabs(upload_folder):
-            upload_folder = os.path.join(current_app.root_path, upload_folder)
-        os.makedirs(upload_folder, exist_ok=True)
-
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
-        
-        applicant.resume_path = file_path
-        db.session.commit()
+        try:
+            file_path = _replace_resume(applicant, file)
+        except FileTooLarge:
+            return _resume_too_large()
         return jsonify({"message": "Resume uploaded successfully", "path": file_path}), 200
     
     return jsonify({"error": "Failed to upload resume"}), 400
@@ -83,117 +122,209 @@ def update_resume():
     if 'resume' not in request.files:
         return jsonify({"error": "No file part"}), 400
     
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant not found"}), 404
     
-    # Delete old resume if it exists
-    if applicant.resume_path and os.path.exists(applicant.resume_path):
-        try:
-            os.remove(applicant.resume_path)
-        except Exception:
-            pass
-    
     file = request.files['resume']
     if file:
-        filename = secure_filename(f"user_{user_id}_{file.filename}")
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads/resumes')
-        if not os.path.isabs(upload_folder):
-            upload_folder = os.path.join(current_app.root_path, upload_folder)
-        os.makedirs(upload_folder, exist_ok=True)
-
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
-        
-        applicant.resume_path = file_path
-        db.session.commit()
+        # The previous resume is released (and unlinked if unshared) after the swap
+        try:
+            file_path = _replace_resume(applicant, file)
+        except FileTooLarge:
+            return _resume_too_large()
         return jsonify({"message": "Resume updated successfully", "path": file_path}), 200
     
     return jsonify({"error": "Failed to update resume"}), 400
 
-@applicant_bp.route('/resume', methods=['DELETE'])
+@applicant_bp.route('/resume', methods=['GET'])
 @jwt_required()
 @role_required('applicant')
-def delete_resume():
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+def download_resume():
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant not found"}), 404
     
-    if not applicant.resume_path:
-        return jsonify({"error": "No resume to delete"}), 400
+    response = send_resume(applicant)
+    if response is None:
+        return jsonify({"error": "No resume uploaded"}), 404
+    return response
+
+@applicant_bp.route('/resume', methods=['DELETE'])
+@jwt_required()
+@role_required('applicant')
+def delete_resume():
+    applicant = g.profile
     
-    # Delete file from system
-    try:
-        if os.path.exists(applicant.resume_path):
-            os.remove(applicant.resume_path)
-    except Exception:
-        pass
+    if not applicant:
+        return jsonify({"error": "Applicant not found"}), 404
     
-    applicant.resume_path = None
-    db.session.commit()
+    store = get_blob_store(current_app)
+    with store.lock():
+        applicant = lock_profile(applicant)
+        if not applicant.resume_path:
+            db.session.rollback()
+            return jsonify({"error": "No resume to delete"}), 400
+        old_path = applicant.resume_path
+        old_hash = store.hash_from_path(old_path)
+        if old_hash:
+            release_blob(old_hash)
+        applicant.resume_path = None
+        _queue_resume_removal(old_path, old_hash)
+        db.session.commit()
+    invalidate(f"applicant:{applicant.id}:profile")
     return jsonify({"message": "Resume deleted successfully"}), 200
 
+# Default projection for job listings (status is implied, all are OPEN)
+JOB_LIST_FIELDS = ('id', 'title', 'description', 'location', 'salary_min',
+                   'salary_max', 'job_type', 'created_at')
+
 @applicant_bp.route('/view-jobs', methods=['GET'])
 @jwt_required()
+@cached_response(lambda: ['jobs'], per_identity=False)
 def get_jobs():
-    jobs = Job.query.filter_by(status='OPEN').all()
+    try:
+        limit = get_page_size()
+        fields = get_fields(JOB.fields, JOB_LIST_FIELDS)
+        salary_min = request.args.get('salary_min', type=float)
+        salary_max = request.args.get('salary_max', type=float)
+
+        query = Job.query.filter_by(status='OPEN')
+        if request.args.get('location'):
+            query = query.filter(Job.location == request.args['location'])
+        if request.args.get('job_type'):
+            query = query.filter(Job.job_type == request.args['job_type'])
+        # Range filters match any job whose advertised band overlaps the request
+        if salary_min is not None:
+            query = query.filter(Job.salary_max >= salary_min)
+        if salary_max is not None:
+            query = query.filter(Job.salary_min <= salary_max)
+        if request.args.get('cursor'):
+            query = keyset_filter(query, Job.created_at, Job.id, request.args['cursor'])
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Select only the requested columns (plus cursor keys) into plain rows
+    jobs = JOB.project(query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1),
+                       fields, extra=('id', 'created_at'))
+
+    has_more = len(jobs) > limit
+    jobs = jobs[:limit]
+    next_cursor = encode_cursor(jobs[-1].created_at, jobs[-1].id) if has_more else None
+    return paginated_response(jsonify(JOB.dump_many(jobs, fields)), next_cursor), 200
+
+@applicant_bp.route('/search-jobs', methods=['GET'])
+@jwt_required()
+@cached_response(lambda: ['jobs'], per_identity=False)
+def search_jobs():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    try:
+        limit = get_page_size()
+        offset = get_offset()
+        fields = get_fields(JOB.fields, JOB_LIST_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Rank ids in the index first, then load only that page of jobs
+    hits = search_open_jobs(db, q, limit + 1, offset)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+    jobs = {job.id: job for job in
+            JOB.project(Job.query.filter(Job.id.in_([h[0] for h in hits])), fields, extra=('id',))}
+
+    output = []
+    for job_id, score in hits:
+        job = jobs.get(job_id)
+        if not job:
+            continue
+        row = JOB.dump(job, fields)
+        row['score'] = score
+        output.append(row)
+
+    next_offset = offset + limit if has_more else None
+    return paginated_response(jsonify(output), next_offset, param='offset'), 200
+
+@applicant_bp.route('/recommended-jobs', methods=['GET'])
+@jwt_required()
+@role_required('applicant')
+@cached_response(lambda: ['jobs', f"applicant:{g.profile.id}:applications"])
+def recommended_jobs():
+    applicant = g.profile
+
+    if not applicant:
+        return jsonify({"error": "Applicant not found"}), 404
+
+    try:
+        limit = get_page_size()
+        offset = get_offset()
+        fields = get_fields(JOB.fields, JOB_LIST_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    recommender = get_recommender()
+    recommender.sync(db)
+    applications = (db.session.query(JobApplication.job_id, JobApplication.cover_letter)
+                    .filter_by(applicant_id=applicant.id)
+                    .order_by(JobApplication.created_at.desc(), JobApplication.id.desc())
+                    .all())
+    applied = {a.job_id for a in applications}
+    profile = recommender.profile(applications)
+    if profile:
+        hits = recommender.recommend(profile, offset + limit + 1, exclude=applied)
+    else:
+        # Nothing to go on yet: newest open jobs, unscored
+        query = Job.query.filter_by(status='OPEN')
+        if applied:
+            query = query.filter(Job.id.notin_(applied))
+        hits = [(row.id, None) for row in query.with_entities(Job.id)
+                .order_by(Job.created_at.desc(), Job.id.desc()).limit(offset + limit + 1)]
+    has_more = len(hits) > offset + limit
+    hits = hits[offset:offset + limit]
+    jobs = {job.id: job for job in
+            JOB.project(Job.query.filter(Job.id.in_([h[0] for h in hits])), fields, extra=('id', 'status'))}
+
     output = []
-    for job in jobs:
-        output.append({
-            "id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "location": job.location,
-            "salary_min": job.salary_min,
-            "salary_max": job.salary_max,
-            "job_type": job.job_type,
-            "created_at": job.created_at.isoformat() if job.created_at else None
-        })
-    return jsonify(output), 200
+    for job_id, score in hits:
+        job = jobs.get(job_id)
+        if job is None:
+            # deleted by another worker since the index last synced
+            recommender.discard(job_id)
+            continue
+        if job.status != 'OPEN':
+            continue
+        row = JOB.dump(job, fields)
+        row['score'] = round(score, 6) if score is not None else None
+        output.append(row)
+
+    next_offset = offset + limit if has_more else None
+    return paginated_response(jsonify(output), next_offset, param='offset'), 200
 
 @applicant_bp.route('/job/<int:job_id>', methods=['GET'])
 @jwt_required()
+@cached_response(lambda job_id: [f"job:{job_id}"], per_identity=False)
 def get_job_detail(job_id):
+    try:
+        fields = get_fields(JOB.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     job = Job.query.get_or_404(job_id)
-    
-    return jsonify({
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "location": job.location,
-        "salary_min": job.salary_min,
-        "salary_max": job.salary_max,
-        "job_type": job.job_type,
-        "status": job.status,
-        "created_at": job.created_at.isoformat() if job.created_at else None,
-        "updated_at": job.updated_at.isoformat() if job.updated_at else None
-    }), 200
+    return jsonify(JOB.dump(job, fields)), 200
 
 @applicant_bp.route('/apply-job/<int:job_id>', methods=['POST'])
 @jwt_required()
 @role_required('applicant')
 def apply_for_job(job_id):
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant not found"}), 404
     
     job = Job.query.get_or_404(job_id)
     
-    # Check if already applied
-    existing_application = JobApplication.query.filter_by(
-        job_id=job_id, 
-        applicant_id=applicant.id
-    ).first()
-    
-    if existing_application:
-        return jsonify({"error": "Already applied for this job"}), 400
-    
     data = request.get_json()
     application = JobApplication(
         job_id=job_id,
@@ -201,8 +332,16 @@ def apply_for_job(job_id):
         cover_letter=data.get('cover_letter', '')
     )
     
+    # The unique (job_id, applicant_id) index rejects duplicates, even concurrent ones
     db.session.add(application)
-    db.session.commit()
+    try:
+        db.session.flush()
+        count_application(job_id, new_status=application.status)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Already applied for this job"}), 400
+    invalidate(f"applicant:{applicant.id}:applications")
     
     return jsonify({"message": "Application submitted successfully", "application_id": application.id}), 201
 
@@ -210,34 +349,42 @@ def apply_for_job(job_id):
 @jwt_required()
 @role_required('applicant')
 def get_my_applications():
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant not found"}), 404
     
-    applications = JobApplication.query.filter_by(applicant_id=applicant.id).all()
-    output = []
-    
-    for app in applications:
-        job = Job.query.get(app.job_id)
-        output.append({
-            "id": app.id,
-            "job_id": app.job_id,
-            "job_title": job.title if job else "Unknown",
-            "status": app.status,
-            "cover_letter": app.cover_letter,
-            "created_at": app.created_at.isoformat() if app.created_at else None
-        })
-    
-    return jsonify(output), 200
+    try:
+        limit = get_page_size()
+        fields = get_fields(MY_APPLICATION.fields)
+        status = get_status_filter(APPLICATION_STATUSES)
+        query = JobApplication.query.filter_by(applicant_id=applicant.id)
+        if status:
+            query = query.filter_by(status=status)
+        if request.args.get('cursor'):
+            query = keyset_filter(query, JobApplication.created_at, JobApplication.id,
+                                  request.args['cursor'])
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Job titles come from the same SELECT via a JOIN instead of one query per row
+    applications = MY_APPLICATION.project(
+        query.outerjoin(Job, Job.id == JobApplication.job_id)
+             .order_by(JobApplication.created_at.desc(), JobApplication.id.desc())
+             .limit(limit + 1),
+        fields, extra=('id', 'created_at'))
+    has_more = len(applications) > limit
+    applications = applications[:limit]
+    
+    last = applications[-1] if has_more else None
+    next_cursor = encode_cursor(last.created_at, last.id) if last else None
+    return paginated_response(jsonify(MY_APPLICATION.dump_many(applications, fields)), next_cursor), 200
 
 @applicant_bp.route('/application/<int:app_id>', methods=['DELETE'])
 @jwt_required()
 @role_required('applicant')
 def withdraw_application(app_id):
-    user_id = int(get_jwt_identity())
-    applicant = Applicant.query.filter_by(user_id=user_id).first()
+    applicant = g.profile
     
     if not applicant:
         return jsonify({"error": "Applicant not found"}), 404
@@ -247,7 +394,16 @@ def withdraw_application(app_id):
     if not application:
         return jsonify({"error": "Application not found"}), 404
     
-    db.session.delete(application)
+    # A concurrent withdraw (or status change) leaves nothing matching; only one request decrements
+    removed = db.session.execute(
+        delete(JobApplication)
+        .where(JobApplication.id == application.id, JobApplication.status == application.status)
+        .execution_options(synchronize_session=False)).rowcount
+    if removed != 1:
+        db.session.rollback()
+        return jsonify({"error": "Application changed concurrently, retry"}), 409
+    count_application(application.job_id, old_status=application.status)
     db.session.commit()
+    invalidate(f"applicant:{applicant.id}:applications")
     
     return jsonify({"message": "Application withdrawn successfully"}), 200
\ No newline at end of file
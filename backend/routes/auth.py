@@ -1,23 +1,44 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from sqlalchemy.exc import IntegrityError
 from models.models import db, User, Applicant, Employer, University, TokenBlocklist
+from utils.token_cache import get_revocation_cache
+from utils.passwords import get_password_hasher, HasherBusy
+from utils.throttle import check_auth_throttle
 
 auth_bp = Blueprint('auth', __name__)
 
+def _too_many_requests(retry_after):
+    response = jsonify({"msg": "Too many attempts, try again later"})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+def _server_busy():
+    response = jsonify({"msg": "Server busy, try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.json
+
+    # Throttle before doing any expensive work
+    retry_after = check_auth_throttle(current_app, request.remote_addr)
+    if retry_after:
+        return _too_many_requests(retry_after)
     
     # 1. Check if user already exists to prevent database errors
     if User.query.filter_by(email=data['email']).first():
         return jsonify({"msg": "Email already registered"}), 400
 
     # 2. Hash password and create the base User
-    hashed_pw = generate_password_hash(data['password'])
+    try:
+        hashed_pw = get_password_hasher(current_app).hash(data['password'])
+    except HasherBusy:
+        return _server_busy()
     user = User(email=data['email'], password=hashed_pw, role=data['role'])
     db.session.add(user)
-    db.session.commit() # Commit here to get the user.id
+    db.session.flush() # Assigns user.id without committing yet
     
     # 3. Create the specific sub-profile based on the role
     # Note: We use data.get('name') to match your frontend input ID
@@ -28,7 +49,12 @@ def register():
     elif data['role'] == 'university':
         db.session.add(University(user_id=user.id, uni_name=data.get('name')))
     
-    db.session.commit()
+    # User and profile are written in one transaction, so no orphan users
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"msg": "Email already registered"}), 400
 
     # 4. GENERATE TOKEN so the frontend can log them in immediately
     # JWT spec requires 'sub' (identity) to be a string
@@ -44,8 +70,21 @@ def register():
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.json
+    retry_after = check_auth_throttle(current_app, request.remote_addr, data.get('email'))
+    if retry_after:
+        return _too_many_requests(retry_after)
+
     user = User.query.filter_by(email=data['email']).first()
-    if user and check_password_hash(user.password, data['password']):
+    hasher = get_password_hasher(current_app)
+    try:
+        valid = user is not None and hasher.check(user.password, data['password'])
+        # Upgrade hashes made with old work-factor settings while we have the plaintext
+        if valid and hasher.needs_rehash(user.password):
+            user.password = hasher.hash(data['password'])
+            db.session.commit()
+    except HasherBusy:
+        return _server_busy()
+    if valid:
         token = create_access_token(identity=str(user.id), additional_claims={"role": user.role})
         return jsonify(access_token=token, role=user.role), 200
     return jsonify({"msg": "Bad credentials"}), 401
@@ -61,10 +100,18 @@ def logout():
 
     # Persist revoked token
     try:
-        db.session.add(TokenBlocklist(jti=jti))
+        entry = TokenBlocklist(jti=jti)
+        db.session.add(entry)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return jsonify({"msg": "Failed to revoke token"}), 500
 
+    # Make the revocation visible to this worker immediately
+    cache = get_revocation_cache(current_app)
+    if cache is not None:
+        cache.add(jti, entry.created_at)
+        # ... and make the other workers re-sync before trusting their copies
+        cache.announce()
+
     return jsonify({"msg": "Successfully logged out"}), 200
\ No newline at end of file
@@ -1,7 +1,23 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.models import db, Job, VerificationRequest, Employer, JobApplication, Applicant, User
+from flask import Blueprint, request, jsonify, g, Response, stream_with_context, current_app
+from flask_jwt_extended import jwt_required
+from models.models import (db, Job, VerificationRequest, Employer, JobApplication, Applicant, User,
+                           University, APPLICATION_STATUSES, VERIFICATION_STATUSES)
 from utils.decorators import role_required
+from utils.profile_cache import lock_profile
+from utils.search import index_job, unindex_job
+from utils.recommender import get_recommender, score_documents, term_counts
+from utils.resume_text import resume_term_counts
+from utils.pagination import (PaginationError, get_page_size, get_fields, get_offset, get_status_filter,
+                              keyset_filter, encode_cursor, paginated_response)
+from utils.blob_store import get_blob_store, send_resume, stream_resume_zip
+from utils.response_cache import cached_response, invalidate
+from utils.tasks import enqueue
+from utils.events import publish
+from utils.counters import (count_application, count_verifications, forget_job, application_counts,
+                            employer_application_totals, verification_counts)
+from utils.serializers import JOB, JOB_APPLICATION, VERIFICATION_REQUEST, EMPLOYER_PROFILE
+from sqlalchemy import insert, update
+from sqlalchemy.orm import joinedload
 
 employer_bp = Blueprint('employer', __name__)
 
@@ -11,8 +27,7 @@ employer_bp = Blueprint('employer', __name__)
 @role_required('employer')
 def create_job():
     data = request.get_json()
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     if not employer:
         return jsonify({"error": "Employer profile not found"}), 404
@@ -28,66 +43,51 @@ def create_job():
         status='OPEN'
     )
     db.session.add(new_job)
+    db.session.flush()  # assigns new_job.id for the search index
+    index_job(db, new_job)
     db.session.commit()
+    get_recommender().update(new_job)
+    invalidate('jobs', f"employer:{employer.id}:jobs")
     return jsonify({"message": "Job posted successfully", "job_id": new_job.id}), 201
 
 @employer_bp.route('/jobs', methods=['GET'])
 @jwt_required()
 @role_required('employer')
+@cached_response(lambda: [f"employer:{g.profile.id}:jobs"])
 def get_my_jobs():
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     if not employer:
         return jsonify({"error": "Employer profile not found"}), 404
     
-    jobs = Job.query.filter_by(employer_id=employer.id).all()
-    output = []
-    for job in jobs:
-        output.append({
-            "id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "location": job.location,
-            "salary_min": job.salary_min,
-            "salary_max": job.salary_max,
-            "job_type": job.job_type,
-            "status": job.status,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "updated_at": job.updated_at.isoformat() if job.updated_at else None
-        })
-    return jsonify(output), 200
+    try:
+        fields = get_fields(JOB.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    jobs = JOB.project(Job.query.filter_by(employer_id=employer.id), fields)
+    return jsonify(JOB.dump_many(jobs, fields)), 200
 
 @employer_bp.route('/job/<int:job_id>', methods=['GET'])
 @jwt_required()
 @role_required('employer')
 def get_job(job_id):
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
+    try:
+        fields = get_fields(JOB.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     job = Job.query.filter_by(id=job_id, employer_id=employer.id).first()
     if not job:
         return jsonify({"error": "Job not found"}), 404
     
-    return jsonify({
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "location": job.location,
-        "salary_min": job.salary_min,
-        "salary_max": job.salary_max,
-        "job_type": job.job_type,
-        "status": job.status,
-        "created_at": job.created_at.isoformat() if job.created_at else None,
-        "updated_at": job.updated_at.isoformat() if job.updated_at else None
-    }), 200
+    return jsonify(JOB.dump(job, fields)), 200
 
 @employer_bp.route('/job/<int:job_id>', methods=['PUT'])
 @jwt_required()
 @role_required('employer')
 def update_job(job_id):
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     job = Job.query.filter_by(id=job_id, employer_id=employer.id).first()
     if not job:
@@ -109,61 +109,203 @@ def update_job(job_id):
     if 'status' in data:
         job.status = data['status']
     
+    if {'title', 'description', 'location'} & set(data):
+        index_job(db, job)
     db.session.commit()
+    if {'title', 'description', 'status'} & set(data):
+        get_recommender().update(job)
+    # Listings show open jobs only, so any field change can move a job in or out
+    invalidate('jobs', f"job:{job_id}", f"employer:{employer.id}:jobs")
     return jsonify({"message": "Job updated successfully"}), 200
 
 @employer_bp.route('/job/<int:job_id>', methods=['DELETE'])
 @jwt_required()
 @role_required('employer')
 def delete_job(job_id):
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     job = Job.query.filter_by(id=job_id, employer_id=employer.id).first()
     if not job:
         return jsonify({"error": "Job not found"}), 404
     
+    unindex_job(db, job.id)
+    forget_job(job.id)
     db.session.delete(job)
     db.session.commit()
+    get_recommender().discard(job_id)
+    invalidate('jobs', f"job:{job_id}", f"employer:{employer.id}:jobs")
     return jsonify({"message": "Job deleted successfully"}), 200
 
+DASHBOARD_JOB_FIELDS = ('id', 'title', 'status', 'created_at')
+
+def _breakdown(counts, statuses):
+    breakdown = {status: counts.get(status, 0) for status in statuses}
+    breakdown['total'] = sum(breakdown.values())
+    return breakdown
+
+@employer_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+@role_required('employer')
+def get_dashboard():
+    '''Application counts per job and verification request counts, by status, from the counter tables'''
+    employer = g.profile
+    
+    if not employer:
+        return jsonify({"error": "Employer profile not found"}), 404
+    
+    try:
+        limit = get_page_size()
+        query = Job.query.filter_by(employer_id=employer.id)
+        if request.args.get('cursor'):
+            query = keyset_filter(query, Job.created_at, Job.id, request.args['cursor'])
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    jobs = JOB.project(query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1),
+                       DASHBOARD_JOB_FIELDS)
+    has_more = len(jobs) > limit
+    jobs = jobs[:limit]
+    counts = application_counts([job.id for job in jobs])
+    
+    job_stats = []
+    for job in jobs:
+        stats = JOB.dump(job, DASHBOARD_JOB_FIELDS)
+        stats['applications'] = _breakdown(counts.get(job.id, {}), APPLICATION_STATUSES)
+        job_stats.append(stats)
+    
+    last = jobs[-1] if has_more else None
+    next_cursor = encode_cursor(last.created_at, last.id) if last else None
+    return paginated_response(jsonify({
+        "applications": _breakdown(employer_application_totals(employer.id), APPLICATION_STATUSES),
+        "verification_requests": _breakdown(verification_counts(employer.id), VERIFICATION_STATUSES),
+        "jobs": job_stats,
+    }), next_cursor), 200
+
 # Job Applications Routes
 @employer_bp.route('/job/<int:job_id>/applications', methods=['GET'])
 @jwt_required()
 @role_required('employer')
 def get_job_applications(job_id):
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     job = Job.query.filter_by(id=job_id, employer_id=employer.id).first()
     if not job:
         return jsonify({"error": "Job not found"}), 404
     
-    applications = JobApplication.query.filter_by(job_id=job_id).all()
+    try:
+        limit = get_page_size()
+        fields = get_fields(JOB_APPLICATION.fields)
+        status = get_status_filter(APPLICATION_STATUSES)
+        rank = request.args.get('rank')
+        if rank not in (None, 'relevance'):
+            raise PaginationError("rank must be 'relevance'")
+        offset = get_offset() if rank else 0
+        query = JobApplication.query.filter_by(job_id=job_id)
+        if status:
+            query = query.filter_by(status=status)
+        if request.args.get('cursor'):
+            if rank:
+                raise PaginationError("Ranked results page with offset, not cursor")
+            query = keyset_filter(query, JobApplication.created_at, JobApplication.id,
+                                  request.args['cursor'])
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if rank:
+        return _ranked_applications(job, query, fields, limit, offset)
+
+    # Applicant and User columns are joined into the same SELECT (no per-row lookups)
+    applications = JOB_APPLICATION.project(
+        query.outerjoin(Applicant, Applicant.id == JobApplication.applicant_id)
+             .outerjoin(User, User.id == Applicant.user_id)
+             .order_by(JobApplication.created_at.desc(), JobApplication.id.desc())
+             .limit(limit + 1),
+        fields, extra=('id', 'created_at'))
+    has_more = len(applications) > limit
+    applications = applications[:limit]
+    
+    last = applications[-1] if has_more else None
+    next_cursor = encode_cursor(last.created_at, last.id) if last else None
+    return paginated_response(jsonify(JOB_APPLICATION.dump_many(applications, fields)), next_cursor), 200
+
+def _ranked_applications(job, query, fields, limit, offset):
+    """
+    ?rank=relevance: every matching application is scored against the job in
+    one batch (cover letter plus extracted resume text), then one page of
+    them is loaded in score order.
+    """
+    store = get_blob_store(current_app)
+    rows = (query.outerjoin(Applicant, Applicant.id == JobApplication.applicant_id)
+            .with_entities(JobApplication.id, JobApplication.cover_letter, Applicant.resume_path).all())
+    hashes = {row.id: store.hash_from_path(row.resume_path) for row in rows}
+    resumes = resume_term_counts([h for h in hashes.values() if h])
+
+    documents = []
+    for row in rows:
+        counts = dict(resumes.get(hashes[row.id], {}))
+        documents.append((row.id, term_counts(row.cover_letter, counts=counts)))
+    # newest first among equal scores, matching the unranked listing
+    documents.sort(key=lambda doc: doc[0], reverse=True)
+    scored = score_documents(job.title, job.description, documents)
+
+    page = scored[offset:offset + limit]
+    applications = {a.id: a for a in JOB_APPLICATION.project(
+        JobApplication.query.filter(JobApplication.id.in_([app_id for app_id, _ in page]))
+            .outerjoin(Applicant, Applicant.id == JobApplication.applicant_id)
+            .outerjoin(User, User.id == Applicant.user_id),
+        fields, extra=('id',))}
     output = []
+    for app_id, score in page:
+        row = JOB_APPLICATION.dump(applications[app_id], fields)
+        row['score'] = round(score, 6)
+        output.append(row)
+
+    next_offset = offset + limit if len(scored) > offset + limit else None
+    return paginated_response(jsonify(output), next_offset, param='offset'), 200
+
+@employer_bp.route('/application/<int:app_id>/resume', methods=['GET'])
+@jwt_required()
+@role_required('employer')
+def download_application_resume(app_id):
+    employer = g.profile
     
-    for app in applications:
-        applicant = Applicant.query.get(app.applicant_id)
-        user = User.query.get(applicant.user_id) if applicant else None
-        output.append({
-            "id": app.id,
-            "job_id": app.job_id,
-            "applicant_id": app.applicant_id,
-            "applicant_name": applicant.full_name if applicant else "Unknown",
-            "applicant_email": user.email if user else "Unknown",
-            "status": app.status,
-            "cover_letter": app.cover_letter,
-            "created_at": app.created_at.isoformat() if app.created_at else None
-        })
-    
-    return jsonify(output), 200
+    # Employers may only fetch resumes attached to applications for their own jobs
+    application = JobApplication.query.join(Job).options(joinedload(JobApplication.applicant)).filter(
+        JobApplication.id == app_id,
+        Job.employer_id == employer.id
+    ).first()
+    
+    if not application or not application.applicant:
+        return jsonify({"error": "Application not found"}), 404
+    
+    response = send_resume(application.applicant)
+    if response is None:
+        return jsonify({"error": "Applicant has not uploaded a resume"}), 404
+    return response
+
+@employer_bp.route('/job/<int:job_id>/resumes.zip', methods=['GET'])
+@jwt_required()
+@role_required('employer')
+def download_job_resumes(job_id):
+    employer = g.profile
+    
+    job = Job.query.filter_by(id=job_id, employer_id=employer.id).first()
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    applicants = [app.applicant for app in
+                  JobApplication.query.filter_by(job_id=job_id)
+                  .options(joinedload(JobApplication.applicant)).all()
+                  if app.applicant]
+    response = Response(stream_with_context(stream_resume_zip(applicants)), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="job_{job_id}_resumes.zip"'
+    return response
 
 @employer_bp.route('/application/<int:app_id>/status', methods=['PUT'])
 @jwt_required()
 @role_required('employer')
 def update_application_status(app_id):
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     application = JobApplication.query.join(Job).filter(
         JobApplication.id == app_id,
@@ -176,10 +318,22 @@ def update_application_status(app_id):
     data = request.get_json()
     status = data.get('status')
     
-    if status not in ['PENDING', 'REVIEWED', 'ACCEPTED', 'REJECTED']:
+    if status not in APPLICATION_STATUSES:
         return jsonify({"error": "Invalid status"}), 400
     
-    application.status = status
+    # Only the request that actually moves the row from the status it read adjusts the counters
+    moved = db.session.execute(
+        update(JobApplication)
+        .where(JobApplication.id == application.id, JobApplication.status == application.status)
+        .values(status=status).execution_options(synchronize_session=False)).rowcount
+    if moved != 1:
+        db.session.rollback()
+        return jsonify({"error": "Application status changed concurrently, retry"}), 409
+    count_application(application.job_id, application.status, status)
+    enqueue('notify_application_status', {"application_id": application.id, "status": status})
+    applicant_user_id = db.session.query(Applicant.user_id).filter_by(id=application.applicant_id).scalar()
+    publish(applicant_user_id, 'application_status',
+            {"application_id": application.id, "job_id": application.job_id, "status": status})
     db.session.commit()
     
     return jsonify({"message": f"Application status updated to {status}"}), 200
@@ -190,8 +344,7 @@ def update_application_status(app_id):
 @role_required('employer')
 def request_verification():
     data = request.get_json()
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     if not employer:
         return jsonify({"error": "Employer profile not found"}), 404
@@ -205,66 +358,126 @@ def request_verification():
         status='PENDING'
     )
     db.session.add(new_request)
+    count_verifications([(employer.id, None, 'PENDING')])
     db.session.commit()
+    invalidate(f"university:{new_request.university_id}:requests", f"employer:{employer.id}:requests")
     return jsonify({"message": "Verification request sent to University"}), 201
 
+@employer_bp.route('/request-verifications', methods=['POST'])
+@jwt_required()
+@role_required('employer')
+def request_verifications_bulk():
+    '''Submit many verification requests at once; returns one result per item'''
+    employer = g.profile
+    
+    if not employer:
+        return jsonify({"error": "Employer profile not found"}), 404
+    
+    items = (request.get_json() or {}).get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "'requests' must be a non-empty list"}), 400
+    max_items = current_app.config.get('BULK_VERIFICATION_MAX', 10000)
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} requests per call"}), 400
+    
+    # One query to validate every referenced university
+    uni_ids = {item.get('university_id') for item in items
+               if isinstance(item, dict) and isinstance(item.get('university_id'), int)}
+    known_unis = {uid for (uid,) in db.session.query(University.id).filter(University.id.in_(uni_ids)).all()}
+    
+    results = [None] * len(items)
+    new_requests = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "error": "Item must be an object"}
+            continue
+        missing = [f for f in ('university_id', 'student_name', 'degree', 'year') if item.get(f) in (None, '')]
+        if missing:
+            results[index] = {"index": index, "error": f"Missing fields: {', '.join(missing)}"}
+        # JSON can put lists or objects anywhere; they would fail the set lookup or the INSERT
+        elif not all(isinstance(item[f], int) for f in ('university_id', 'year')):
+            results[index] = {"index": index, "error": "university_id and year must be integers"}
+        elif not all(isinstance(item[f], str) for f in ('student_name', 'degree')):
+            results[index] = {"index": index, "error": "student_name and degree must be strings"}
+        elif item['university_id'] not in known_unis:
+            results[index] = {"index": index, "error": "University not found"}
+        else:
+            new_requests.append((index, {
+                "employer_id": employer.id,
+                "university_id": item['university_id'],
+                "student_name": item['student_name'],
+                "degree": item['degree'],
+                "year": item['year'],
+                "status": 'PENDING'
+            }))
+    
+    if new_requests:
+        # Bulk INSERT ... RETURNING in one statement batch and one commit
+        new_ids = db.session.scalars(
+            insert(VerificationRequest).returning(VerificationRequest.id, sort_by_parameter_order=True),
+            [values for _, values in new_requests]
+        ).all()
+        count_verifications([(employer.id, None, 'PENDING')] * len(new_requests))
+        db.session.commit()
+        invalidate(f"employer:{employer.id}:requests",
+                   *(f"university:{values['university_id']}:requests" for _, values in new_requests))
+        for (index, _), req_id in zip(new_requests, new_ids):
+            results[index] = {"index": index, "id": req_id, "status": 'PENDING'}
+    
+    return jsonify({
+        "created": len(new_requests),
+        "failed": len(items) - len(new_requests),
+        "results": results
+    }), 201 if new_requests else 400
+
+EMPLOYER_REQUEST_FIELDS = ('id', 'student_name', 'degree', 'year', 'status', 'cert_hash', 'created_at')
+
 @employer_bp.route('/verification-requests', methods=['GET'])
 @jwt_required()
 @role_required('employer')
+@cached_response(lambda: [f"employer:{g.profile.id}:requests"])
 def get_verification_requests():
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     if not employer:
         return jsonify({"error": "Employer profile not found"}), 404
     
-    requests = VerificationRequest.query.filter_by(employer_id=employer.id).all()
-    output = []
-    
-    for req in requests:
-        output.append({
-            "id": req.id,
-            "student_name": req.student_name,
-            "degree": req.degree,
-            "year": req.year,
-            "status": req.status,
-            "cert_hash": req.cert_hash,
-            "created_at": req.created_at.isoformat() if req.created_at else None
-        })
-    
-    return jsonify(output), 200
+    try:
+        fields = get_fields(VERIFICATION_REQUEST.fields, EMPLOYER_REQUEST_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    requests = VERIFICATION_REQUEST.project(VerificationRequest.query.filter_by(employer_id=employer.id), fields)
+    return jsonify(VERIFICATION_REQUEST.dump_many(requests, fields)), 200
 
 # Employer Profile Routes
 @employer_bp.route('/profile', methods=['GET'])
 @jwt_required()
 @role_required('employer')
+@cached_response(lambda: [f"employer:{g.profile.id}:profile"])
 def get_employer_profile():
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     if not employer:
         return jsonify({"error": "Employer profile not found"}), 404
     
-    return jsonify({
-        "id": employer.id,
-        "company_name": employer.company_name,
-        "company_email": employer.company_email,
-        "industry": employer.industry,
-        "created_at": employer.created_at.isoformat() if employer.created_at else None,
-        "updated_at": employer.updated_at.isoformat() if employer.updated_at else None
-    }), 200
+    try:
+        fields = get_fields(EMPLOYER_PROFILE.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(EMPLOYER_PROFILE.dump(employer, fields)), 200
 
 @employer_bp.route('/profile', methods=['PUT'])
 @jwt_required()
 @role_required('employer')
 def update_employer_profile():
-    user_id = int(get_jwt_identity())
-    employer = Employer.query.filter_by(user_id=user_id).first()
+    employer = g.profile
     
     if not employer:
         return jsonify({"error": "Employer profile not found"}), 404
     
     data = request.get_json()
+    # write through the row itself, not a possibly stale cached copy
+    employer = lock_profile(employer)
     if 'company_name' in data:
         employer.company_name = data['company_name']
     if 'company_email' in data:
@@ -273,4 +486,5 @@ def update_employer_profile():
         employer.industry = data['industry']
     
     db.session.commit()
+    invalidate(f"employer:{employer.id}:profile")
     return jsonify({"message": "Employer profile updated successfully"}), 200
\ No newline at end of file
@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify, current_app, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.events import get_event_bus
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/stream', methods=['GET'])
+# EventSource can't send an Authorization header, so ?jwt=<token> is accepted here only
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    '''Server-Sent Events: the caller's application and verification status changes'''
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+
+    bus = get_event_bus(current_app)
+    subscribed = bus.subscribe(int(get_jwt_identity()), last_event_id)
+    if subscribed is None:
+        response = jsonify({"error": "Too many open event streams, retry later"})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    sub, backlog = subscribed
+
+    response = Response(
+        bus.stream(sub, backlog,
+                   heartbeat_seconds=current_app.config.get('SSE_HEARTBEAT_SECONDS', 15),
+                   max_seconds=current_app.config.get('SSE_MAX_STREAM_SECONDS', 300)),
+        mimetype='text/event-stream')
+    # The generator never runs if the client is gone before the first byte
+    response.call_on_close(lambda: bus.unsubscribe(sub))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let nginx hold events back
+    return response
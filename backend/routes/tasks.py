@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.models import Task, TASK_STATUSES
+from utils.pagination import (PaginationError, get_page_size, get_fields, get_status_filter,
+                              keyset_filter, encode_cursor, paginated_response)
+from utils.serializers import TASK
+
+tasks_bp = Blueprint('tasks', __name__)
+
+@tasks_bp.route('', methods=['GET'])
+@jwt_required()
+def get_my_tasks():
+    """Background work queued by the caller's own requests, newest first."""
+    try:
+        limit = get_page_size()
+        fields = get_fields(TASK.fields)
+        status = get_status_filter(TASK_STATUSES)
+        query = Task.query.filter_by(user_id=int(get_jwt_identity()))
+        if status:
+            query = query.filter_by(status=status)
+        if request.args.get('cursor'):
+            query = keyset_filter(query, Task.created_at, Task.id, request.args['cursor'])
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tasks = TASK.project(query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1),
+                         fields, extra=('id', 'created_at'))
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    last = tasks[-1] if has_more else None
+    next_cursor = encode_cursor(last.created_at, last.id) if last else None
+    return paginated_response(jsonify(TASK.dump_many(tasks, fields)), next_cursor), 200
+
+@tasks_bp.route('/<int:task_id>', methods=['GET'])
+@jwt_required()
+def get_task(task_id):
+    try:
+        fields = get_fields(TASK.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    rows = TASK.project(Task.query.filter_by(id=task_id, user_id=int(get_jwt_identity())), fields)
+    if not rows:
+        return jsonify({"error": "Task not found"}), 404
+    return jsonify(TASK.dump(rows[0], fields)), 200
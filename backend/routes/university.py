@@ -1,41 +1,55 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.models import db, VerificationRequest, University, User
+import hashlib
+from flask import Blueprint, request, jsonify, g, current_app, Response
+from flask_jwt_extended import jwt_required
+from models.models import db, VerificationRequest, University, User, Employer
 from utils.helpers import generate_hash
 from utils.decorators import role_required
+from utils.profile_cache import lock_profile
+from utils.bulk_import import import_users
+from utils.passwords import get_password_hasher
+from utils.ledger import proof_for_request
+from utils.certificates import lookup_certificate, invalidate_certificate
+from utils.cert_signing import get_signer, revoked_hashes, record_revocations, reinstate_certificates
+from utils.response_cache import cached_response, invalidate
+from utils.tasks import enqueue
+from utils.events import publish, publish_many
+from utils.counters import count_verifications
+from utils.serializers import VERIFICATION_REQUEST, UNIVERSITY_PROFILE
+from utils.pagination import PaginationError, get_fields
+from sqlalchemy import update as sa_update, bindparam
+import jwt
 
 university_bp = Blueprint('university_bp', __name__)
 
 @university_bp.route('/profile', methods=['GET'])
 @jwt_required()
 @role_required('university')
+@cached_response(lambda: [f"university:{g.profile.id}:profile"])
 def get_university_profile():
-    user_id = int(get_jwt_identity())
-    university = University.query.filter_by(user_id=user_id).first()
+    university = g.profile
     
     if not university:
         return jsonify({"error": "University profile not found"}), 404
     
-    return jsonify({
-        "id": university.id,
-        "uni_name": university.uni_name,
-        "uni_email": university.uni_email,
-        "uni_code": university.uni_code,
-        "created_at": university.created_at.isoformat() if university.created_at else None,
-        "updated_at": university.updated_at.isoformat() if university.updated_at else None
-    }), 200
+    try:
+        fields = get_fields(UNIVERSITY_PROFILE.fields)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(UNIVERSITY_PROFILE.dump(university, fields)), 200
 
 @university_bp.route('/profile', methods=['PUT'])
 @jwt_required()
 @role_required('university')
 def update_university_profile():
-    user_id = int(get_jwt_identity())
-    university = University.query.filter_by(user_id=user_id).first()
+    university = g.profile
     
     if not university:
         return jsonify({"error": "University profile not found"}), 404
     
     data = request.get_json()
+    # g.profile may be another worker's stale copy; the rename check and the write need the row
+    university = lock_profile(university)
+    renamed = 'uni_name' in data and data['uni_name'] != university.uni_name
     if 'uni_name' in data:
         university.uni_name = data['uni_name']
     if 'uni_email' in data:
@@ -44,69 +58,80 @@ def update_university_profile():
         university.uni_code = data['uni_code']
     
     db.session.commit()
+    invalidate(f"university:{university.id}:profile")
+    if renamed:
+        # Certificate hashes embed the university name, so cached verdicts change
+        invalidate_certificate()
     return jsonify({"message": "University profile updated successfully"}), 200
 
+@university_bp.route('/import-students', methods=['POST'])
+@jwt_required()
+@role_required('university')
+def import_students():
+    '''Bulk-create applicant accounts for a cohort from a CSV or JSONL upload'''
+    if 'file' in request.files:
+        upload = request.files['file']
+        stream = upload.stream
+        name = upload.filename or ''
+    else:
+        stream = request.stream
+        name = ''
+
+    fmt = request.args.get('format') or ('jsonl' if name.endswith(('.jsonl', '.json')) else 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+
+    result = import_users(stream, fmt, get_password_hasher(current_app),
+                          allowed_roles={'applicant'},
+                          batch_size=current_app.config.get('BULK_IMPORT_BATCH_SIZE', 500))
+    return jsonify(result), 200
+
+# Default projections for the two request listings
+PENDING_REQUEST_FIELDS = ('id', 'student_name', 'degree', 'year', 'status', 'created_at')
+ALL_REQUEST_FIELDS = PENDING_REQUEST_FIELDS + ('cert_hash', 'updated_at')
+
 @university_bp.route('/verification-requests', methods=['GET'])
 @jwt_required()
 @role_required('university')
+@cached_response(lambda: [f"university:{g.profile.id}:requests"])
 def get_pending_verification_requests():
-    user_id = int(get_jwt_identity())
-    university = University.query.filter_by(user_id=user_id).first()
+    university = g.profile
     
     if not university:
         return jsonify({"error": "University profile not found"}), 404
     
-    requests = VerificationRequest.query.filter_by(
+    try:
+        fields = get_fields(VERIFICATION_REQUEST.fields, PENDING_REQUEST_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    requests = VERIFICATION_REQUEST.project(VerificationRequest.query.filter_by(
         university_id=university.id,
         status='PENDING'
-    ).all()
-    
-    output = []
-    for req in requests:
-        output.append({
-            "id": req.id,
-            "student_name": req.student_name,
-            "degree": req.degree,
-            "year": req.year,
-            "status": req.status,
-            "created_at": req.created_at.isoformat() if req.created_at else None
-        })
-    
-    return jsonify(output), 200
+    ), fields)
+    return jsonify(VERIFICATION_REQUEST.dump_many(requests, fields)), 200
 
 @university_bp.route('/all-verification-requests', methods=['GET'])
 @jwt_required()
 @role_required('university')
+@cached_response(lambda: [f"university:{g.profile.id}:requests"])
 def get_all_verification_requests():
-    user_id = int(get_jwt_identity())
-    university = University.query.filter_by(user_id=user_id).first()
+    university = g.profile
     
     if not university:
         return jsonify({"error": "University profile not found"}), 404
     
-    requests = VerificationRequest.query.filter_by(university_id=university.id).all()
-    
-    output = []
-    for req in requests:
-        output.append({
-            "id": req.id,
-            "student_name": req.student_name,
-            "degree": req.degree,
-            "year": req.year,
-            "status": req.status,
-            "cert_hash": req.cert_hash,
-            "created_at": req.created_at.isoformat() if req.created_at else None,
-            "updated_at": req.updated_at.isoformat() if req.updated_at else None
-        })
-    
-    return jsonify(output), 200
+    try:
+        fields = get_fields(VERIFICATION_REQUEST.fields, ALL_REQUEST_FIELDS)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    requests = VERIFICATION_REQUEST.project(VerificationRequest.query.filter_by(university_id=university.id), fields)
+    return jsonify(VERIFICATION_REQUEST.dump_many(requests, fields)), 200
 
 @university_bp.route('/verify-request/<int:request_id>', methods=['POST'])
 @jwt_required()
 @role_required('university')
 def verify_certificate(request_id):
-    user_id = int(get_jwt_identity())
-    university = University.query.filter_by(user_id=user_id).first()
+    university = g.profile
     
     if not university:
         return jsonify({"error": "University profile not found"}), 404
@@ -122,22 +147,180 @@ def verify_certificate(request_id):
     if status not in ['VERIFIED', 'REJECTED']:
         return jsonify({"error": "Invalid status"}), 400
     
+    previous_status = req.status
+    # The hash and the signed token embed the name; don't take it from a cached profile
+    university = lock_profile(university)
     if status == 'VERIFIED':
         # Generate blockchain hash for certificate
-        cert_hash = generate_hash(req.student_name, university.uni_name, req.degree, req.year)
-        req.status = 'VERIFIED'
-        req.cert_hash = cert_hash
+        values = {"status": status, "rejection_reason": None,
+                  "cert_hash": generate_hash(req.student_name, university.uni_name, req.degree, req.year)}
     else:
-        req.status = 'REJECTED'
-        req.rejection_reason = data.get('reason', 'No reason provided')
+        values = {"status": status, "rejection_reason": data.get('reason', 'No reason provided')}
+    # Only the request that moves the row from the status it read adjusts the counters
+    moved = db.session.execute(
+        sa_update(VerificationRequest)
+        .where(VerificationRequest.id == req.id, VerificationRequest.status == previous_status)
+        .values(**values).execution_options(synchronize_session=False)).rowcount
+    if moved != 1:
+        db.session.rollback()
+        return jsonify({"error": "Request was decided concurrently, retry"}), 409
+    if status == 'REJECTED' and previous_status == 'VERIFIED':
+        # Signed tokens may be out there; publish the withdrawal
+        record_revocations([req.cert_hash])
+    cert_hash = values.get('cert_hash', req.cert_hash)
+    count_verifications([(req.employer_id, previous_status, status)])
+    enqueue('notify_verification_status', {"request_ids": [req.id]})
+    employer_user_id = db.session.query(Employer.user_id).filter_by(id=req.employer_id).scalar()
+    publish(employer_user_id, 'verification_status',
+            {"request_id": req.id, "status": status, "cert_hash": cert_hash})
     
     db.session.commit()
+    # Drop any cached verdict for this hash ("not found" or "verified")
+    invalidate_certificate(req.cert_hash, withdrawn=previous_status == 'VERIFIED')
+    invalidate(f"university:{university.id}:requests", f"employer:{req.employer_id}:requests")
+    token = None
+    if req.status == 'VERIFIED':
+        reinstate_certificates([req.cert_hash])
+        # Anchoring into the Merkle ledger happens in the background batcher
+        current_app.extensions['ledger_batcher'].notify()
+        token = get_signer().issue(req.student_name, req.degree, req.year, university.uni_name, req.cert_hash)
     return jsonify({
         "message": "Verification processed",
         "status": req.status,
-        "cert_hash": req.cert_hash
+        "cert_hash": req.cert_hash,
+        "certificate_token": token
     }), 200
 
+def _apply_decisions(updates, rows):
+    """
+    Write the decisions with one executemany per target status, each row only
+    while it still has the status read into `rows`; returns the updates that
+    moved. If a concurrent decision got to some rows first, the batch is
+    redone row by row to find out which.
+    """
+    table = VerificationRequest.__table__
+    moved = []
+    for status in ('VERIFIED', 'REJECTED'):
+        group = [u for u in updates if u['status'] == status]
+        if not group:
+            continue
+        columns = [c for c in ('status', 'rejection_reason', 'cert_hash') if c in group[0]]
+        stmt = (sa_update(table)
+                .where(table.c.id == bindparam('b_id'), table.c.status == bindparam('b_old'))
+                .values({c: bindparam(f'b_{c}') for c in columns}))
+        params = [{'b_id': u['id'], 'b_old': rows[u['id']].status, **{f'b_{c}': u[c] for c in columns}}
+                  for u in group]
+        if len(group) > 1 and db.session.get_bind().dialect.supports_sane_multi_rowcount:
+            savepoint = db.session.begin_nested()
+            if db.session.execute(stmt, params).rowcount == len(group):
+                savepoint.commit()
+                moved.extend(group)
+                continue
+            savepoint.rollback()
+        for u, p in zip(group, params):
+            if db.session.execute(stmt, p).rowcount == 1:
+                moved.append(u)
+    return moved
+
+@university_bp.route('/verify-requests', methods=['POST'])
+@jwt_required()
+@role_required('university')
+def verify_certificates_bulk():
+    '''Approve or reject many verification requests in a single transaction'''
+    university = g.profile
+    
+    if not university:
+        return jsonify({"error": "University profile not found"}), 404
+    
+    items = (request.get_json() or {}).get('decisions')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "'decisions' must be a non-empty list"}), 400
+    max_items = current_app.config.get('BULK_VERIFICATION_MAX', 10000)
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} decisions per call"}), 400
+    
+    # As in verify_certificate: the hashes need the current name, not the cached one
+    university = lock_profile(university)
+    # ids come straight from JSON: a list or object here would fail the query or the dict lookups
+    ids = [item.get('id') for item in items if isinstance(item, dict) and isinstance(item.get('id'), int)]
+    # Plain column rows: no ORM identity map overhead for thousands of requests
+    rows = {row.id: row for row in db.session.query(
+        VerificationRequest.id, VerificationRequest.university_id, VerificationRequest.employer_id,
+        VerificationRequest.status,
+        VerificationRequest.cert_hash, VerificationRequest.student_name,
+        VerificationRequest.degree, VerificationRequest.year
+    ).filter(VerificationRequest.id.in_(ids)).all()}
+    
+    results = []
+    updates = []
+    seen = set()
+    for index, item in enumerate(items):
+        req_id = item.get('id') if isinstance(item, dict) else None
+        status = item.get('status') if isinstance(item, dict) else None
+        if not isinstance(req_id, int):
+            results.append({"index": index, "id": req_id, "error": "id must be an integer"})
+            continue
+        row = rows.get(req_id)
+        if row is None:
+            results.append({"index": index, "id": req_id, "error": "Request not found"})
+        elif row.university_id != university.id:
+            results.append({"index": index, "id": req_id, "error": "Not authorized to process this request"})
+        elif status not in ('VERIFIED', 'REJECTED'):
+            results.append({"index": index, "id": req_id, "error": "Invalid status"})
+        elif req_id in seen:
+            results.append({"index": index, "id": req_id, "error": "Duplicate id in batch"})
+        else:
+            seen.add(req_id)
+            if status == 'VERIFIED':
+                update = {"id": req_id, "status": status, "rejection_reason": None,
+                          "cert_hash": generate_hash(row.student_name, university.uni_name, row.degree, row.year)}
+            else:
+                # Same as the single endpoint: the old hash stays on the row
+                update = {"id": req_id, "status": status,
+                          "rejection_reason": item.get('reason', 'No reason provided')}
+            update["result"] = len(results)
+            updates.append(update)
+            results.append({"index": index, "id": req_id, "status": status,
+                            "cert_hash": update.get("cert_hash", row.cert_hash)})
+    
+    if updates:
+        moved = _apply_decisions(updates, rows)
+        moved_ids = {u['id'] for u in moved}
+        for u in updates:
+            if u['id'] not in moved_ids:
+                result = results[u['result']]
+                results[u['result']] = {"index": result["index"], "id": u['id'],
+                                        "error": "Request was decided concurrently, retry"}
+        updates = moved
+    revoked = [rows[u['id']].cert_hash for u in updates
+               if u['status'] == 'REJECTED' and rows[u['id']].status == 'VERIFIED']
+    
+    if updates:
+        record_revocations(revoked)
+        count_verifications([(rows[u['id']].employer_id, rows[u['id']].status, u['status']) for u in updates])
+        enqueue('notify_verification_status', {"request_ids": [u["id"] for u in updates]})
+        owners = dict(db.session.query(Employer.id, Employer.user_id).filter(
+            Employer.id.in_({rows[u['id']].employer_id for u in updates})))
+        publish_many([(owners[rows[u['id']].employer_id], 'verification_status',
+                       {"request_id": u['id'], "status": u['status'],
+                        "cert_hash": u.get('cert_hash', rows[u['id']].cert_hash)}) for u in updates])
+        db.session.commit()
+        verified = [u["cert_hash"] for u in updates if u["status"] == 'VERIFIED']
+        reinstate_certificates(verified)
+        for cert_hash in verified:
+            invalidate_certificate(cert_hash)
+        for cert_hash in revoked:
+            invalidate_certificate(cert_hash, withdrawn=True)
+        invalidate(f"university:{university.id}:requests",
+                   *(f"employer:{rows[u['id']].employer_id}:requests" for u in updates))
+        current_app.extensions['ledger_batcher'].notify(len(verified))
+    
+    return jsonify({
+        "processed": len(updates),
+        "failed": len(items) - len(updates),
+        "results": results
+    }), 200 if updates else 400
+
 @university_bp.route('/certificate/<int:request_id>', methods=['GET'])
 @jwt_required()
 def get_certificate(request_id):
@@ -147,8 +330,10 @@ def get_certificate(request_id):
     if req.status != 'VERIFIED':
         return jsonify({"error": "Certificate not verified"}), 400
     
-    # Verify blockchain hash
-    expected_hash = generate_hash(req.student_name, "University Name", req.degree, req.year)
+    # Verify blockchain hash against the issuing university's name
+    university = db.session.get(University, req.university_id)
+    uni_name = university.uni_name if university else None
+    expected_hash = generate_hash(req.student_name, uni_name, req.degree, req.year)
     hash_valid = expected_hash == req.cert_hash
     
     return jsonify({
@@ -156,6 +341,7 @@ def get_certificate(request_id):
         "student_name": req.student_name,
         "degree": req.degree,
         "year": req.year,
+        "university": uni_name,
         "status": req.status,
         "cert_hash": req.cert_hash,
         "hash_valid": hash_valid,  # Blockchain verification
@@ -165,27 +351,76 @@ def get_certificate(request_id):
 @university_bp.route('/certificate-verification/<cert_hash>', methods=['GET'])
 def verify_certificate_by_hash(cert_hash):
     '''Public endpoint to verify a certificate by its blockchain hash (no auth required)'''
-    req = VerificationRequest.query.filter_by(cert_hash=cert_hash).first()
+    # Served from an in-process cache (including "not found"), so repeats skip the DB
+    result = lookup_certificate(cert_hash)
+    response = Response(result.body, status=result.status_code, mimetype='application/json')
+    if result.status_code == 200:
+        response.set_etag(result.etag)
+        # Revalidate every time (a 304 when unchanged): a verdict withdrawn meanwhile must not be reused
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = current_app.config.get('CERT_NEGATIVE_CACHE_TTL', 30)
+    response.cache_control.public = True
+    return response.make_conditional(request)
+
+@university_bp.route('/certificate-proof/<cert_hash>', methods=['GET'])
+def get_certificate_proof(cert_hash):
+    '''Public Merkle inclusion proof tying a certificate hash to a ledger block header'''
+    req = VerificationRequest.query.filter_by(cert_hash=cert_hash, status='VERIFIED').first()
     
     if not req:
         return jsonify({"error": "Certificate not found"}), 404
     
-    if req.status != 'VERIFIED':
-        return jsonify({"error": "Certificate is not verified"}), 400
+    proof = proof_for_request(req.id)
+    if proof is None:
+        return jsonify({"message": "Certificate verified but not anchored yet", "anchored": False}), 202
     
-    # Verify blockchain hash integrity
-    expected_hash = generate_hash(req.student_name, "University Name", req.degree, req.year)
-    hash_valid = expected_hash == req.cert_hash
+    proof["anchored"] = True
+    return jsonify(proof), 200
+
+@university_bp.route('/certificate-token/<cert_hash>', methods=['GET'])
+def get_certificate_token(cert_hash):
+    '''Public: signed, self-contained certificate token for a verified hash'''
+    result = lookup_certificate(cert_hash)
+    if result.status_code != 200:
+        return Response(result.body, status=result.status_code, mimetype='application/json')
     
-    if not hash_valid:
-        return jsonify({"error": "Certificate hash is invalid (tampering detected)"}), 400
+    cert = current_app.json.loads(result.body)
+    token = get_signer().issue(cert["student_name"], cert["degree"], cert["year"],
+                               cert["university"], cert["cert_hash"])
+    return jsonify({"certificate_token": token}), 200
+
+@university_bp.route('/certificate-keys', methods=['GET'])
+def get_certificate_keys():
+    '''Public JWKS used to check certificate tokens offline'''
+    response = jsonify(get_signer().key_set())
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('CERT_KEYS_MAX_AGE', 3600)
+    return response
+
+@university_bp.route('/certificate-revocations', methods=['GET'])
+def get_certificate_revocations():
+    '''Public list of withdrawn certificate hashes; small and cacheable'''
+    revoked = sorted(revoked_hashes())
+    response = jsonify({"revoked": revoked})
+    response.set_etag(hashlib.sha256('\n'.join(revoked).encode()).hexdigest()[:32])
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('CERT_REVOCATION_LIST_TTL', 60)
+    return response.make_conditional(request)
+
+@university_bp.route('/verify-certificate-token', methods=['POST'])
+def verify_certificate_token():
+    '''Public: check a certificate token by signature and revocation list (no per-call DB lookup)'''
+    token = (request.get_json() or {}).get('token')
+    if not token:
+        return jsonify({"error": "token is required"}), 400
     
-    return jsonify({
-        "student_name": req.student_name,
-        "degree": req.degree,
-        "year": req.year,
-        "cert_hash": req.cert_hash,
-        "hash_valid": hash_valid,
-        "issued_date": req.updated_at.isoformat() if req.updated_at else None,
-        "message": "Certificate verified successfully"
-    }), 200
\ No newline at end of file
+    try:
+        claims = get_signer().verify(token)
+    except jwt.InvalidTokenError:
+        return jsonify({"valid": False, "error": "Invalid signature"}), 400
+    
+    if claims["sub"] in revoked_hashes():
+        return jsonify({"valid": False, "error": "Certificate has been revoked"}), 400
+    
+    return jsonify({"valid": True, "certificate": claims}), 200
\ No newline at end of file
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Configuration is read from the environment when config.py is imported
+_tmp = tempfile.mkdtemp(prefix='backend-tests-')
+os.environ.update({
+    'DATABASE_URL': 'sqlite:///' + os.path.join(_tmp, 'test.db'),
+    'UPLOAD_FOLDER': os.path.join(_tmp, 'uploads'),
+    'CERT_SIGNING_KEY_PATH': os.path.join(_tmp, 'cert_signing_key.pem'),
+    'JWT_REVOCATION_STAMP_PATH': os.path.join(_tmp, 'revocations.stamp'),
+    'CERT_CACHE_STAMP_PATH': os.path.join(_tmp, 'certificates.stamp'),
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'PASSWORD_HASH_WORKERS': '0',
+    'RESPONSE_CACHE_BACKEND': 'none',
+    'TASK_WORKERS': '0',
+    # every test client registers from the same address
+    'AUTH_RATE_LIMIT_PER_IP': '100000',
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from models.models import db  # noqa: E402
+from utils.database import init_database  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app(start_background=False)
+    with app.app_context():
+        init_database(app, db)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """Register a user and return its Authorization header."""
+    def register(email, role, **fields):
+        response = client.post('/auth/register', json={'email': email, 'password': 'password123',
+                                                       'role': role, **fields})
+        assert response.status_code == 201, response.get_json()
+        return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+    return register
+
+
+@pytest.fixture
+def verification_requests(client, register, request):
+    """
+    Make an employer and a university, then `count` verification requests
+    from one to the other. Returns (employer headers, university headers, request ids).
+    """
+    def make(count=1, prefix=None):
+        name = prefix or request.node.name
+        employer = register(f'{name}-employer@example.com', 'employer', name='Acme')
+        university = register(f'{name}-uni@example.com', 'university', name=f'{name} University')
+        university_id = client.get('/university/profile', headers=university).get_json()['id']
+        if not count:
+            return employer, university, []
+        response = client.post('/employer/request-verifications', headers=employer, json={'requests': [
+            {'university_id': university_id, 'student_name': f'Student {i}', 'degree': 'BSc', 'year': 2020}
+            for i in range(count)]})
+        assert response.status_code == 201, response.get_json()
+        return employer, university, [r['id'] for r in response.get_json()['results']]
+    return make
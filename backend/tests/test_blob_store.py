@@ -0,0 +1,53 @@
+"""Identical resumes share one stored file, which goes away with its last reference."""
+import io
+import os
+
+from models.models import db, ResumeBlob
+from utils.blob_store import get_blob_store
+from utils.tasks import get_task_queue
+
+
+def upload(client, headers, content):
+    response = client.post('/applicant/upload-resume', headers=headers, content_type='multipart/form-data',
+                           data={'resume': (io.BytesIO(content), 'cv.txt')})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['path']
+
+
+def ref_count(app, path):
+    with app.app_context():
+        blob = db.session.get(ResumeBlob, get_blob_store(app).hash_from_path(path))
+        return blob.ref_count if blob else 0
+
+
+def run_tasks(app):
+    with app.app_context():
+        get_task_queue(app).run_pending()
+
+
+def test_shared_blob_survives_until_last_reference(app, client, register):
+    first = register('blob-first@example.com', 'applicant')
+    second = register('blob-second@example.com', 'applicant')
+    path = upload(client, first, b'shared resume for the blob test')
+    assert upload(client, second, b'shared resume for the blob test') == path
+    assert ref_count(app, path) == 2
+
+    assert client.delete('/applicant/resume', headers=first).status_code == 200
+    assert client.delete('/applicant/resume', headers=first).status_code == 400
+    run_tasks(app)
+    assert ref_count(app, path) == 1 and os.path.exists(path)
+    assert client.get('/applicant/resume', headers=second).data == b'shared resume for the blob test'
+
+    # replacing the last reference releases the old blob and its file
+    new_path = upload(client, second, b'a different resume')
+    run_tasks(app)
+    assert ref_count(app, path) == 0 and not os.path.exists(path)
+    assert ref_count(app, new_path) == 1 and os.path.exists(new_path)
+
+
+def test_reupload_of_same_content_keeps_one_reference(app, client, register):
+    headers = register('blob-again@example.com', 'applicant')
+    path = upload(client, headers, b'uploaded twice by the same applicant')
+    assert upload(client, headers, b'uploaded twice by the same applicant') == path
+    run_tasks(app)
+    assert ref_count(app, path) == 1 and os.path.exists(path)
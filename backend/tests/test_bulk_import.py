@@ -0,0 +1,58 @@
+"""Bulk student import: bad rows are reported per line and never fail the upload."""
+import io
+import json
+
+from models.models import db, User
+from utils.bulk_import import import_users
+from utils.passwords import get_password_hasher
+
+
+def jsonl(*rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows).encode()
+
+
+def import_jsonl(client, university, body):
+    response = client.post('/university/import-students?format=jsonl', data=body, headers=university)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+
+def test_malformed_rows_are_skipped(client, register):
+    university = register('import-uni@example.com', 'university', name='Import Uni')
+    result = import_jsonl(client, university, jsonl(
+        {'email': 5, 'password': 'pw', 'role': 'applicant'},
+        {'email': 'bad-password@example.com', 'password': 5, 'role': 'applicant'},
+        {'email': 'bad-role@example.com', 'password': 'pw', 'role': ['applicant']},
+        {'email': 'bad-name@example.com', 'password': 'pw', 'role': 'applicant', 'name': {}},
+        'not json',
+        {'email': 'ok@example.com', 'password': 'pw', 'role': 'applicant', 'name': 'Ok'},
+        {'email': 'ok@example.com', 'password': 'pw', 'role': 'applicant'},
+    ))
+    assert result['created'] == 1
+    assert [e['line'] for e in result['errors']] == [1, 2, 3, 4, 5, 7]
+    assert result['errors'][-1]['error'] == "Duplicate email in upload"
+
+
+def test_conflict_during_insert_fails_only_that_row(app, register):
+    register('taken@example.com', 'applicant')
+
+    class RacingHasher:
+        """Registers one of the emails after the existence check, like a concurrent signup."""
+
+        def __init__(self, hasher):
+            self.hasher = hasher
+
+        def hash_many(self, passwords):
+            db.session.add(User(email='late@example.com', password='x', role='applicant'))
+            db.session.commit()
+            return self.hasher.hash_many(passwords)
+
+    body = jsonl(*({'email': email, 'password': 'pw', 'role': 'applicant'}
+                   for email in ('first@example.com', 'late@example.com', 'taken@example.com', 'last@example.com')))
+    with app.test_request_context():
+        result = import_users(io.BytesIO(body), 'jsonl', RacingHasher(get_password_hasher(app)),
+                              allowed_roles={'applicant'})
+    assert result['created'] == 2
+    assert [(e['email'], e['error']) for e in result['errors']] == [
+        ('late@example.com', "Email already registered"), ('taken@example.com', "Email already registered")]
+    assert 'pbkdf2' not in json.dumps(result)
@@ -0,0 +1,56 @@
+"""Bulk verification endpoints: valid items go through, every bad one gets its own error."""
+
+
+def test_bulk_request_reports_bad_items(client, verification_requests):
+    employer, university, _ = verification_requests(0)
+    university_id = client.get('/university/profile', headers=university).get_json()['id']
+    valid = {'university_id': university_id, 'student_name': 'Ada', 'degree': 'BSc', 'year': 2020}
+    response = client.post('/employer/request-verifications', headers=employer, json={'requests': [
+        valid,
+        'not an object',
+        {'university_id': university_id, 'degree': 'BSc', 'year': 2020},
+        {**valid, 'university_id': [university_id]},
+        {**valid, 'student_name': {'first': 'Ada'}},
+        {**valid, 'university_id': 10 ** 9},
+        {**valid, 'student_name': 'Grace'},
+    ]})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 5)
+    assert [r.get('error') for r in body['results']] == [
+        None, "Item must be an object", "Missing fields: student_name",
+        "university_id and year must be integers", "student_name and degree must be strings",
+        "University not found", None]
+    listed = client.get('/university/verification-requests', headers=university).get_json()
+    assert sorted(r['student_name'] for r in listed) == ['Ada', 'Grace']
+
+
+def test_bulk_request_with_nothing_valid(client, verification_requests):
+    employer, _, _ = verification_requests(0)
+    assert client.post('/employer/request-verifications', headers=employer,
+                       json={'requests': [{'university_id': 10 ** 9}]}).status_code == 400
+    assert client.post('/employer/request-verifications', headers=employer, json={'requests': []}).status_code == 400
+
+
+def test_bulk_decisions_report_bad_items(client, register, verification_requests):
+    _, university, ids = verification_requests(3)
+    _, _, foreign = verification_requests(1, prefix='bulk-decisions-other')
+    response = client.post('/university/verify-requests', headers=university, json={'decisions': [
+        {'id': ids[0], 'status': 'VERIFIED'},
+        {'id': [ids[1]], 'status': 'VERIFIED'},
+        {'id': str(ids[1]), 'status': 'VERIFIED'},
+        {'id': 10 ** 9, 'status': 'VERIFIED'},
+        {'id': foreign[0], 'status': 'VERIFIED'},
+        {'id': ids[1], 'status': 'MAYBE'},
+        {'id': ids[0], 'status': 'REJECTED'},
+        {'id': ids[2], 'status': 'REJECTED', 'reason': 'Not a student here'},
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['processed'], body['failed']) == (2, 6)
+    assert [r.get('error') for r in body['results']] == [
+        None, "id must be an integer", "id must be an integer", "Request not found",
+        "Not authorized to process this request", "Invalid status", "Duplicate id in batch", None]
+    verified = body['results'][0]
+    assert verified['status'] == 'VERIFIED' and len(verified['cert_hash']) == 64
+    assert client.get(f"/university/certificate-verification/{verified['cert_hash']}").status_code == 200
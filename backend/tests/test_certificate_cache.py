@@ -0,0 +1,35 @@
+"""Public certificate verdicts are cached per worker but withdrawn on all of them."""
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def certificate(client, verification_requests):
+    _, university, (request_id,) = verification_requests()
+    cert_hash = client.post(f'/university/verify-request/{request_id}', headers=university,
+                            json={'status': 'VERIFIED'}).get_json()['cert_hash']
+    return university, request_id, cert_hash
+
+
+def test_rejection_reaches_other_workers(client, certificate):
+    university, request_id, cert_hash = certificate
+    # a second app in this process stands in for another worker sharing the stamp file
+    other = create_app(start_background=False).test_client()
+    assert other.get(f'/university/certificate-verification/{cert_hash}').status_code == 200  # cached there now
+
+    assert client.post(f'/university/verify-request/{request_id}', headers=university,
+                       json={'status': 'REJECTED', 'reason': 'Issued in error'}).status_code == 200
+    response = other.get(f'/university/certificate-verification/{cert_hash}')
+    assert response.status_code == 400
+    assert other.get(f'/university/certificate-token/{cert_hash}').status_code == 400
+
+
+def test_verified_response_is_revalidated(client, certificate):
+    _, _, cert_hash = certificate
+    response = client.get(f'/university/certificate-verification/{cert_hash}')
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    again = client.get(f'/university/certificate-verification/{cert_hash}',
+                       headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
@@ -0,0 +1,44 @@
+"""Signed certificate tokens: checked offline with the published key, withdrawn by revocation."""
+import jwt
+
+
+def verify_token(client, token):
+    response = client.post('/university/verify-certificate-token', json={'token': token})
+    return response.status_code, response.get_json()
+
+
+def test_token_issue_verify_and_revoke(client, verification_requests):
+    _, university, (request_id,) = verification_requests(1)
+    decided = client.post(f'/university/verify-request/{request_id}', headers=university,
+                          json={'status': 'VERIFIED'}).get_json()
+    token, cert_hash = decided['certificate_token'], decided['cert_hash']
+
+    # Anyone can check it with the JWKS, without calling the verification endpoints
+    header = jwt.get_unverified_header(token)
+    keys = client.get('/university/certificate-keys').get_json()['keys']
+    key = next(jwt.PyJWK(k) for k in keys if k['kid'] == header['kid'])
+    claims = jwt.decode(token, key.key, algorithms=['EdDSA'], issuer='tu-backend')
+    assert (claims['sub'], claims['student_name'], claims['year']) == (cert_hash, 'Student 0', 2020)
+
+    assert verify_token(client, token) == (200, {'valid': True, 'certificate': claims})
+    reissued = client.get(f'/university/certificate-token/{cert_hash}').get_json()['certificate_token']
+    assert verify_token(client, reissued)[0] == 200
+
+    head, payload, signature = token.split('.')
+    forged = '.'.join((head, payload, signature[:-4] + ('AAAA' if signature[-4:] != 'AAAA' else 'BBBB')))
+    assert verify_token(client, forged) == (400, {'valid': False, 'error': 'Invalid signature'})
+
+    assert client.post(f'/university/verify-request/{request_id}', headers=university,
+                       json={'status': 'REJECTED'}).status_code == 200
+    assert cert_hash in client.get('/university/certificate-revocations').get_json()['revoked']
+    assert verify_token(client, token) == (400, {'valid': False, 'error': 'Certificate has been revoked'})
+    assert client.get(f'/university/certificate-token/{cert_hash}').status_code == 400
+
+    # verified again under the same hash: no longer listed as revoked
+    assert client.post(f'/university/verify-request/{request_id}', headers=university,
+                       json={'status': 'VERIFIED'}).status_code == 200
+    assert verify_token(client, token)[0] == 200
+
+
+def test_token_requires_a_token(client):
+    assert client.post('/university/verify-certificate-token', json={}).status_code == 400
@@ -0,0 +1,103 @@
+"""Dashboard counters stay equal to what rebuild-counters computes from the rows."""
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from models.models import db, JobApplicationCounter, VerificationRequest, VerificationRequestCounter
+from utils.counters import rebuild_counters
+
+
+def counters(app):
+    with app.app_context():
+        return (sorted((c.job_id, c.status, c.value) for c in JobApplicationCounter.query if c.value),
+                sorted((c.employer_id, c.status, c.value) for c in VerificationRequestCounter.query if c.value))
+
+
+def assert_counters_consistent(app):
+    kept = counters(app)
+    with app.app_context():
+        rebuild_counters()
+    assert counters(app) == kept
+
+
+@contextmanager
+def decided_elsewhere(app, table, row_id, status):
+    """Before the request's first UPDATE, another request moves the row to `status`."""
+    def race(state):
+        if state.is_update and not fired:
+            fired.append(True)
+            with db.engine.begin() as conn:
+                conn.execute(text(f"UPDATE {table} SET status = :s WHERE id = :i"), {'s': status, 'i': row_id})
+
+    fired = []
+    # each request has its own session; listen on all of them
+    event.listen(Session, 'do_orm_execute', race)
+    try:
+        yield
+    finally:
+        event.remove(Session, 'do_orm_execute', race)
+    assert fired
+
+
+def employer_counts(app, request_id):
+    """{status: count} for the employer who made the verification request."""
+    with app.app_context():
+        employer_id = db.session.get(VerificationRequest, request_id).employer_id
+        return dict(db.session.query(VerificationRequestCounter.status, VerificationRequestCounter.value)
+                    .filter_by(employer_id=employer_id).all())
+
+
+def test_application_counters_match_rebuild(app, client, register, verification_requests):
+    employer, _, _ = verification_requests(0)
+    job_id = client.post('/employer/jobs', json={'title': 'Counted', 'description': 'x'},
+                         headers=employer).get_json()['job_id']
+    ids = []
+    for i in range(3):
+        applicant = register(f'counted{i}@example.com', 'applicant')
+        ids.append((applicant, client.post(f'/applicant/apply-job/{job_id}', json={},
+                                           headers=applicant).get_json()['application_id']))
+    client.put(f'/employer/application/{ids[0][1]}/status', json={'status': 'REVIEWED'}, headers=employer)
+    client.put(f'/employer/application/{ids[1][1]}/status', json={'status': 'ACCEPTED'}, headers=employer)
+    assert client.delete(f'/applicant/application/{ids[2][1]}', headers=ids[2][0]).status_code == 200
+    assert client.delete(f'/applicant/application/{ids[2][1]}', headers=ids[2][0]).status_code == 404
+
+    with decided_elsewhere(app, 'job_application', ids[0][1], 'REJECTED'):
+        response = client.put(f'/employer/application/{ids[0][1]}/status', json={'status': 'ACCEPTED'},
+                              headers=employer)
+    assert response.status_code == 409
+    # the racing write above bypassed the counters; put the row back the way it was
+    with app.app_context():
+        db.session.execute(text("UPDATE job_application SET status = 'REVIEWED' WHERE id = :i"), {'i': ids[0][1]})
+        db.session.commit()
+    assert_counters_consistent(app)
+
+
+def test_verification_counters_match_rebuild(app, client, verification_requests):
+    _, university, (first, second, third) = verification_requests(3)
+    assert client.post(f'/university/verify-request/{first}', headers=university,
+                       json={'status': 'VERIFIED'}).status_code == 200
+    response = client.post('/university/verify-requests', headers=university, json={'decisions': [
+        {'id': first, 'status': 'REJECTED'}, {'id': second, 'status': 'VERIFIED'}]})
+    assert response.get_json()['processed'] == 2
+    assert_counters_consistent(app)
+
+    with decided_elsewhere(app, 'verification_request', third, 'VERIFIED'):
+        response = client.post(f'/university/verify-request/{third}', headers=university,
+                               json={'status': 'REJECTED'})
+    assert response.status_code == 409
+
+
+def test_bulk_decision_skips_rows_decided_concurrently(app, client, verification_requests):
+    _, university, ids = verification_requests(3)
+    before = employer_counts(app, ids[0])
+    with decided_elsewhere(app, 'verification_request', ids[1], 'REJECTED'):
+        response = client.post('/university/verify-requests', headers=university, json={'decisions': [
+            {'id': i, 'status': 'VERIFIED'} for i in ids]})
+    body = response.get_json()
+    assert body['processed'] == 2
+    assert body['results'][1] == {'index': 1, 'id': ids[1], 'error': "Request was decided concurrently, retry"}
+    after = employer_counts(app, ids[0])
+    # only the two rows this request moved were counted
+    assert after['PENDING'] == before['PENDING'] - 2
+    assert after['VERIFIED'] == before.get('VERIFIED', 0) + 2
@@ -0,0 +1,61 @@
+"""Merkle inclusion proofs tie each verified certificate to a ledger block."""
+import hashlib
+
+import pytest
+from sqlalchemy import text
+
+from models.models import db
+from utils.ledger import (anchor_pending, inclusion_proof, leaf_hash, merkle_root, verify_chain,
+                          verify_proof)
+
+
+def cert_hashes(count):
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(count)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 4, 5, 8, 9])
+def test_every_leaf_proves_inclusion(size):
+    hashes = cert_hashes(size)
+    leaves = [leaf_hash(h) for h in hashes]
+    root = merkle_root(leaves)
+    for index, cert_hash in enumerate(hashes):
+        assert verify_proof(cert_hash, inclusion_proof(leaves, index), root)
+
+
+def test_proof_rejects_other_hash_and_tampered_sibling():
+    hashes = cert_hashes(5)
+    leaves = [leaf_hash(h) for h in hashes]
+    root = merkle_root(leaves)
+    proof = inclusion_proof(leaves, 2)
+    assert not verify_proof(hashes[3], proof, root)
+    tampered = [dict(step) for step in proof]
+    tampered[0]['hash'] = 'ff' * 32
+    assert not verify_proof(hashes[2], tampered, root)
+
+
+def test_certificate_proof_endpoint(app, client, verification_requests):
+    _, university, ids = verification_requests(3)
+    decided = client.post('/university/verify-requests', headers=university, json={'decisions': [
+        {'id': i, 'status': 'VERIFIED'} for i in ids]}).get_json()['results']
+    cert_hash = decided[1]['cert_hash']
+    assert client.get(f'/university/certificate-proof/{cert_hash}').status_code == 202  # not anchored yet
+
+    with app.app_context():
+        while anchor_pending() is not None:
+            pass
+        assert verify_chain() is None
+    body = client.get(f'/university/certificate-proof/{cert_hash}').get_json()
+    assert body['anchored'] and body['cert_hash'] == cert_hash
+    assert verify_proof(cert_hash, body['proof'], body['block']['merkle_root'])
+
+    # an entry rewritten after anchoring no longer matches its block
+    with app.app_context():
+        db.session.execute(text("UPDATE ledger_entry SET cert_hash = :h WHERE cert_hash = :c"),
+                           {'h': 'ab' * 32, 'c': cert_hash})
+        db.session.commit()
+        try:
+            assert verify_chain() == body['block']['height']
+        finally:
+            db.session.execute(text("UPDATE ledger_entry SET cert_hash = :c WHERE cert_hash = :h"),
+                               {'h': 'ab' * 32, 'c': cert_hash})
+            db.session.commit()
@@ -0,0 +1,43 @@
+"""Write paths must not act on a profile cached before another worker changed it."""
+from sqlalchemy import text
+
+from models.models import db
+
+
+def rename_elsewhere(app, university_id, name):
+    # A direct write skips this process's cache invalidation, like a rename served by another worker
+    with app.app_context():
+        db.session.execute(text("UPDATE university SET uni_name = :n WHERE id = :i"), {'n': name, 'i': university_id})
+        db.session.commit()
+
+
+def test_certificate_uses_current_university_name(app, client, register):
+    employer = register('stale-name-employer@example.com', 'employer', name='Acme')
+    university = register('stale-name-uni@example.com', 'university', name='Old Name')
+    university_id = client.get('/university/profile', headers=university).get_json()['id']  # now cached
+    request_id = client.post('/employer/request-verifications', headers=employer, json={'requests': [
+        {'university_id': university_id, 'student_name': s, 'degree': 'BSc', 'year': 2021} for s in 'ab']}
+    ).get_json()['results']
+
+    rename_elsewhere(app, university_id, 'New Name')
+    single = client.post(f'/university/verify-request/{request_id[0]["id"]}', headers=university,
+                         json={'status': 'VERIFIED'})
+    assert single.status_code == 200
+    bulk = client.post('/university/verify-requests', headers=university,
+                       json={'decisions': [{'id': request_id[1]['id'], 'status': 'VERIFIED'}]})
+    assert bulk.get_json()['processed'] == 1
+
+    for item in request_id:
+        certificate = client.get(f'/university/certificate/{item["id"]}', headers=university).get_json()
+        assert (certificate['university'], certificate['hash_valid']) == ('New Name', True)
+
+
+def test_profile_update_reads_the_row(app, client, register):
+    university = register('stale-rename-uni@example.com', 'university', name='First')
+    university_id = client.get('/university/profile', headers=university).get_json()['id']
+    rename_elsewhere(app, university_id, 'Second')
+    # Renaming back to the cached name is still a rename
+    client.put('/university/profile', headers=university, json={'uni_name': 'First'})
+    with app.app_context():
+        assert db.session.execute(text("SELECT uni_name FROM university WHERE id = :i"),
+                                  {'i': university_id}).scalar() == 'First'
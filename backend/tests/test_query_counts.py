@@ -0,0 +1,81 @@
+"""The application listings must not issue a query per row (N+1)."""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from models.models import db
+
+N = 12
+
+
+@contextmanager
+def count_queries(app):
+    counter = {'count': 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter['count'] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def listing_queries(app, client, url, headers):
+    # The first call warms the per-process profile and revocation caches
+    assert client.get(url, headers=headers).status_code == 200
+    with count_queries(app) as counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return counter['count'], len(response.get_json())
+
+
+@pytest.fixture
+def employer(register, request):
+    # the database is shared by the whole session
+    return register(f'{request.node.name}@example.com', 'employer', company_name='Acme')
+
+
+def create_job(client, employer, title):
+    response = client.post('/employer/jobs', json={'title': title, 'description': 'Build things'},
+                           headers=employer)
+    assert response.status_code == 201
+    return response.get_json()['job_id']
+
+
+def apply(client, applicant, job_id):
+    response = client.post(f'/applicant/apply-job/{job_id}', json={'cover_letter': 'Hello'}, headers=applicant)
+    assert response.status_code == 201
+
+
+def test_applicant_applications_constant_queries(app, client, register, employer):
+    jobs = [create_job(client, employer, f'Job {i}') for i in range(N)]
+    one = register('one@example.com', 'applicant', full_name='One')
+    many = register('many@example.com', 'applicant', full_name='Many')
+    apply(client, one, jobs[0])
+    for job_id in jobs:
+        apply(client, many, job_id)
+
+    queries_one, rows_one = listing_queries(app, client, '/applicant/applications', one)
+    queries_many, rows_many = listing_queries(app, client, '/applicant/applications', many)
+    assert (rows_one, rows_many) == (1, N)
+    assert queries_many == queries_one
+
+
+def test_job_applications_constant_queries(app, client, register, employer):
+    small_job = create_job(client, employer, 'Small')
+    big_job = create_job(client, employer, 'Big')
+    for i in range(N):
+        applicant = register(f'applicant{i}@example.com', 'applicant', full_name=f'Applicant {i}')
+        if i == 0:
+            apply(client, applicant, small_job)
+        apply(client, applicant, big_job)
+
+    queries_one, rows_one = listing_queries(app, client, f'/employer/job/{small_job}/applications', employer)
+    queries_many, rows_many = listing_queries(app, client, f'/employer/job/{big_job}/applications', employer)
+    assert (rows_one, rows_many) == (1, N)
+    assert queries_many == queries_one
@@ -0,0 +1,42 @@
+"""?rank=relevance reads extracted resume text; extraction happens in a task, not the GET."""
+import io
+
+from sqlalchemy import event
+
+from models.models import db
+from utils.tasks import get_task_queue
+
+
+def test_ranking_is_read_only_and_uses_extracted_text(app, client, register):
+    employer = register('ranking-employer@example.com', 'employer', name='Acme')
+    job_id = client.post('/employer/jobs', headers=employer, json={
+        'title': 'Python backend developer', 'description': 'Flask SQLAlchemy postgres'}).get_json()['job_id']
+    for name, resume in (('ranking-plain', None), ('ranking-resume', b'Python Flask SQLAlchemy postgres developer')):
+        headers = register(f'{name}@example.com', 'applicant', name=name)
+        if resume:
+            assert client.post('/applicant/upload-resume', headers=headers, content_type='multipart/form-data',
+                               data={'resume': (io.BytesIO(resume), 'cv.txt')}).status_code == 200
+        client.post(f'/applicant/apply-job/{job_id}', headers=headers, json={'cover_letter': 'Hello'})
+    url = f'/employer/job/{job_id}/applications?rank=relevance&fields=applicant_name'
+
+    writes = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        if not statement.lstrip().upper().startswith('SELECT'):
+            writes.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        before = client.get(url, headers=employer)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert before.status_code == 200
+    assert writes == []
+    # not extracted yet: both score on the cover letter alone
+    assert {row['score'] for row in before.get_json()} == {0}
+
+    with app.app_context():
+        get_task_queue(app).run_pending()
+    ranked = client.get(url, headers=employer).get_json()
+    assert ranked[0]['applicant_name'] == 'ranking-resume' and ranked[0]['score'] > 0
@@ -0,0 +1,31 @@
+"""A logout on one worker is honoured by the others without a query per request."""
+from sqlalchemy import event
+
+from app import create_app
+from models.models import db
+
+
+def test_logout_reaches_other_workers(app, client, register):
+    # a second app in this process stands in for another worker sharing the stamp file
+    other = create_app(start_background=False).test_client()
+    headers = register('revoked@example.com', 'applicant')
+    assert other.get('/applicant/profile', headers=headers).status_code == 200
+    assert client.post('/auth/logout', headers=headers).status_code == 200
+    assert other.get('/applicant/profile', headers=headers).status_code == 401
+
+
+def test_current_cache_answers_without_queries(app, client, register):
+    headers = register('still-valid@example.com', 'applicant')
+    assert client.get('/applicant/profile', headers=headers).status_code == 200
+    queries = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda *args: queries.append(args[2])  # noqa: E731
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        assert client.get('/applicant/profile', headers=headers).status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert queries == []
+    with open(app.config['JWT_REVOCATION_STAMP_PATH'], 'rb') as f:
+        assert len(f.read()) == 8
@@ -0,0 +1,84 @@
+"""Background tasks: retried with growing backoff, FAILED after max_attempts, deduplicated by key."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.models import db, Task
+from utils.tasks import TaskWorkerPool, enqueue, task
+
+calls = []
+
+
+@task('test_flaky', max_attempts=3)
+def flaky(succeed_on):
+    calls.append(datetime.utcnow())
+    if len(calls) < succeed_on:
+        raise RuntimeError(f"attempt {len(calls)} failed")
+
+
+@pytest.fixture
+def pool(app):
+    calls.clear()
+    pool = TaskWorkerPool(app, workers=0, backoff_seconds=10, max_backoff_seconds=25)
+    with app.app_context():
+        pool.run_pending()  # whatever earlier tests queued
+        yield pool
+
+
+def run_due(pool, task_id):
+    """Make the task due now and run it; returns the row afterwards."""
+    db.session.execute(db.update(Task).where(Task.id == task_id).values(run_at=datetime.utcnow()))
+    db.session.commit()
+    assert pool.run_one()
+    db.session.expire_all()
+    return db.session.get(Task, task_id)
+
+
+def test_retries_with_backoff_until_success(pool):
+    queued = enqueue('test_flaky', {'succeed_on': 3})
+    db.session.commit()
+    task_id = queued.id
+
+    first = run_due(pool, task_id)
+    assert (first.status, first.attempts, first.last_error) == ('PENDING', 1, 'RuntimeError: attempt 1 failed')
+    # 10s * 2**0, with jitter between half and all of it
+    assert timedelta(seconds=4.9) <= first.run_at - datetime.utcnow() <= timedelta(seconds=10)
+    assert not pool.run_one()  # not due yet
+
+    second = run_due(pool, task_id)
+    assert (second.status, second.attempts) == ('PENDING', 2)
+    assert timedelta(seconds=9.9) <= second.run_at - datetime.utcnow() <= timedelta(seconds=20)
+
+    third = run_due(pool, task_id)
+    assert (third.status, third.attempts, third.last_error, third.locked_by) == ('SUCCEEDED', 3, None, None)
+    assert len(calls) == 3
+
+
+def test_fails_permanently_after_max_attempts(pool):
+    queued = enqueue('test_flaky', {'succeed_on': 10})
+    db.session.commit()
+    task_id = queued.id
+    for _ in range(3):
+        row = run_due(pool, task_id)
+    assert (row.status, row.attempts) == ('FAILED', 3)
+    assert not pool.run_one()
+
+
+def test_backoff_is_capped(pool):
+    assert all(12.5 <= pool.backoff(10) <= 25 for _ in range(20))
+
+
+def test_idempotency_key_enqueues_once(pool):
+    first = enqueue('test_flaky', {'succeed_on': 1}, key='test-idempotent')
+    second = enqueue('test_flaky', {'succeed_on': 1}, key='test-idempotent')
+    db.session.commit()
+    assert first.id == second.id
+    assert Task.query.filter_by(idempotency_key='test-idempotent').count() == 1
+    assert pool.run_pending() == 1 and calls
+    # a finished task still holds its key
+    assert enqueue('test_flaky', {'succeed_on': 1}, key='test-idempotent').id == first.id
+
+
+def test_unknown_task_name_is_rejected(pool):
+    with pytest.raises(KeyError):
+        enqueue('no_such_task')
@@ -0,0 +1,259 @@
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from contextlib import contextmanager
+from flask import current_app, send_file
+from sqlalchemy import update, delete
+from models.models import db, ResumeBlob, ResumeText
+from utils.tasks import task
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to an in-process lock only
+    fcntl = None
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+class StagedBlob:
+    """An upload written to a temp file and hashed, not yet visible in the store."""
+
+    def __init__(self, sha256, size, temp_path):
+        self.sha256 = sha256
+        self.size = size
+        self.temp_path = temp_path
+
+
+class BlobStore:
+    """
+    Content-addressed file store: <root>/<aa>/<bb>/<sha256>.
+    Identical uploads map to the same file; ResumeBlob.ref_count tracks users.
+    """
+
+    def __init__(self, root, max_bytes, chunk_size=64 * 1024):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._thread_lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, 'tmp'), exist_ok=True)
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def hash_from_path(self, path):
+        """Return the content hash if path points into this store, else None."""
+        if not path:
+            return None
+        name = os.path.basename(path)
+        if _SHA256_RE.match(name) and os.path.abspath(path) == self.path_for(name):
+            return name
+        return None
+
+    def write_stream(self, stream):
+        """Copy a file-like object to a temp file in chunks, hashing as it goes."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise FileTooLarge()
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return StagedBlob(digest.hexdigest(), size, temp_path)
+
+    def discard(self, staged):
+        if os.path.exists(staged.temp_path):
+            os.remove(staged.temp_path)
+
+    @contextmanager
+    def lock(self):
+        """
+        Serialises "commit refcount + place file" against "check refcount + unlink"
+        so a blob can't be deleted while another upload is re-adding it.
+        """
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def place(self, staged):
+        """Move a staged upload to its content address (call with the lock held)."""
+        final_path = self.path_for(staged.sha256)
+        if os.path.exists(final_path):
+            os.remove(staged.temp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(staged.temp_path, final_path)
+        return final_path
+
+    def unlink_if_unreferenced(self, sha256):
+        """Delete the file once no ResumeBlob row references it any more."""
+        with self.lock():
+            if db.session.query(ResumeBlob.sha256).filter_by(sha256=sha256).first():
+                return False
+            try:
+                os.remove(self.path_for(sha256))
+            except FileNotFoundError:
+                pass
+            return True
+
+
+def acquire_blob(staged, content_type=None):
+    """Add one reference to a blob inside the current transaction."""
+    result = db.session.execute(
+        update(ResumeBlob).where(ResumeBlob.sha256 == staged.sha256)
+        .values(ref_count=ResumeBlob.ref_count + 1)
+    )
+    if result.rowcount == 0:
+        db.session.add(ResumeBlob(sha256=staged.sha256, size=staged.size,
+                                  content_type=content_type, ref_count=1))
+
+
+def release_blob(sha256):
+    """Drop one reference; the row disappears when the count reaches zero."""
+    db.session.execute(
+        update(ResumeBlob).where(ResumeBlob.sha256 == sha256)
+        .values(ref_count=ResumeBlob.ref_count - 1)
+    )
+    removed = db.session.execute(
+        delete(ResumeBlob).where(ResumeBlob.sha256 == sha256, ResumeBlob.ref_count <= 0)
+    )
+    if removed.rowcount:
+        db.session.execute(delete(ResumeText).where(ResumeText.sha256 == sha256))
+
+
+@task('remove_resume_file')
+def remove_resume_file(path, sha256=None):
+    """Unlink a no-longer-used resume: shared blobs only when the last reference is gone."""
+    if sha256:
+        get_blob_store(current_app).unlink_if_unreferenced(sha256)
+        return
+    # Files uploaded before the content-addressed store have a single owner
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def init_blob_store(app):
+    root = app.config.get('UPLOAD_FOLDER', 'uploads/resumes')
+    if not os.path.isabs(root):
+        root = os.path.join(app.root_path, root)
+    app.extensions['blob_store'] = BlobStore(
+        os.path.join(root, 'blobs'),
+        max_bytes=app.config.get('RESUME_MAX_BYTES', 10 * 1024 * 1024),
+    )
+
+
+def get_blob_store(app):
+    return app.extensions['blob_store']
+
+
+
+def _resume_mimetype(path, blob):
+    if blob is not None and blob.content_type:
+        return blob.content_type
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def resume_download_name(applicant_id, mimetype):
+    return f"resume_{applicant_id}{mimetypes.guess_extension(mimetype) or ''}"
+
+
+def send_resume(applicant):
+    """
+    Build a conditional file response for an applicant's resume, or None if
+    there is no file. Werkzeug handles Range and If-None-Match; the body goes
+    out via wsgi.file_wrapper (sendfile) or X-Sendfile when USE_X_SENDFILE is on.
+    """
+    path = applicant.resume_path
+    if not path or not os.path.exists(path):
+        return None
+    sha256 = get_blob_store(current_app).hash_from_path(path)
+    blob = db.session.get(ResumeBlob, sha256) if sha256 else None
+    mimetype = _resume_mimetype(path, blob)
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=resume_download_name(applicant.id, mimetype),
+        conditional=True,
+        # Blob names are content hashes, which makes them ideal strong ETags
+        etag=sha256 or True,
+    )
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class _ChunkSink:
+    """Write-only file object that lets zipfile output be drained as it is produced."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_resume_zip(applicants, chunk_size=64 * 1024):
+    """
+    Yield a ZIP archive of the given applicants' resumes piece by piece.
+    Files are stored uncompressed (PDF/DOCX already are) and read in chunks,
+    so memory use stays flat no matter how many resumes there are.
+    """
+    store = get_blob_store(current_app)
+    hashes = [store.hash_from_path(a.resume_path) for a in applicants]
+    blobs = {b.sha256: b for b in
+             ResumeBlob.query.filter(ResumeBlob.sha256.in_([h for h in hashes if h])).all()}
+    entries = []
+    for applicant, sha256 in zip(applicants, hashes):
+        if applicant.resume_path and os.path.exists(applicant.resume_path):
+            mimetype = _resume_mimetype(applicant.resume_path, blobs.get(sha256))
+            entries.append((applicant.resume_path, resume_download_name(applicant.id, mimetype)))
+
+    def generate():
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for path, name in entries:
+                with open(path, 'rb') as src, archive.open(name, 'w', force_zip64=True) as dest:
+                    for chunk in iter(lambda: src.read(chunk_size), b''):
+                        dest.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+        # local headers/data descriptors and the central directory
+        yield sink.drain()
+
+    return generate()
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from itertools import islice
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from models.models import db, User, Applicant, Employer, University
+
+# role -> (profile model, column that receives the "name" field)
+PROFILE_NAME_COLUMNS = {
+    'applicant': (Applicant, 'full_name'),
+    'employer': (Employer, 'company_name'),
+    'university': (University, 'uni_name'),
+}
+
+
+def iter_rows(stream, fmt):
+    """Yield (line_number, dict) from a CSV (with header) or JSONL byte stream."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else {'__invalid__': True}
+
+
+def _validate(row, allowed_roles):
+    if row.get('__invalid__'):
+        return "Malformed row"
+    # JSONL values can be any type; everything after this assumes strings
+    for key in ('email', 'password'):
+        value = row.get(key)
+        if not isinstance(value, str) or not value.strip():
+            return "email and password are required"
+    role = row.get('role')
+    if not isinstance(role, str) or role not in allowed_roles:
+        return f"role must be one of: {', '.join(sorted(allowed_roles))}"
+    if row.get('name') is not None and not isinstance(row.get('name'), str):
+        return "name must be a string"
+    return None
+
+
+def _insert(pending, hashes):
+    """Insert users and their profiles for [(line, email, row)] in the current transaction."""
+    db.session.execute(insert(User), [
+        {"email": email, "password": pw_hash, "role": row['role']}
+        for (_, email, row), pw_hash in zip(pending, hashes)
+    ])
+    ids = dict(db.session.query(User.email, User.id)
+               .filter(User.email.in_([email for _, email, _ in pending])).all())
+    for role, (model, name_column) in PROFILE_NAME_COLUMNS.items():
+        profiles = [{"user_id": ids[email], name_column: row.get('name')}
+                    for _, email, row in pending if row['role'] == role]
+        if profiles:
+            db.session.execute(insert(model), profiles)
+
+
+def import_users(stream, fmt, hasher, allowed_roles=None, batch_size=500):
+    """
+    Create users (and their role profiles) from a CSV/JSONL stream.
+    Each batch is validated, hashed in parallel and inserted with executemany
+    in its own transaction; bad rows are reported and skipped, never fatal.
+    """
+    allowed_roles = set(allowed_roles or PROFILE_NAME_COLUMNS)
+    created = 0
+    errors = []
+    rows = iter_rows(stream, fmt)
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        valid = []
+        seen = set()
+        for line_number, row in batch:
+            error = _validate(row, allowed_roles)
+            email = row['email'].strip() if not error else None
+            # Exact match, like registration and the unique index on user.email
+            if not error and email in seen:
+                error = "Duplicate email in upload"
+            if error:
+                errors.append({"line": line_number, "email": row.get('email'), "error": error})
+                continue
+            seen.add(email)
+            valid.append((line_number, email, row))
+
+        # One query per batch to find accounts that already exist
+        existing = {e for (e,) in db.session.query(User.email)
+                    .filter(User.email.in_([email for _, email, _ in valid])).all()}
+        pending = []
+        for line_number, email, row in valid:
+            if email in existing:
+                errors.append({"line": line_number, "email": email, "error": "Email already registered"})
+            else:
+                pending.append((line_number, email, row))
+        if not pending:
+            continue
+
+        hashes = hasher.hash_many([row['password'] for _, _, row in pending])
+        try:
+            _insert(pending, hashes)
+            db.session.commit()
+            created += len(pending)
+        except IntegrityError:
+            # Someone registered one of these emails meanwhile: redo the batch
+            # row by row so only the conflicting rows fail. The error text
+            # carries the bound parameters (password hashes), so it is not returned.
+            db.session.rollback()
+            for item, pw_hash in zip(pending, hashes):
+                try:
+                    _insert([item], [pw_hash])
+                    db.session.commit()
+                    created += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    errors.append({"line": item[0], "email": item[1], "error": "Email already registered"})
+
+    errors.sort(key=lambda e: e['line'])
+    return {"created": created, "failed": len(errors), "errors": errors}
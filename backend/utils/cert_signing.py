@@ -0,0 +1,133 @@
+import base64
+import hashlib
+import hmac
+import os
+from datetime import datetime
+import jwt
+from flask import current_app
+from sqlalchemy import select
+from models.models import db, VerificationRequest, CertificateRevocation
+from utils.ttl_cache import TTLCache
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+except ImportError:  # HS256 still works, but tokens can only be checked by this server
+    Ed25519PrivateKey = None
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+class CertificateSigner:
+    """
+    Issues compact signed certificate tokens (JWS). With EdDSA anyone holding
+    the published public key can check a certificate without calling us.
+    """
+
+    def __init__(self, algorithm, issuer, key_path=None, secret=None):
+        self.algorithm = algorithm
+        self.issuer = issuer
+        if algorithm == 'EdDSA':
+            if Ed25519PrivateKey is None:
+                raise RuntimeError("CERT_SIGNING_ALGORITHM=EdDSA requires the 'cryptography' package")
+            self._private_key = self._load_or_create_key(key_path)
+            self._public_key = self._private_key.public_key()
+            raw = self._public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            self.kid = hashlib.sha256(raw).hexdigest()[:16]
+            self._jwk = {"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw),
+                         "kid": self.kid, "alg": "EdDSA", "use": "sig"}
+        elif algorithm == 'HS256':
+            self._private_key = self._public_key = secret.encode()
+            self.kid = hmac.new(self._private_key, b'kid', hashlib.sha256).hexdigest()[:16]
+            self._jwk = None
+        else:
+            raise ValueError(f"Unsupported CERT_SIGNING_ALGORITHM: {algorithm}")
+
+    @staticmethod
+    def _load_or_create_key(path):
+        try:
+            # O_EXCL: when several workers start together exactly one creates the key
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            with open(path, 'rb') as f:
+                return serialization.load_pem_private_key(f.read(), password=None)
+        key = Ed25519PrivateKey.generate()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                      serialization.NoEncryption()))
+        return key
+
+    def issue(self, student_name, degree, year, university, cert_hash):
+        payload = {
+            "iss": self.issuer,
+            "sub": cert_hash,
+            "student_name": student_name,
+            "degree": degree,
+            "year": year,
+            "university": university,
+            "iat": int(datetime.utcnow().timestamp()),
+        }
+        return jwt.encode(payload, self._private_key, algorithm=self.algorithm, headers={"kid": self.kid})
+
+    def verify(self, token):
+        """Decoded payload if the signature is ours, else raises jwt.InvalidTokenError."""
+        return jwt.decode(token, self._public_key, algorithms=[self.algorithm], issuer=self.issuer,
+                          options={"require": ["sub", "iat"]})
+
+    def key_set(self):
+        """Public JWKS; empty for HS256 because the key is a shared secret."""
+        return {"keys": [self._jwk] if self._jwk else []}
+
+
+def get_signer():
+    return current_app.extensions['certificate_signer']
+
+
+def revoked_hashes():
+    """
+    Hashes of certificates that were withdrawn after being issued and are not
+    VERIFIED again under another request. Cached, so checks don't hit the DB.
+    """
+    cache = current_app.extensions['revocation_list_cache']
+    revoked = cache.get('revoked')
+    if revoked is None:
+        still_verified = (select(VerificationRequest.cert_hash)
+                          .where(VerificationRequest.status == 'VERIFIED',
+                                 VerificationRequest.cert_hash.isnot(None)))
+        revoked = frozenset(h for (h,) in db.session.query(CertificateRevocation.cert_hash)
+                            .filter(CertificateRevocation.cert_hash.notin_(still_verified))
+                            .distinct().all())
+        cache.set('revoked', revoked)
+    return revoked
+
+
+def record_revocations(cert_hashes):
+    """Add revocation rows in the caller's transaction; the cached list is dropped."""
+    cert_hashes = [h for h in cert_hashes if h]
+    if not cert_hashes:
+        return
+    db.session.add_all([CertificateRevocation(cert_hash=h) for h in cert_hashes])
+    current_app.extensions['revocation_list_cache'].clear()
+
+
+def reinstate_certificates(cert_hashes):
+    """Call after committing VERIFIED decisions: a hash revoked earlier stops being listed."""
+    cache = current_app.extensions['revocation_list_cache']
+    revoked = cache.get('revoked')
+    if revoked is not None and not revoked.isdisjoint(cert_hashes):
+        cache.clear()
+
+
+def init_certificate_signer(app):
+    key_path = app.config.get('CERT_SIGNING_KEY_PATH') or os.path.join(app.instance_path, 'cert_signing_key.pem')
+    os.makedirs(os.path.dirname(key_path), exist_ok=True)
+    app.extensions['certificate_signer'] = CertificateSigner(
+        algorithm=app.config.get('CERT_SIGNING_ALGORITHM', 'EdDSA'),
+        issuer=app.config.get('CERT_TOKEN_ISSUER', 'tu-backend'),
+        key_path=key_path,
+        secret=app.config.get('CERT_SIGNING_SECRET') or app.config['SECRET_KEY'],
+    )
+    app.extensions['revocation_list_cache'] = TTLCache(ttl=app.config.get('CERT_REVOCATION_LIST_TTL', 60),
+                                                       max_size=1)
@@ -0,0 +1,125 @@
+import hashlib
+import os
+from flask import current_app
+from models.models import db, VerificationRequest, University
+from utils.helpers import generate_hash
+from utils.ttl_cache import TTLCache
+from utils.stamp import Stamp
+
+
+class CertificateResult:
+    """A fully rendered public verification response, ready to be cached."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        # the app's provider (orjson when enabled) sorts keys too, so the ETag stays stable
+        self.body = current_app.json.dumps(payload)
+        self.etag = hashlib.sha256(self.body.encode()).hexdigest()[:32]
+
+
+def _verify_from_db(cert_hash):
+    # Join the issuing university so the hash is recomputed with its real name
+    row = (db.session.query(VerificationRequest, University.uni_name)
+           .join(University, University.id == VerificationRequest.university_id)
+           .filter(VerificationRequest.cert_hash == cert_hash)
+           .order_by(VerificationRequest.status != 'VERIFIED', VerificationRequest.id)
+           .first())
+    if row is None:
+        return CertificateResult(404, {"error": "Certificate not found"})
+
+    req, uni_name = row
+    if req.status != 'VERIFIED':
+        return CertificateResult(400, {"error": "Certificate is not verified"})
+
+    hash_valid = generate_hash(req.student_name, uni_name, req.degree, req.year) == req.cert_hash
+    if not hash_valid:
+        return CertificateResult(400, {"error": "Certificate hash is invalid (tampering detected)"})
+
+    return CertificateResult(200, {
+        "student_name": req.student_name,
+        "degree": req.degree,
+        "year": req.year,
+        "university": uni_name,
+        "cert_hash": req.cert_hash,
+        "hash_valid": hash_valid,
+        "issued_date": req.updated_at.isoformat() if req.updated_at else None,
+        "message": "Certificate verified successfully"
+    })
+
+
+class CertificateCache(TTLCache):
+    """
+    Rendered verdicts by hash. Withdrawing a verdict (rejecting a verified
+    certificate, renaming its university) bumps a Stamp shared by the
+    workers on this host, and each worker empties its cache when it sees the
+    stamp move, so none keeps answering "verified" for a withdrawn one.
+    """
+
+    def __init__(self, ttl=300, max_size=50000, stamp_path=None):
+        super().__init__(ttl=ttl, max_size=max_size)
+        self._stamp = Stamp(stamp_path) if stamp_path else None
+        self._seen = self._stamp.read() if self._stamp else None
+
+    def generation(self):
+        """Current stamp value; emptied first if another worker moved it."""
+        if self._stamp is None:
+            return None
+        current = self._stamp.read()
+        if current != self._seen:
+            self.clear()
+            self._seen = current
+        return current
+
+    def store(self, cert_hash, result, generation, ttl=None):
+        # A withdrawal committed while the verdict was rendered may not be in it
+        if self.generation() == generation:
+            self.set(cert_hash, result, ttl=ttl)
+
+    def withdraw(self):
+        if self._stamp is not None:
+            self._stamp.bump()
+
+
+def lookup_certificate(cert_hash):
+    """
+    Cached public verification. Valid certificates are cached for
+    CERT_CACHE_TTL seconds; unknown/invalid hashes for the shorter
+    CERT_NEGATIVE_CACHE_TTL so a newly verified certificate shows up quickly.
+    """
+    cache = current_app.extensions['certificate_cache']
+    generation = cache.generation()
+    result = cache.get(cert_hash)
+    if result is None:
+        result = _verify_from_db(cert_hash)
+        ttl = None if result.status_code == 200 else current_app.config.get('CERT_NEGATIVE_CACHE_TTL', 30)
+        cache.store(cert_hash, result, generation, ttl=ttl)
+    return result
+
+
+def invalidate_certificate(cert_hash=None, withdrawn=False):
+    """
+    Drop one hash (e.g. just verified), or everything when a university is
+    renamed. Call after the commit. withdrawn=True (implied for everything)
+    when the hash may be cached as valid elsewhere: every worker drops its
+    cache, not just this one.
+    """
+    cache = current_app.extensions['certificate_cache']
+    if cert_hash is None:
+        cache.clear()
+        withdrawn = True
+    else:
+        cache.invalidate(cert_hash)
+    if withdrawn:
+        cache.withdraw()
+
+
+def init_certificate_cache(app):
+    stamp_path = app.config.get('CERT_CACHE_STAMP_PATH')
+    if stamp_path is None:
+        os.makedirs(app.instance_path, exist_ok=True)
+        stamp_path = os.path.join(app.instance_path, 'certificates.stamp')
+    app.extensions['certificate_cache'] = CertificateCache(
+        ttl=app.config.get('CERT_CACHE_TTL', 300),
+        max_size=app.config.get('CERT_CACHE_SIZE', 50000),
+        stamp_path=stamp_path or None,
+    )
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from sqlalchemy import update, insert, delete, select, func
+from sqlalchemy.exc import IntegrityError
+from models.models import db, Job, JobApplication, VerificationRequest, JobApplicationCounter, VerificationRequestCounter
+
+
+def _adjust(model, key_column, deltas):
+    """Add {(key, status): delta} to the counter rows inside the current transaction."""
+    key_attr = getattr(model, key_column)
+    for (key, status), delta in deltas.items():
+        if not delta:
+            continue
+        bump = (update(model).where(key_attr == key, model.status == status)
+                .values(value=model.value + delta).execution_options(synchronize_session=False))
+        if db.session.execute(bump).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(model).values({key_column: key, 'status': status, 'value': delta}))
+        except IntegrityError:
+            # created concurrently; it exists now
+            db.session.execute(bump)
+
+
+def _changes(items):
+    deltas = defaultdict(int)
+    for key, old_status, new_status in items:
+        if old_status == new_status:
+            continue
+        if old_status is not None:
+            deltas[(key, old_status)] -= 1
+        if new_status is not None:
+            deltas[(key, new_status)] += 1
+    return deltas
+
+
+def count_application(job_id, old_status=None, new_status=None):
+    """Record an application added (old None), withdrawn (new None) or moved between statuses."""
+    _adjust(JobApplicationCounter, 'job_id', _changes([(job_id, old_status, new_status)]))
+
+
+def count_verifications(changes):
+    """Record [(employer_id, old_status, new_status)] for created or decided verification requests."""
+    _adjust(VerificationRequestCounter, 'employer_id', _changes(changes))
+
+
+def forget_job(job_id):
+    db.session.execute(delete(JobApplicationCounter).where(JobApplicationCounter.job_id == job_id))
+
+
+def application_counts(job_ids):
+    """{job_id: {status: count}} for the given jobs (statuses with no applications are left out)."""
+    counts = defaultdict(dict)
+    if job_ids:
+        for job_id, status, value in db.session.execute(
+                select(JobApplicationCounter.job_id, JobApplicationCounter.status, JobApplicationCounter.value)
+                .where(JobApplicationCounter.job_id.in_(job_ids))):
+            counts[job_id][status] = value
+    return counts
+
+
+def employer_application_totals(employer_id):
+    """{status: count} over all of an employer's jobs."""
+    return dict(db.session.execute(
+        select(JobApplicationCounter.status, func.sum(JobApplicationCounter.value))
+        .join(Job, Job.id == JobApplicationCounter.job_id)
+        .where(Job.employer_id == employer_id)
+        .group_by(JobApplicationCounter.status)).all())
+
+
+def verification_counts(employer_id):
+    return dict(db.session.execute(
+        select(VerificationRequestCounter.status, VerificationRequestCounter.value)
+        .where(VerificationRequestCounter.employer_id == employer_id)).all())
+
+
+def rebuild_counters():
+    """
+    Recompute every counter from the rows themselves in one transaction.
+    Returns the number of (job, status) and (employer, status) rows written.
+    """
+    db.session.execute(delete(JobApplicationCounter))
+    db.session.execute(delete(VerificationRequestCounter))
+    applications = db.session.execute(insert(JobApplicationCounter).from_select(
+        ['job_id', 'status', 'value'],
+        select(JobApplication.job_id, JobApplication.status, func.count())
+        .join(Job, Job.id == JobApplication.job_id)
+        .group_by(JobApplication.job_id, JobApplication.status))).rowcount
+    verifications = db.session.execute(insert(VerificationRequestCounter).from_select(
+        ['employer_id', 'status', 'value'],
+        select(VerificationRequest.employer_id, VerificationRequest.status, func.count())
+        .group_by(VerificationRequest.employer_id, VerificationRequest.status))).rowcount
+    db.session.commit()
+    return applications, verifications
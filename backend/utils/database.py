@@ -0,0 +1,78 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from utils.migrations import upgrade
+from utils.search import init_job_search
+
+_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def configure_engine(app, db):
+    """Install per-connection tuning and log the effective engine settings."""
+    engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        journal_mode = app.config.get('SQLITE_JOURNAL_MODE', 'WAL').upper()
+        synchronous = app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+        if synchronous not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {synchronous}")
+        busy_timeout = int(app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+        mmap_size = int(app.config.get('SQLITE_MMAP_SIZE', 0))
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL lets readers proceed while one writer commits; NORMAL only
+            # fsyncs at checkpoints, which is safe in WAL mode
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+            cursor.execute(f"PRAGMA mmap_size={mmap_size}")
+            cursor.close()
+
+        # Connections opened before the listener existed keep default pragmas
+        engine.dispose()
+
+    pool = engine.pool
+    settings = {
+        'url': engine.url.render_as_string(hide_password=True),
+        'dialect': engine.dialect.name,
+        'pool': type(pool).__name__,
+        'pool_size': pool.size() if hasattr(pool, 'size') else None,
+        'max_overflow': getattr(pool, '_max_overflow', None),
+        'pre_ping': pool._pre_ping,
+        'recycle': pool._recycle,
+    }
+    if engine.dialect.name == 'sqlite':
+        try:
+            with engine.connect() as conn:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size'):
+                    settings[pragma] = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+        except OperationalError:
+            # the database directory only exists once `flask init-db` has run
+            settings['connect'] = 'failed'
+    app.logger.info("Database engine: %s",
+                    ', '.join(f"{k}={v}" for k, v in settings.items()))
+    return settings
+
+
+def init_database(app, db, log=None):
+    """
+    Create the schema, apply pending migrations and build the search index.
+    Run once per deploy (`flask init-db`) before starting the server, so
+    workers never race each other on DDL at startup. Call inside an app context.
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if uri.startswith('sqlite:///'):
+        db_dir = os.path.dirname(uri.replace('sqlite:///', ''))
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+    upload_dir = app.config.get('UPLOAD_FOLDER', 'uploads/resumes')
+    if not os.path.isabs(upload_dir):
+        upload_dir = os.path.join(app.root_path, upload_dir)
+    os.makedirs(upload_dir, exist_ok=True)
+
+    db.create_all()
+    # create_all() never alters existing tables; bring older databases up to date
+    applied = upgrade(db, log=log)
+    init_job_search(db)
+    return applied
@@ -1,6 +1,7 @@
-from flask_jwt_extended import get_jwt
+from flask_jwt_extended import get_jwt, get_jwt_identity
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, g
+from utils.profile_cache import load_profile
 
 def role_required(required_role):
     def wrapper(fn):
@@ -8,6 +9,8 @@ def role_required(required_role):
         def decorator(*args, **kwargs):
             claims = get_jwt()
             if claims.get("role") == required_role:
+                # Resolve the caller's role profile once; handlers read g.profile
+                g.profile = load_profile(required_role, int(get_jwt_identity()))
                 return fn(*args, **kwargs)
             return jsonify({"msg": "Access forbidden: Roles only"}), 403
         return decorator
@@ -0,0 +1,243 @@
+import json
+import queue
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+from sqlalchemy import event, select, delete, insert, func
+from sqlalchemy.orm import Session
+from models.models import db, StreamEvent
+
+_buses = weakref.WeakSet()
+
+
+def publish(user_id, name, data):
+    """Push one event to a user's streams once the current transaction commits."""
+    publish_many([(user_id, name, data)])
+
+
+def publish_many(events):
+    """
+    Add [(user_id, name, data)] to the current transaction as StreamEvent
+    rows: delivered when the caller commits, never if it rolls back.
+    """
+    if not events:
+        return
+    db.session.execute(insert(StreamEvent), [
+        {"user_id": user_id, "event": name, "data": json.dumps(data)} for user_id, name, data in events])
+    db.session.info['events_published'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_buses(session):
+    if session.info.pop('events_published', False):
+        for bus in list(_buses):
+            bus.wake()
+
+
+def _format(event_id, name, data):
+    return f"id: {event_id}\nevent: {name}\ndata: {data}\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id, size):
+        self.user_id = user_id
+        self.last_id = 0        # highest event id sent on this stream
+        self.queue = queue.Queue(size)
+        self.dropped = False
+
+    def push(self, row):
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            # Too far behind: end the stream; the client resumes from the table
+            self.dropped = True
+
+
+class EventBus:
+    """
+    Fans StreamEvent rows out to this process's open streams. Events are rows
+    rather than in-memory messages, so every worker process sees them and a
+    reconnecting client replays what it missed after its Last-Event-ID. One
+    thread per process reads new rows (at once after a local commit, otherwise
+    every poll_seconds, and only while someone is subscribed) onto each
+    subscriber's bounded queue. A subscriber that falls behind is disconnected
+    instead of buffering without limit.
+    """
+
+    def __init__(self, app, poll_seconds=1.0, queue_size=100, max_streams=16,
+                 replay_limit=500, retention_hours=24):
+        self.app = app
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self.max_streams = max_streams
+        self.replay_limit = replay_limit
+        self.retention_hours = retention_hours
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set of Subscription
+        self._count = 0
+        self._watermark = None  # highest event id fanned out; None while nobody listens
+        self._wake = threading.Event()
+        _buses.add(self)
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        threading.Thread(target=self._run, name='event-bus', daemon=True).start()
+
+    # -- subscribers --------------------------------------------------------
+
+    def subscribe(self, user_id, last_event_id=None):
+        """
+        Register a stream for user_id. Returns (subscription, backlog), where
+        backlog holds the events after last_event_id (or a single 'reset'
+        event when those can no longer be replayed), or None at max_streams.
+        """
+        sub = Subscription(user_id, self.queue_size)
+        with self._lock:
+            if self._count >= self.max_streams:
+                return None
+            self._subscribers.setdefault(user_id, set()).add(sub)
+            self._count += 1
+        try:
+            # Registered first, so nothing committed from here on can slip between backlog and live events
+            head = db.session.execute(select(func.max(StreamEvent.id))).scalar() or 0
+            with self._lock:
+                self._watermark = head if self._watermark is None else min(self._watermark, head)
+
+            backlog = []
+            if last_event_id:
+                rows = db.session.execute(
+                    select(StreamEvent.id, StreamEvent.event, StreamEvent.data)
+                    .where(StreamEvent.user_id == user_id, StreamEvent.id > last_event_id, StreamEvent.id <= head)
+                    .order_by(StreamEvent.id).limit(self.replay_limit + 1)
+                ).all()
+                # Purging removes the oldest rows; a gap right after last_event_id may have held this user's events
+                oldest = db.session.execute(select(func.min(StreamEvent.id))).scalar() or 0
+                if last_event_id > head or last_event_id + 1 < oldest or len(rows) > self.replay_limit:
+                    backlog = [(head, 'reset', '{}')]
+                else:
+                    backlog = [tuple(row) for row in rows]
+            sub.last_id = last_event_id or 0
+            if not backlog:
+                sub.last_id = max(sub.last_id, head)
+            return sub, backlog
+        except Exception:
+            # a failed query must not leave a slot taken until the process restarts
+            self.unsubscribe(sub)
+            raise
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None and sub in subs:
+                subs.discard(sub)
+                self._count -= 1
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def stream(self, sub, backlog, heartbeat_seconds=15, max_seconds=300):
+        """
+        SSE body for one subscription: the backlog, then live events, with a
+        comment line every heartbeat_seconds so dead connections are noticed.
+        Ends after max_seconds (the client reconnects with Last-Event-ID) or
+        when the subscriber fell behind.
+        """
+        deadline = time.monotonic() + max_seconds
+        try:
+            yield "retry: 3000\n\n"
+            for event_id, name, data in backlog:
+                sub.last_id = max(sub.last_id, event_id)
+                yield _format(event_id, name, data)
+            while not sub.dropped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    row = sub.queue.get(timeout=min(heartbeat_seconds, remaining))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                # the backlog may already have sent it
+                if row.id > sub.last_id:
+                    sub.last_id = row.id
+                    yield _format(row.id, row.event, row.data)
+        finally:
+            self.unsubscribe(sub)
+
+    # -- delivery -----------------------------------------------------------
+
+    def poll(self):
+        """Fan out events committed since the last poll. Returns how many were read."""
+        with self._lock:
+            if not self._subscribers:
+                self._watermark = None
+                return 0
+            since = self._watermark
+        if since is None:
+            since = db.session.execute(select(func.max(StreamEvent.id))).scalar() or 0
+        total = 0
+        while True:
+            rows = db.session.execute(
+                select(StreamEvent.id, StreamEvent.user_id, StreamEvent.event, StreamEvent.data)
+                .where(StreamEvent.id > since).order_by(StreamEvent.id).limit(1000)
+            ).all()
+            db.session.rollback()
+            with self._lock:
+                for row in rows:
+                    for sub in self._subscribers.get(row.user_id, ()):
+                        sub.push(row)
+                if rows:
+                    since = rows[-1].id
+                # A subscriber that joined meanwhile got everything up to its own head from its backlog
+                self._watermark = since
+            total += len(rows)
+            if len(rows) < 1000:
+                return total
+
+    def purge(self):
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        db.session.execute(delete(StreamEvent).where(StreamEvent.created_at < cutoff))
+        db.session.commit()
+
+    def _run(self):
+        last_purge = 0.0
+        failing = False
+        while True:
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    try:
+                        if time.monotonic() - last_purge >= 60:
+                            self.purge()
+                            last_purge = time.monotonic()
+                        self.poll()
+                    finally:
+                        db.session.remove()
+                failing = False
+            except Exception:
+                # once per outage (e.g. before init-db), not every poll
+                if not failing:
+                    self.app.logger.exception("Event bus poll failed")
+                failing = True
+
+
+def init_event_bus(app, start=True):
+    bus = EventBus(
+        app,
+        poll_seconds=app.config.get('SSE_POLL_SECONDS', 1.0),
+        queue_size=app.config.get('SSE_QUEUE_SIZE', 100),
+        max_streams=app.config.get('SSE_MAX_STREAMS', 16),
+        replay_limit=app.config.get('SSE_REPLAY_LIMIT', 500),
+        retention_hours=app.config.get('SSE_RETENTION_HOURS', 24),
+    )
+    app.extensions['event_bus'] = bus
+    if start:
+        bus.start()
+    return bus
+
+
+def get_event_bus(app):
+    return app.extensions['event_bus']
@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+import time
+from flask import g, request, has_request_context, Response
+from sqlalchemy import event
+
+# Request duration histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_log = logging.getLogger('slow_requests')
+
+
+class RequestMetrics:
+    """
+    Per-process aggregates behind /metrics. With several workers each one
+    reports its own numbers; scrape them individually or sum in Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}   # (method, route, status) -> count
+        self._durations = {}  # (method, route) -> [bucket counts..., sum, count]
+        self._sql = {}        # (method, route) -> [queries, seconds]
+
+    def observe(self, method, route, status, seconds, sql_count, sql_seconds):
+        with self._lock:
+            key = (method, route, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            hist = self._durations.setdefault((method, route), [0] * (len(BUCKETS) + 2))
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+            sql = self._sql.setdefault((method, route), [0, 0.0])
+            sql[0] += sql_count
+            sql[1] += sql_seconds
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            requests = dict(self._requests)
+            durations = {k: list(v) for k, v in self._durations.items()}
+            sql = {k: list(v) for k, v in self._sql.items()}
+
+        def labels(**kv):
+            return '{' + ','.join(f'{k}="{v}"' for k, v in kv.items()) + '}'
+
+        lines = ['# HELP http_requests_total Requests handled, by route and status.',
+                 '# TYPE http_requests_total counter']
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f"http_requests_total{labels(method=method, route=route, status=status)} {count}")
+
+        lines += ['# HELP http_request_duration_seconds Request wall time, by route.',
+                  '# TYPE http_request_duration_seconds histogram']
+        for (method, route), hist in sorted(durations.items()):
+            # Buckets are cumulative: hist[i] already counts every observation <= BUCKETS[i]
+            for bound, count in zip(BUCKETS, hist):
+                lines.append(f"http_request_duration_seconds_bucket"
+                             f"{labels(method=method, route=route, le=bound)} {count}")
+            lines.append(f"http_request_duration_seconds_bucket{labels(method=method, route=route, le='+Inf')} "
+                         f"{hist[-1]}")
+            lines.append(f"http_request_duration_seconds_sum{labels(method=method, route=route)} {hist[-2]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{labels(method=method, route=route)} {hist[-1]}")
+
+        lines += ['# HELP db_queries_total SQL statements executed while handling requests, by route.',
+                  '# TYPE db_queries_total counter']
+        for (method, route), (count, _) in sorted(sql.items()):
+            lines.append(f"db_queries_total{labels(method=method, route=route)} {count}")
+        lines += ['# HELP db_query_seconds_total Time spent in SQL while handling requests, by route.',
+                  '# TYPE db_query_seconds_total counter']
+        for (method, route), (_, seconds) in sorted(sql.items()):
+            lines.append(f"db_query_seconds_total{labels(method=method, route=route)} {seconds:.6f}")
+        return '\n'.join(lines) + '\n'
+
+
+def _sql_stats():
+    """The current request's [count, seconds, slow statements], or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get('_sql_stats')
+
+
+def _install_engine_hooks(engine, slow_query_seconds):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['_query_start'].pop()
+        stats = _sql_stats()
+        if stats is None:
+            return
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed >= slow_query_seconds:
+            stats[2].append({"sql": ' '.join(statement.split())[:500], "ms": round(elapsed * 1000, 2)})
+
+
+def init_instrumentation(app, db):
+    """
+    Time every request and the SQL it runs. Adds a Server-Timing header, logs
+    requests slower than SLOW_REQUEST_MS (with statements over SLOW_QUERY_MS)
+    as JSON to the 'slow_requests' logger, and serves /metrics when enabled.
+    Call inside an app context once the engine is configured.
+    """
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return None
+    slow_request = app.config.get('SLOW_REQUEST_MS', 500) / 1000
+    metrics = RequestMetrics()
+    app.extensions['request_metrics'] = metrics
+    _install_engine_hooks(db.engine, app.config.get('SLOW_QUERY_MS', 100) / 1000)
+
+    @app.before_request
+    def start_timer():
+        g._request_start = time.perf_counter()
+        g._sql_stats = [0, 0.0, []]
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('_request_start')
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        sql_count, sql_seconds, slow_queries = g._sql_stats
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+        response.headers.add('Server-Timing', f'db;dur={sql_seconds * 1000:.2f};desc="{sql_count} queries"')
+        response.headers.add('Server-Timing', f'app;dur={(total - sql_seconds) * 1000:.2f}')
+        response.headers.add('Server-Timing', f'total;dur={total * 1000:.2f}')
+        metrics.observe(request.method, route, response.status_code, total, sql_count, sql_seconds)
+
+        if total >= slow_request or slow_queries:
+            slow_log.warning(json.dumps({
+                "event": "slow_request" if total >= slow_request else "slow_query",
+                "method": request.method,
+                "route": route,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(total * 1000, 2),
+                "sql_count": sql_count,
+                "sql_ms": round(sql_seconds * 1000, 2),
+                "slow_queries": slow_queries,
+            }))
+        return response
+
+    if app.config.get('METRICS_ENABLED', True):
+        @app.route('/metrics')
+        def metrics_endpoint():
+            return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
@@ -0,0 +1,40 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder is used instead
+    orjson = None
+
+# Same output as Flask's provider: sorted keys, and dates go through its default()
+_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if orjson else 0)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; encodes straight to bytes for responses."""
+
+    def _options(self):
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        return _OPTIONS | orjson.OPT_INDENT_2 if pretty else _OPTIONS
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # json.dumps-specific arguments (cls=, separators=, ...) need the stdlib
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Switch jsonify()/request.get_json() to orjson when it is installed and FAST_JSON is on."""
+    if orjson is not None and app.config.get('FAST_JSON', True):
+        app.json = OrjsonProvider(app)
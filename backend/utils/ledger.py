@@ -0,0 +1,194 @@
+import hashlib
+import threading
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models.models import db, VerificationRequest, LedgerBlock, LedgerEntry
+
+GENESIS_HASH = '0' * 64
+
+# Domain-separation prefixes so a leaf can never be passed off as an inner node
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(cert_hash):
+    return hashlib.sha256(_LEAF_PREFIX + bytes.fromhex(cert_hash)).digest()
+
+
+def _node_hash(left, right):
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def merkle_levels(leaves):
+    """All tree levels from the leaves up to the root; an unpaired node is promoted as-is."""
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+
+def merkle_root(leaves):
+    return merkle_levels(leaves)[-1][0].hex()
+
+
+def inclusion_proof(leaves, index):
+    """Sibling hashes from leaf to root: [{"hash": hex, "position": "left"|"right"}]."""
+    proof = []
+    for level in merkle_levels(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"hash": level[sibling].hex(),
+                          "position": "left" if sibling < index else "right"})
+        index //= 2
+    return proof
+
+
+def verify_proof(cert_hash, proof, root):
+    node = leaf_hash(cert_hash)
+    for step in proof:
+        sibling = bytes.fromhex(step['hash'])
+        node = _node_hash(sibling, node) if step['position'] == 'left' else _node_hash(node, sibling)
+    return node.hex() == root
+
+
+def block_hash(height, prev_hash, root, created_at, leaf_count):
+    header = f"{height}|{prev_hash}|{root}|{created_at.isoformat()}|{leaf_count}"
+    return hashlib.sha256(header.encode()).hexdigest()
+
+
+def anchor_pending(max_batch=1024):
+    """
+    Put VERIFIED certificates that aren't in the ledger yet into a new block.
+    Returns the new block, or None if nothing was pending or another worker won
+    the race for the next height (its block will include them instead).
+    """
+    pending = (db.session.query(VerificationRequest.id, VerificationRequest.cert_hash)
+               .outerjoin(LedgerEntry, LedgerEntry.verification_request_id == VerificationRequest.id)
+               .filter(VerificationRequest.status == 'VERIFIED',
+                       VerificationRequest.cert_hash.isnot(None),
+                       LedgerEntry.id.is_(None))
+               .order_by(VerificationRequest.id)
+               .limit(max_batch)
+               .all())
+    if not pending:
+        return None
+
+    head = LedgerBlock.query.order_by(LedgerBlock.height.desc()).first()
+    height = head.height + 1 if head else 0
+    prev_hash = head.block_hash if head else GENESIS_HASH
+    root = merkle_root([leaf_hash(h) for _, h in pending])
+    created_at = datetime.utcnow()
+
+    block = LedgerBlock(height=height, prev_hash=prev_hash, merkle_root=root,
+                        block_hash=block_hash(height, prev_hash, root, created_at, len(pending)),
+                        leaf_count=len(pending), created_at=created_at)
+    db.session.add(block)
+    db.session.add_all([
+        LedgerEntry(block_height=height, leaf_index=i, verification_request_id=req_id, cert_hash=h)
+        for i, (req_id, h) in enumerate(pending)
+    ])
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return block
+
+
+def proof_for_request(request_id):
+    """Inclusion proof plus block header for one verification request, or None if not anchored yet."""
+    entry = LedgerEntry.query.filter_by(verification_request_id=request_id).first()
+    if entry is None:
+        return None
+    block = db.session.get(LedgerBlock, entry.block_height)
+    leaves = [leaf_hash(h) for (h,) in
+              db.session.query(LedgerEntry.cert_hash)
+              .filter_by(block_height=entry.block_height)
+              .order_by(LedgerEntry.leaf_index).all()]
+    return {
+        "cert_hash": entry.cert_hash,
+        "leaf_index": entry.leaf_index,
+        "proof": inclusion_proof(leaves, entry.leaf_index),
+        "block": block_header(block),
+    }
+
+
+def block_header(block):
+    return {
+        "height": block.height,
+        "prev_hash": block.prev_hash,
+        "merkle_root": block.merkle_root,
+        "block_hash": block.block_hash,
+        "leaf_count": block.leaf_count,
+        "timestamp": block.created_at.isoformat(),
+    }
+
+
+def verify_chain():
+    """Recompute every block's root and link; returns the first bad height or None."""
+    prev_hash = GENESIS_HASH
+    for block in LedgerBlock.query.order_by(LedgerBlock.height).yield_per(100):
+        leaves = [leaf_hash(h) for (h,) in
+                  db.session.query(LedgerEntry.cert_hash)
+                  .filter_by(block_height=block.height)
+                  .order_by(LedgerEntry.leaf_index).all()]
+        root = merkle_root(leaves) if leaves else ''
+        expected = block_hash(block.height, prev_hash, root, block.created_at, len(leaves))
+        if block.prev_hash != prev_hash or root != block.merkle_root or expected != block.block_hash:
+            return block.height
+        prev_hash = block.block_hash
+    return None
+
+
+class LedgerBatcher:
+    """Background thread that anchors pending certificates every few seconds."""
+
+    def __init__(self, app, interval, max_batch):
+        self.app = app
+        self.interval = interval
+        self.max_batch = max_batch
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def start(self):
+        if not self.interval:
+            return
+        threading.Thread(target=self._run, name='ledger-batcher', daemon=True).start()
+
+    def notify(self, count=1):
+        """Called after verifications; a full batch is anchored without waiting for the timer."""
+        if count <= 0:
+            return
+        with self._lock:
+            self._pending += count
+            if self._pending >= self.max_batch:
+                self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                self._pending = 0
+            try:
+                with self.app.app_context():
+                    # keep cutting blocks while a backlog remains
+                    while anchor_pending(self.max_batch) is not None:
+                        pass
+                    db.session.remove()
+            except Exception:
+                self.app.logger.exception("Ledger anchoring failed")
+
+
+def init_ledger(app, start=True):
+    batcher = LedgerBatcher(app, app.config.get('LEDGER_BATCH_SECONDS', 5),
+                            app.config.get('LEDGER_MAX_BATCH', 1024))
+    app.extensions['ledger_batcher'] = batcher
+    if start:
+        batcher.start()
+    return batcher
@@ -0,0 +1,130 @@
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from models.models import JobApplicationCounter, VerificationRequestCounter
+
+# Versioned schema changes for databases created before the matching model
+# change. Each step must be idempotent: fresh databases already get the
+# declared indexes from create_all() and only record the versions as applied.
+# Append new steps at the end; never renumber or edit one that has shipped.
+# A step may return a note (e.g. what it removed), which upgrade() logs.
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+def _create_index(conn, name, table, columns, unique=False):
+    conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+                      f"ON {table} ({', '.join(columns)})"))
+
+
+@migration(1, 'profile user_id unique indexes')
+def _profile_user_ids(conn):
+    # role_required looks up the caller's profile by user_id on every request
+    for table in ('applicant', 'employer', 'university'):
+        _create_index(conn, f'ix_{table}_user_id', table, ['user_id'], unique=True)
+
+
+@migration(2, 'job listing indexes')
+def _job_indexes(conn):
+    _create_index(conn, 'ix_job_status_created_at', 'job', ['status', 'created_at', 'id'])
+    _create_index(conn, 'ix_job_status_location_created_at', 'job', ['status', 'location', 'created_at', 'id'])
+    _create_index(conn, 'ix_job_status_job_type_created_at', 'job', ['status', 'job_type', 'created_at', 'id'])
+    _create_index(conn, 'ix_job_employer_id', 'job', ['employer_id'])
+
+
+@migration(3, 'job application indexes and one application per job')
+def _job_application_indexes(conn):
+    # Keep the earliest of any duplicates left behind by the old check-then-insert
+    duplicates = [row_id for (row_id,) in conn.execute(text(
+        "SELECT id FROM job_application WHERE id NOT IN "
+        "(SELECT min(id) FROM job_application GROUP BY job_id, applicant_id) ORDER BY id"
+    ))]
+    conn.execute(text(
+        "DELETE FROM job_application WHERE id NOT IN "
+        "(SELECT min(id) FROM job_application GROUP BY job_id, applicant_id)"
+    ))
+    _create_index(conn, 'uq_job_application_job_applicant', 'job_application',
+                  ['job_id', 'applicant_id'], unique=True)
+    _create_index(conn, 'ix_job_application_job_created_at', 'job_application', ['job_id', 'created_at', 'id'])
+    _create_index(conn, 'ix_job_application_applicant_created_at', 'job_application',
+                  ['applicant_id', 'created_at', 'id'])
+    if duplicates:
+        return (f"removed {len(duplicates)} duplicate job application(s), ids "
+                f"{', '.join(map(str, duplicates))}")
+
+
+@migration(4, 'verification request indexes')
+def _verification_request_indexes(conn):
+    _create_index(conn, 'ix_verification_request_university_status', 'verification_request',
+                  ['university_id', 'status'])
+    _create_index(conn, 'ix_verification_request_employer_id', 'verification_request', ['employer_id'])
+    _create_index(conn, 'ix_verification_request_cert_hash', 'verification_request', ['cert_hash'])
+
+
+@migration(5, 'job updated_at index')
+def _job_updated_at_index(conn):
+    _create_index(conn, 'ix_job_updated_at', 'job', ['updated_at'])
+
+
+@migration(6, 'dashboard counters')
+def _dashboard_counters(conn):
+    # db-upgrade runs without create_all(), so the tables may not exist yet
+    JobApplicationCounter.__table__.create(conn, checkfirst=True)
+    VerificationRequestCounter.__table__.create(conn, checkfirst=True)
+    # Counting starts from whatever rows exist; from here on the routes keep them current
+    conn.execute(text("DELETE FROM job_application_counter"))
+    conn.execute(text(
+        "INSERT INTO job_application_counter (job_id, status, value) "
+        "SELECT a.job_id, a.status, count(*) FROM job_application a JOIN job j ON j.id = a.job_id "
+        "GROUP BY a.job_id, a.status"
+    ))
+    conn.execute(text("DELETE FROM verification_request_counter"))
+    conn.execute(text(
+        "INSERT INTO verification_request_counter (employer_id, status, value) "
+        "SELECT employer_id, status, count(*) FROM verification_request GROUP BY employer_id, status"
+    ))
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def applied_versions(db):
+    with db.engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {v for (v,) in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def pending_migrations(db):
+    done = applied_versions(db)
+    return [(v, name, fn) for v, name, fn in sorted(MIGRATIONS, key=lambda m: m[0]) if v not in done]
+
+
+def upgrade(db, log=None):
+    """Apply pending migrations in order, each in its own transaction. Returns the versions applied."""
+    applied = []
+    for version, name, fn in pending_migrations(db):
+        try:
+            with db.engine.begin() as conn:
+                note = fn(conn)
+                conn.execute(text("INSERT INTO schema_migrations (version, name, applied_at) "
+                                  "VALUES (:v, :name, :at)"),
+                             {"v": version, "name": name, "at": datetime.utcnow()})
+        except IntegrityError:
+            # Another worker recorded this version first; its transaction did the work
+            if version in applied_versions(db):
+                continue
+            raise
+        if log:
+            log(f"Applied migration {version}: {name}" + (f" ({note})" if note else ""))
+        applied.append(version)
+    return applied
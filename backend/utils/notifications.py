@@ -0,0 +1,42 @@
+import json
+import logging
+from models.models import db, Job, JobApplication, Applicant, User, Employer, VerificationRequest
+from utils.tasks import task
+
+# Delivery hook: one JSON line per message on this logger; route it to a mailer as needed
+notification_log = logging.getLogger('notifications')
+
+
+def _send(to, subject, **details):
+    notification_log.info(json.dumps({"to": to, "subject": subject, **details}, default=str))
+
+
+@task('notify_application_status')
+def notify_application_status(application_id, status):
+    """Tell the applicant their application moved to `status`."""
+    row = (db.session.query(JobApplication.status, Job.title, User.email)
+           .join(Job, Job.id == JobApplication.job_id)
+           .join(Applicant, Applicant.id == JobApplication.applicant_id)
+           .join(User, User.id == Applicant.user_id)
+           .filter(JobApplication.id == application_id).first())
+    # Withdrawn, or changed again before this ran (that change queued its own message)
+    if row is None or row.status != status:
+        return
+    _send(row.email, f"Your application for {row.title} is now {status}",
+          application_id=application_id, status=status)
+
+
+@task('notify_verification_status')
+def notify_verification_status(request_ids):
+    """Tell each employer which of their verification requests were decided."""
+    rows = (db.session.query(VerificationRequest.id, VerificationRequest.student_name,
+                             VerificationRequest.status, VerificationRequest.employer_id, User.email)
+            .join(Employer, Employer.id == VerificationRequest.employer_id)
+            .join(User, User.id == Employer.user_id)
+            .filter(VerificationRequest.id.in_(request_ids)).all())
+    by_employer = {}
+    for row in rows:
+        by_employer.setdefault((row.employer_id, row.email), []).append(
+            {"id": row.id, "student_name": row.student_name, "status": row.status})
+    for (_, email), decisions in by_employer.items():
+        _send(email, f"{len(decisions)} verification request(s) decided", decisions=decisions)
@@ -0,0 +1,89 @@
+import base64
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import request, current_app
+from sqlalchemy import and_, or_
+
+
+class PaginationError(ValueError):
+    """Raised for malformed paging/projection parameters (reported as 400)."""
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat() if created_at else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Turn an opaque cursor back into a (created_at, id) tuple."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise PaginationError("Invalid cursor")
+
+
+def get_page_size():
+    default = current_app.config.get('DEFAULT_PAGE_SIZE', 20)
+    maximum = current_app.config.get('MAX_PAGE_SIZE', 100)
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be positive")
+    return min(limit, maximum)
+
+
+def get_fields(allowed, default=None):
+    """Parse ?fields=a,b,c into a tuple, defaulting to `default` (or every allowed field)."""
+    raw = request.args.get('fields')
+    if not raw:
+        return tuple(default or allowed)
+    fields = tuple(f.strip() for f in raw.split(',') if f.strip())
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    # declared order, no repeats: ?fields=b,a,a and ?fields=a,b are the same projection
+    return tuple(f for f in allowed if f in fields)
+
+
+def get_status_filter(allowed):
+    status = request.args.get('status')
+    if status is None:
+        return None
+    status = status.upper()
+    if status not in allowed:
+        raise PaginationError("Invalid status")
+    return status
+
+
+def keyset_filter(query, created_col, id_col, cursor):
+    """Restrict a newest-first query to rows strictly after the cursor."""
+    created_at, row_id = decode_cursor(cursor)
+    return query.filter(or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < row_id)
+    ))
+
+
+def get_offset():
+    try:
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        raise PaginationError("offset must be an integer")
+    if offset < 0:
+        raise PaginationError("offset must not be negative")
+    return offset
+
+
+def paginated_response(response, next_cursor, param='cursor'):
+    """Attach the next-page cursor (or offset) to a list response as headers."""
+    if next_cursor is not None:
+        next_cursor = str(next_cursor)
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args[param] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,86 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool already has its maximum amount of queued work."""
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _check(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing in a bounded process pool so that a burst of
+    logins/registrations can't monopolise the request threads (and the GIL).
+    With workers=0 everything runs inline, which is handy for development.
+    """
+
+    def __init__(self, method, workers=2, max_pending=64, timeout=30):
+        self.method = method
+        # werkzeug stores defaults explicitly ('scrypt' -> 'scrypt:32768:8:1'); compare against that
+        self._prefix = generate_password_hash('', method=method).split('$', 1)[0]
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # spawn: never fork a process that already runs background threads
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'))
+                    atexit.register(self._pool.shutdown, wait=False)
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def check(self, pwhash, password):
+        return self._run(_check, pwhash, password)
+
+    def hash_many(self, passwords):
+        """Hash a batch in parallel across the pool (used by bulk imports)."""
+        if not self.workers:
+            return [_hash(p, self.method) for p in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._executor().map(_hash, passwords, [self.method] * len(passwords),
+                                         chunksize=chunksize))
+
+    def needs_rehash(self, pwhash):
+        """True when a stored hash was produced with different parameters."""
+        return pwhash.split('$', 1)[0] != self._prefix
+
+
+def init_password_hasher(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 64),
+    )
+
+
+def get_password_hasher(app):
+    return app.extensions['password_hasher']
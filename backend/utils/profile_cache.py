@@ -0,0 +1,87 @@
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from models.models import db, Applicant, Employer, University
+from utils.ttl_cache import TTLCache
+
+PROFILE_MODELS = {
+    'applicant': Applicant,
+    'employer': Employer,
+    'university': University,
+}
+
+
+class ProfileCache(TTLCache):
+    """
+    user_id -> role profile column values.
+    Values are plain dicts so they can be shared safely between threads and
+    re-attached to each request's session without a SELECT.
+    """
+
+    def get(self, role, user_id):
+        return super().get((role, user_id))
+
+    def set(self, role, user_id, values):
+        super().set((role, user_id), values)
+
+    def invalidate(self, role, user_id):
+        super().invalidate((role, user_id))
+
+
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def load_profile(role, user_id):
+    """Return the caller's profile attached to the current session (or None)."""
+    model = PROFILE_MODELS.get(role)
+    if model is None:
+        return None
+    cache = current_app.extensions.get('profile_cache')
+    if cache is None:
+        return model.query.filter_by(user_id=user_id).first()
+
+    values = cache.get(role, user_id)
+    if values is not None:
+        # Rebuild a detached instance and merge it without hitting the database
+        obj = model(**values)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    profile = model.query.filter_by(user_id=user_id).first()
+    if profile is not None:
+        cache.set(role, user_id, _snapshot(profile))
+    return profile
+
+
+def lock_profile(profile):
+    """
+    Re-read a profile from the database, locked for the rest of the transaction.
+    Write paths use this rather than g.profile: the cache is per process, so
+    another worker's write may not have reached this one yet.
+    """
+    return db.session.get(type(profile), profile.id, populate_existing=True, with_for_update=True)
+
+
+def init_profile_cache(app):
+    app.extensions['profile_cache'] = ProfileCache(
+        ttl=app.config.get('PROFILE_CACHE_TTL', 60),
+        max_size=app.config.get('PROFILE_CACHE_SIZE', 10000),
+    )
+
+
+def _make_invalidator(role):
+    def invalidate(mapper, connection, target):
+        # Any write to a profile row (PUT /profile, resume changes, ...) drops it
+        try:
+            cache = current_app.extensions.get('profile_cache')
+        except RuntimeError:
+            return
+        if cache is not None:
+            cache.invalidate(role, target.user_id)
+    return invalidate
+
+
+for _role, _model in PROFILE_MODELS.items():
+    event.listen(_model, 'after_update', _make_invalidator(_role))
+    event.listen(_model, 'after_delete', _make_invalidator(_role))
@@ -0,0 +1,249 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+_TOKEN_RE = re.compile(r'[^\W\d_]{2,}', re.UNICODE)
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to
+we will with you your who what when where which while job role work team position looking
+""".split())
+
+# Title words say more about a job than description words
+TITLE_WEIGHT = 2
+
+
+def term_counts(text, weight=1.0, counts=None):
+    """Add `weight` per non-stopword token in text to counts (a new dict by default)."""
+    counts = {} if counts is None else counts
+    for token in _TOKEN_RE.findall((text or '').lower()):
+        if token not in _STOPWORDS:
+            counts[token] = counts.get(token, 0.0) + weight
+    return counts
+
+
+def tf_vector(counts):
+    """Sublinear, L2-normalized term frequencies."""
+    return _normalize({t: 1 + math.log(c) for t, c in counts.items()})
+
+
+def job_terms(title, description):
+    return tf_vector(term_counts(description, counts=term_counts(title, TITLE_WEIGHT)))
+
+
+def _normalize(vector):
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {t: w / norm for t, w in vector.items()} if norm else {}
+
+
+def score_documents(job_title, job_description, documents):
+    """
+    Cosine similarity of each {term: count} document to the job text, with
+    idf taken from the batch itself, so words every candidate uses (or that
+    only the job uses) carry little weight. Returns [(key, score)] for
+    [(key, counts)], best first.
+    """
+    vectors = [(key, tf_vector(counts)) for key, counts in documents]
+    df = defaultdict(int)
+    for _, vector in vectors:
+        for term in vector:
+            df[term] += 1
+    n = len(vectors)
+    idf = {t: math.log((1 + n) / (1 + d)) + 1 for t, d in df.items()}
+    query = _normalize({t: w * idf[t] for t, w in job_terms(job_title, job_description).items() if t in idf})
+
+    scored = []
+    for key, vector in vectors:
+        weighted = {t: w * idf[t] for t, w in vector.items()}
+        norm = math.sqrt(sum(w * w for w in weighted.values()))
+        dot = sum(q * weighted.get(t, 0.0) for t, q in query.items())
+        scored.append((key, dot / norm if norm else 0.0))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+class JobRecommender:
+    """
+    In-process TF-IDF index over Job title/description.
+
+    Each job is stored as a sparse term -> weight dict, and OPEN jobs are also
+    in an inverted index (term -> {job_id: weight}). idf is applied at query
+    time from the live document frequencies, so adding or editing a job only
+    touches that job's postings and never leaves the other vectors stale.
+    A query walks the postings of the profile's strongest terms, each capped
+    at its highest-weighted entries, so its cost does not grow with the
+    number of jobs that merely mention a common word; the best of those
+    candidates are then scored exactly.
+
+    Every worker keeps its own index. Changes made by this worker apply
+    immediately; changes made elsewhere are picked up from Job.updated_at at
+    most refresh_seconds later. Deleted jobs drop out when a query misses them.
+    """
+
+    def __init__(self, refresh_seconds=10, profile_terms=24, max_postings=2000, profile_applications=50):
+        self.refresh_seconds = refresh_seconds
+        self.profile_terms = profile_terms
+        self.max_postings = max_postings
+        self.profile_applications = profile_applications
+        self._lock = threading.RLock()
+        self._vectors = {}               # job_id -> {term: weight}, every job ever seen
+        self._postings = defaultdict(dict)  # term -> {job_id: weight}, OPEN jobs only
+        self._ranked = {}                # term -> [(-weight, job_id)] best first, capped
+        self._open = set()
+        self._built = False
+        self._watermark = None
+        self._synced_at = 0.0
+
+    def __len__(self):
+        return len(self._open)
+
+    # -- maintenance --------------------------------------------------------
+
+    def _put(self, job_id, title, description, is_open):
+        self._remove_postings(job_id)
+        vector = job_terms(title, description)
+        self._vectors[job_id] = vector
+        if is_open and vector:
+            self._open.add(job_id)
+            for term, weight in vector.items():
+                self._postings[term][job_id] = weight
+                ranked = self._ranked.get(term)
+                if ranked is not None and (len(ranked) < self.max_postings or -weight < ranked[-1][0]):
+                    bisect.insort(ranked, (-weight, job_id))
+                    del ranked[self.max_postings:]
+
+    def _remove_postings(self, job_id):
+        if job_id not in self._open:
+            return
+        self._open.discard(job_id)
+        for term, weight in self._vectors.get(job_id, {}).items():
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(job_id, None)
+                if not postings:
+                    del self._postings[term]
+            ranked = self._ranked.get(term)
+            if ranked is not None:
+                i = bisect.bisect_left(ranked, (-weight, job_id))
+                if i < len(ranked) and ranked[i][1] == job_id:
+                    del ranked[i]
+                    # entries past the cap can't move up; recompute once too many are gone
+                    if len(ranked) < self.max_postings * 0.9 and len(postings or ()) > len(ranked):
+                        del self._ranked[term]
+
+    def update(self, job):
+        """Re-index one job after it was created or edited in this worker."""
+        with self._lock:
+            if self._built:
+                self._put(job.id, job.title, job.description, job.status == 'OPEN')
+
+    def discard(self, job_id):
+        with self._lock:
+            self._remove_postings(job_id)
+            self._vectors.pop(job_id, None)
+
+    def _load(self, db, since=None):
+        from models.models import Job
+        query = db.session.query(Job.id, Job.title, Job.description, Job.status, Job.updated_at)
+        if since is not None:
+            # >= rather than >: rows sharing the watermark timestamp may have been missed
+            query = query.filter(Job.updated_at >= since)
+        for row in query.yield_per(2000):
+            self._put(row.id, row.title, row.description, row.status == 'OPEN')
+            if row.updated_at and (self._watermark is None or row.updated_at > self._watermark):
+                self._watermark = row.updated_at
+
+    def sync(self, db, force=False):
+        """Build on first use, then pull jobs changed by other workers."""
+        now = time.monotonic()
+        if self._built and not force and now - self._synced_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not self._built:
+                self._load(db)
+                self._built = True
+            elif force or now - self._synced_at >= self.refresh_seconds:
+                self._load(db, since=self._watermark)
+            self._synced_at = now
+
+    def warm(self, app):
+        """Build the index in the background so the first request doesn't pay for it."""
+        def build():
+            from models.models import db
+            with app.app_context():
+                try:
+                    self.sync(db)
+                except SQLAlchemyError:
+                    app.logger.warning("Job recommender index not built; is the database initialized?")
+                finally:
+                    db.session.remove()
+        threading.Thread(target=build, name='job-recommender', daemon=True).start()
+
+    # -- queries ------------------------------------------------------------
+
+    def _idf(self, term):
+        return math.log((1 + len(self._open)) / (1 + len(self._postings.get(term, ())))) + 1
+
+    def _top_postings(self, term):
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            postings = self._postings.get(term, {})
+            ranked = sorted((-w, job_id) for job_id, w in postings.items())[:self.max_postings]
+            self._ranked[term] = ranked
+        return ranked
+
+    def profile(self, applications):
+        """
+        Applicant profile from [(job_id, cover_letter)], most recent first.
+        Recent applications count more; cover letters add the applicant's own words.
+        """
+        profile = defaultdict(float)
+        for rank, (job_id, cover_letter) in enumerate(applications[:self.profile_applications]):
+            decay = 0.9 ** rank
+            for term, weight in self._vectors.get(job_id, {}).items():
+                profile[term] += decay * weight
+            for term, weight in job_terms(None, cover_letter).items():
+                profile[term] += 0.5 * decay * weight
+        return profile
+
+    def recommend(self, profile, k, exclude=()):
+        """
+        Top-k [(job_id, score)] among OPEN jobs for a profile vector. Capped
+        postings nominate candidates; candidates are then scored exactly
+        against their full vectors.
+        """
+        with self._lock:
+            query = {t: w * self._idf(t) for t, w in profile.items() if t in self._postings}
+            query = _normalize(dict(heapq.nlargest(self.profile_terms, query.items(),
+                                                   key=lambda item: item[1])))
+            query = {t: w * self._idf(t) for t, w in query.items()}
+            approx = defaultdict(float)
+            for term, q_weight in query.items():
+                for neg_weight, job_id in self._top_postings(term):
+                    approx[job_id] -= q_weight * neg_weight
+            for job_id in exclude:
+                approx.pop(job_id, None)
+            candidates = heapq.nlargest(max(5 * k, 200), approx.items(), key=lambda item: item[1])
+            scores = []
+            for job_id, _ in candidates:
+                vector = self._vectors[job_id]
+                scores.append((job_id, sum(w * vector.get(t, 0.0) for t, w in query.items())))
+        return heapq.nlargest(k, scores, key=lambda item: item[1])
+
+def init_recommender(app):
+    app.extensions['job_recommender'] = JobRecommender(
+        refresh_seconds=app.config.get('RECOMMENDER_REFRESH_SECONDS', 10),
+        profile_terms=app.config.get('RECOMMENDER_PROFILE_TERMS', 24),
+        max_postings=app.config.get('RECOMMENDER_MAX_POSTINGS', 2000),
+        profile_applications=app.config.get('RECOMMENDER_PROFILE_APPLICATIONS', 50),
+    )
+
+
+def get_recommender(app=None):
+    return (app or current_app).extensions['job_recommender']
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, request, g, make_response
+from flask_jwt_extended import get_jwt_identity
+from utils.ttl_cache import TTLCache
+
+# Response headers worth replaying from a cached entry
+_KEPT_HEADERS = ('X-Next-Cursor', 'Link')
+
+
+class MemoryBackend:
+    """Per-process LRU. Invalidation is exact within the process; other workers rely on the TTL."""
+
+    def __init__(self, max_size=10000):
+        self._entries = TTLCache(max_size=max_size)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl=ttl)
+
+    def tag_versions(self, tags):
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+
+class SQLiteBackend:
+    """
+    Cache file shared by every worker on the host, so one worker's
+    invalidation is seen by all of them immediately.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        # sqlite3 connections must not cross fork(); a preloaded app's workers open their own
+        os.register_at_fork(after_in_child=self._forget_connections)
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # losing cache entries on a crash is fine
+            self._local.conn = conn
+        return conn
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                     (key, pickle.dumps(value), time.time() + ttl))
+        self._writes += 1
+        if self._writes % 500 == 0:
+            conn.execute("DELETE FROM entries WHERE expires < ?", (time.time(),))
+
+    def tag_versions(self, tags):
+        if not tags:
+            return []
+        placeholders = ','.join('?' * len(tags))
+        found = dict(self._conn().execute(
+            f"SELECT tag, version FROM tags WHERE tag IN ({placeholders})", tags).fetchall())
+        return [found.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        self._conn().executemany(
+            "INSERT INTO tags (tag, version) VALUES (?, 1) "
+            "ON CONFLICT(tag) DO UPDATE SET version = version + 1", [(t,) for t in tags])
+
+
+class CachedResponse:
+    def __init__(self, body, status_code, mimetype, headers):
+        self.body = body
+        self.status_code = status_code
+        self.mimetype = mimetype
+        self.headers = headers
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+
+
+def _backend():
+    return current_app.extensions.get('response_cache')
+
+
+def _to_response(entry):
+    response = make_response(entry.body, entry.status_code)
+    response.mimetype = entry.mimetype
+    for name, value in entry.headers.items():
+        response.headers[name] = value
+    response.set_etag(entry.etag)
+    # Personalised data: browsers may keep it but must revalidate with the ETag
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def cached_response(tags, per_identity=True, ttl=None):
+    """
+    Cache successful GET responses keyed by path, query args and (optionally)
+    caller identity. `tags(**view_args)` names the data the response depends on;
+    invalidate() on any of those tags makes every dependent entry unreachable.
+    Apply it under @role_required so g.profile is available to `tags`.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            backend = _backend()
+            # No profile row: the view answers 404, nothing worth caching
+            if backend is None or ('profile' in g and g.profile is None):
+                return fn(*args, **kwargs)
+
+            entry_tags = sorted(tags(**kwargs))
+            versions = backend.tag_versions(entry_tags)
+            identity = get_jwt_identity() if per_identity else '*'
+            raw_key = '|'.join([
+                request.path,
+                urlencode(sorted(request.args.items(multi=True))),
+                str(identity),
+                ','.join(f"{t}={v}" for t, v in zip(entry_tags, versions)),
+            ])
+            key = hashlib.sha256(raw_key.encode()).hexdigest()
+
+            entry = backend.get(key)
+            if entry is None:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = CachedResponse(response.get_data(), response.status_code, response.mimetype,
+                                       {h: response.headers[h] for h in _KEPT_HEADERS if h in response.headers})
+                backend.set(key, entry, ttl or current_app.config.get('RESPONSE_CACHE_TTL', 60))
+            return _to_response(entry)
+        return decorator
+    return wrapper
+
+
+def invalidate(*tags):
+    """Called by write endpoints for every tag whose data they changed."""
+    backend = _backend()
+    if backend is not None and tags:
+        backend.bump(sorted(set(tags)))
+
+
+def init_response_cache(app):
+    kind = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+    if kind == 'memory':
+        backend = MemoryBackend(app.config.get('RESPONSE_CACHE_SIZE', 10000))
+    elif kind == 'sqlite':
+        path = app.config.get('RESPONSE_CACHE_PATH') or os.path.join(app.instance_path, 'response_cache.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        backend = SQLiteBackend(path)
+    elif kind == 'none':
+        backend = None
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {kind}")
+    app.extensions['response_cache'] = backend
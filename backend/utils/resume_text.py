@@ -0,0 +1,139 @@
+import html
+import re
+import zipfile
+import zlib
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, literal, select
+from models.models import db, ResumeText, ResumeBlob
+from utils.blob_store import get_blob_store
+from utils.recommender import term_counts
+from utils.tasks import task, enqueue
+from utils.ttl_cache import TTLCache
+
+# Stored text is capped; the first pages carry what matters for ranking
+MAX_TEXT_CHARS = 100000
+# Decompressed content streams read per PDF, in total; text operators make up a fraction of it
+MAX_TEXT_BYTES = MAX_TEXT_CHARS * 20
+
+_PDF_STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+_PDF_SHOW_RE = re.compile(rb'\((?:\\.|[^\\)])*\)\s*(?:Tj|\'|")|\[(?:\\.|[^\\\]])*\]\s*TJ', re.S)
+_PDF_STRING_RE = re.compile(rb'\(((?:\\.|[^\\)])*)\)', re.S)
+_PDF_ESCAPE_RE = re.compile(rb'\\([0-7]{1,3}|.)', re.S)
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+_XML_PARAGRAPH_RE = re.compile(r'</w:p>')
+_XML_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _pdf_unescape(raw):
+    def replace(match):
+        esc = match.group(1)
+        if esc[:1].isdigit():
+            return bytes([int(esc, 8) & 0xFF])
+        return _PDF_ESCAPES.get(esc, esc)
+    return _PDF_ESCAPE_RE.sub(replace, raw)
+
+
+def _pdf_text(data):
+    """
+    Best-effort text from literal strings in (Flate-compressed) content streams.
+    Hex strings and CID fonts come out empty; good enough to rank on.
+    """
+    parts = []
+    budget = MAX_TEXT_BYTES
+    for match in _PDF_STREAM_RE.finditer(data):
+        if budget <= 0:
+            break
+        stream = match.group(1)
+        try:
+            # bounded: a small compressed stream can inflate to gigabytes
+            stream = zlib.decompressobj().decompress(stream, budget)
+        except zlib.error:
+            pass
+        budget -= len(stream)
+        for op in _PDF_SHOW_RE.finditer(stream):
+            parts.extend(_pdf_unescape(s) for s in _PDF_STRING_RE.findall(op.group(0)))
+            parts.append(b' ')
+    return b''.join(parts).decode('latin-1')
+
+
+def _docx_text(path):
+    with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+        # bounded read: the XML is mostly markup, but never inflate an arbitrary amount
+        xml = document.read(MAX_TEXT_BYTES).decode('utf-8', 'replace')
+    return html.unescape(_XML_TAG_RE.sub('', _XML_PARAGRAPH_RE.sub('\n', xml)))
+
+
+def extract_text(path):
+    """Plain text of a PDF, DOCX or text resume; '' for anything else."""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+        if head.startswith(b'%PDF'):
+            text = _pdf_text(head + f.read())
+        elif head.startswith(b'PK'):
+            try:
+                text = _docx_text(path)
+            except (zipfile.BadZipFile, KeyError):
+                text = ''
+        else:
+            data = head + f.read(MAX_TEXT_CHARS * 4)
+            text = '' if b'\x00' in data else data.decode('utf-8', 'replace')
+    return text[:MAX_TEXT_CHARS]
+
+
+def resume_term_counts(hashes):
+    """
+    {sha256: term counts} for stored resumes whose text has been extracted.
+    Extraction happens in the extract_resume_text task, queued on upload
+    (`flask extract-resumes` for older files); resumes still waiting for it
+    are left out, so this never writes. Token counts stay in a per-worker
+    cache so repeat rankings skip the table.
+    """
+    cache = current_app.extensions['resume_terms']
+    result, missing = {}, []
+    for sha256 in set(hashes):
+        counts = cache.get(sha256)
+        if counts is None:
+            missing.append(sha256)
+        else:
+            result[sha256] = counts
+
+    if missing:
+        for sha256, text in db.session.query(ResumeText.sha256, ResumeText.text).filter(
+                ResumeText.sha256.in_(missing)):
+            counts = result[sha256] = term_counts(text)
+            cache.set(sha256, counts)
+    return result
+
+
+def queue_missing_extractions():
+    """Queue extract_resume_text for stored resumes that have no text yet. Returns how many."""
+    missing = db.session.execute(
+        select(ResumeBlob.sha256).where(~select(ResumeText.sha256)
+                                        .where(ResumeText.sha256 == ResumeBlob.sha256).exists())).scalars().all()
+    for sha256 in missing:
+        enqueue('extract_resume_text', {"sha256": sha256}, key=f"resume-text:{sha256}")
+    db.session.commit()
+    return len(missing)
+
+
+@task('extract_resume_text')
+def extract_resume_text(sha256):
+    """Queued on upload so ranking finds the text ready."""
+    if db.session.get(ResumeText, sha256) is not None:
+        return
+    # raises until the upload has been moved into place; the retry picks it up
+    text = extract_text(get_blob_store(current_app).path_for(sha256))
+    # Only while the blob is still referenced: release_blob clears the text
+    # of a resume replaced in the meantime and must not race this back in
+    still_used = select(ResumeBlob.sha256).where(ResumeBlob.sha256 == sha256)
+    db.session.execute(insert(ResumeText).from_select(
+        ['sha256', 'text', 'created_at'],
+        select(literal(sha256), literal(text), literal(datetime.utcnow())).where(still_used.exists())))
+
+
+def init_resume_text_cache(app):
+    app.extensions['resume_terms'] = TTLCache(
+        ttl=app.config.get('RESUME_TERMS_CACHE_TTL', 3600),
+        max_size=app.config.get('RESUME_TERMS_CACHE_SIZE', 5000),
+    )
@@ -0,0 +1,92 @@
+import re
+from sqlalchemy import text
+
+# Column weights for bm25(): title matches count most, then location, then description
+FTS_WEIGHTS = (10.0, 1.0, 2.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled(db):
+    return db.engine.dialect.name == 'sqlite'
+
+
+def init_job_search(db):
+    """Create the FTS5 mirror of Job and backfill it if it is out of step."""
+    if not fts_enabled(db):
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS job_fts "
+            "USING fts5(title, description, location, tokenize='unicode61')"
+        ))
+        indexed = conn.execute(text("SELECT count(*) FROM job_fts")).scalar()
+        total = conn.execute(text("SELECT count(*) FROM job")).scalar()
+        if indexed != total:
+            conn.execute(text("DELETE FROM job_fts"))
+            conn.execute(text(
+                "INSERT INTO job_fts (rowid, title, description, location) "
+                "SELECT id, title, coalesce(description, ''), coalesce(location, '') FROM job"
+            ))
+
+
+def index_job(db, job):
+    """Upsert one job into the search index inside the caller's transaction."""
+    if not fts_enabled(db):
+        return
+    db.session.execute(text("DELETE FROM job_fts WHERE rowid = :id"), {"id": job.id})
+    db.session.execute(
+        text("INSERT INTO job_fts (rowid, title, description, location) "
+             "VALUES (:id, :title, :description, :location)"),
+        {"id": job.id, "title": job.title or '',
+         "description": job.description or '', "location": job.location or ''}
+    )
+
+
+def unindex_job(db, job_id):
+    if not fts_enabled(db):
+        return
+    db.session.execute(text("DELETE FROM job_fts WHERE rowid = :id"), {"id": job_id})
+
+
+def build_match_query(raw):
+    """
+    Turn free text into a safe FTS5 expression: every word becomes a quoted
+    prefix term and all terms must match. Returns None if nothing is searchable.
+    """
+    tokens = _TOKEN_RE.findall(raw or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{t}"*' for t in tokens)
+
+
+def search_open_jobs(db, raw, limit, offset):
+    """Return [(job_id, score)] for OPEN jobs, best match first."""
+    match = build_match_query(raw)
+    if match is None:
+        return []
+
+    if fts_enabled(db):
+        rows = db.session.execute(
+            text("SELECT job.id, bm25(job_fts, :w_title, :w_desc, :w_loc) AS score "
+                 "FROM job_fts JOIN job ON job.id = job_fts.rowid "
+                 "WHERE job_fts MATCH :match AND job.status = 'OPEN' "
+                 "ORDER BY score LIMIT :limit OFFSET :offset"),
+            {"match": match, "w_title": FTS_WEIGHTS[0], "w_desc": FTS_WEIGHTS[1],
+             "w_loc": FTS_WEIGHTS[2], "limit": limit, "offset": offset}
+        ).all()
+        # bm25() is "lower is better"; flip it so clients see higher = better
+        return [(row.id, -row.score) for row in rows]
+
+    # Fallback for server databases without FTS5: substring match, newest first
+    from models.models import Job
+    query = Job.query.filter_by(status='OPEN')
+    for token in _TOKEN_RE.findall(raw):
+        pattern = f"%{token}%"
+        query = query.filter(db.or_(Job.title.ilike(pattern),
+                                    Job.description.ilike(pattern),
+                                    Job.location.ilike(pattern)))
+    rows = (query.with_entities(Job.id)
+            .order_by(Job.created_at.desc(), Job.id.desc())
+            .limit(limit).offset(offset).all())
+    return [(row.id, None) for row in rows]
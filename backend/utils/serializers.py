@@ -0,0 +1,135 @@
+from flask import url_for
+from sqlalchemy import case
+from models.models import db, Applicant, Employer, University, Job, JobApplication, VerificationRequest, User, Task
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+class Serializer:
+    """
+    Turns rows into response dicts for one resource.
+
+    `columns` maps output names to column expressions; `computed` maps output
+    names to (fn(row), [column names fn reads]); `hidden` columns are only
+    selected for computed fields, never output. A dump function is generated
+    once per distinct field set, so each row costs one dict literal rather
+    than a loop over fields. Field lists come from ?fields=, so they are
+    reduced to declared order without duplicates or unknown names first;
+    otherwise every permutation a client sends would compile and cache
+    another function. Rows may be ORM instances or project() results.
+    """
+
+    def __init__(self, columns, computed=None, hidden=()):
+        self.columns = dict(columns)
+        self.computed = dict(computed or {})
+        self.fields = tuple(n for n in self.columns if n not in hidden) + tuple(self.computed)
+        self._dumpers = {}
+        self._row_classes = {}
+
+    def _canonical(self, fields):
+        wanted = set(fields or self.fields)
+        return tuple(n for n in self.fields if n in wanted)
+
+    def _dumper(self, fields):
+        fields = self._canonical(fields)
+        dump = self._dumpers.get(fields)
+        if dump is None:
+            env = {'_iso': _iso}
+            items = []
+            for i, name in enumerate(fields):
+                if name in self.computed:
+                    env[f'_f{i}'] = self.computed[name][0]
+                    expr = f'_f{i}(row)'
+                elif isinstance(self.columns[name].type, db.DateTime):
+                    expr = f'_iso(row.{name})'
+                else:
+                    expr = f'row.{name}'
+                items.append(f'{name!r}: {expr}')
+            exec(f"def dump(row):\n    return {{{', '.join(items)}}}\n", env)
+            dump = self._dumpers[fields] = env['dump']
+        return dump
+
+    def dump(self, row, fields=None):
+        return self._dumper(fields)(row)
+
+    def dump_many(self, rows, fields=None):
+        dump = self._dumper(fields)
+        return [dump(row) for row in rows]
+
+    def _row_class(self, names):
+        cls = self._row_classes.get(names)
+        if cls is None:
+            args = ', '.join(names)
+            body = ''.join(f"    self.{n} = {n}\n" for n in names)
+            env = {}
+            exec(f"def __init__(self, {args}):\n{body}", env)
+            cls = self._row_classes[names] = type('Row', (), {'__slots__': names, '__init__': env['__init__']})
+        return cls
+
+    def project(self, query, fields=None, extra=()):
+        """
+        Run `query` selecting only the columns the fields (plus `extra`, e.g.
+        cursor keys) need, returning lightweight __slots__ rows instead of ORM
+        instances. `query` provides FROM/JOIN/WHERE/ORDER BY/LIMIT.
+        """
+        wanted = set()
+        for name in tuple(extra) + self._canonical(fields):
+            wanted.update(self.computed[name][1] if name in self.computed else (name,))
+        names = tuple(n for n in self.columns if n in wanted)
+        cls = self._row_class(names)
+        return [cls(*values) for values in query.with_entities(*(self.columns[n] for n in names))]
+
+
+def model_serializer(model, names, **computed):
+    return Serializer({name: getattr(model, name) for name in names}, computed)
+
+
+JOB = model_serializer(Job, ('id', 'title', 'description', 'location', 'salary_min', 'salary_max',
+                             'job_type', 'status', 'created_at', 'updated_at'))
+
+# Applicant's own applications, with the job title joined in
+MY_APPLICATION = Serializer({
+    'id': JobApplication.id,
+    'job_id': JobApplication.job_id,
+    'job_title': case((Job.id.is_(None), 'Unknown'), else_=Job.title),
+    'status': JobApplication.status,
+    'cover_letter': JobApplication.cover_letter,
+    'created_at': JobApplication.created_at,
+})
+
+# Applications to one of the employer's jobs, with the applicant's name and email joined in
+JOB_APPLICATION = Serializer({
+    'id': JobApplication.id,
+    'job_id': JobApplication.job_id,
+    'applicant_id': JobApplication.applicant_id,
+    'applicant_name': case((Applicant.id.is_(None), 'Unknown'), else_=Applicant.full_name),
+    'applicant_email': case((User.id.is_(None), 'Unknown'), else_=User.email),
+    'resume_path': Applicant.resume_path,
+    'status': JobApplication.status,
+    'cover_letter': JobApplication.cover_letter,
+    'created_at': JobApplication.created_at,
+}, computed={
+    'resume_url': (lambda row: url_for('employer.download_application_resume', app_id=row.id)
+                   if row.resume_path else None, ['id', 'resume_path']),
+}, hidden=('resume_path',))
+
+VERIFICATION_REQUEST = model_serializer(VerificationRequest, (
+    'id', 'employer_id', 'university_id', 'student_name', 'degree', 'year', 'status',
+    'cert_hash', 'rejection_reason', 'created_at', 'updated_at'))
+
+APPLICANT_PROFILE = model_serializer(
+    Applicant, ('id', 'full_name', 'phone', 'resume_path', 'email_verified', 'created_at', 'updated_at'),
+    resume_url=(lambda row: url_for('applicant.download_resume') if row.resume_path else None, ['resume_path']),
+)
+
+EMPLOYER_PROFILE = model_serializer(Employer, ('id', 'company_name', 'company_email', 'industry',
+                                               'created_at', 'updated_at'))
+
+UNIVERSITY_PROFILE = model_serializer(University, ('id', 'uni_name', 'uni_email', 'uni_code',
+                                                   'created_at', 'updated_at'))
+
+# Status of background work a user's request queued; the payload stays server-side
+TASK = model_serializer(Task, ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_at',
+                               'last_error', 'created_at', 'updated_at'))
@@ -0,0 +1,45 @@
+import mmap
+import os
+import struct
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; concurrent bumps may then count as one
+    fcntl = None
+
+_COUNTER = struct.Struct('<Q')
+
+
+class Stamp:
+    """
+    A change counter shared by the processes on one host: an 8-byte file
+    that every process maps into memory. bump() after committing a change
+    that other workers cache; a worker whose last read value differs knows
+    it has to reload. Reading is a memory access, no system call, so it can
+    be checked on every request, and the file never grows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _COUNTER.size:
+                # a concurrent starter doing the same is harmless: it zero-fills up to the same size
+                os.ftruncate(fd, _COUNTER.size)
+            # MAP_SHARED, so it survives fork() and sees every other process's bumps
+            self._map = mmap.mmap(fd, _COUNTER.size)
+        finally:
+            os.close(fd)
+
+    def read(self):
+        return _COUNTER.unpack_from(self._map)[0]
+
+    def bump(self):
+        """Increment the counter; concurrent bumps from other processes are serialized by flock."""
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            _COUNTER.pack_into(self._map, 0, (self.read() + 1) % (1 << 64))
+        finally:
+            os.close(fd)  # releases the lock
@@ -0,0 +1,211 @@
+import json
+import os
+import random
+import socket
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+from flask import g, has_request_context
+from sqlalchemy import event, select, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.models import db, Task
+
+# name -> (handler, max_attempts); filled by @task in the modules that own the work
+TASKS = {}
+
+_pools = weakref.WeakSet()
+
+
+def task(name, max_attempts=5):
+    """Register a handler. It runs in an app context with the payload as keyword arguments."""
+    def register(fn):
+        TASKS[name] = (fn, max_attempts)
+        return fn
+    return register
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """
+    Add a task to the current transaction. Workers only see it once the caller
+    commits, so the side effect happens exactly when the database write does.
+    With `key`, a task already enqueued under that key is returned instead of
+    adding a second one.
+    """
+    if name not in TASKS:
+        raise KeyError(f"Unknown task: {name}")
+    if key is not None:
+        existing = Task.query.filter_by(idempotency_key=key).first()
+        if existing is not None:
+            return existing
+
+    profile = g.get('profile') if has_request_context() else None
+    new_task = Task(name=name, payload=json.dumps(payload or {}), max_attempts=TASKS[name][1],
+                    run_at=datetime.utcnow() + timedelta(seconds=delay), idempotency_key=key,
+                    user_id=getattr(profile, 'user_id', None))
+    if key is None:
+        db.session.add(new_task)
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.add(new_task)
+        except IntegrityError:
+            # enqueued concurrently under the same key
+            return Task.query.filter_by(idempotency_key=key).first()
+    db.session.info['tasks_enqueued'] = True
+    return new_task
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_workers(session):
+    if session.info.pop('tasks_enqueued', False):
+        for pool in list(_pools):
+            pool.wake()
+
+
+class TaskWorkerPool:
+    """
+    Threads that claim due PENDING tasks with a conditional UPDATE, so any
+    number of threads and worker processes can share one table. A failed task
+    is retried with exponential backoff until max_attempts, then marked
+    FAILED. A RUNNING task whose worker died is reclaimed after the lease runs out.
+    """
+
+    def __init__(self, app, workers=2, poll_seconds=1.0, lease_seconds=300,
+                 backoff_seconds=2.0, max_backoff_seconds=600, retention_hours=72):
+        self.app = app
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.retention_hours = retention_hours
+        self._wake = threading.Event()
+        _pools.add(self)
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._run, args=(i,), name=f'task-worker-{i}', daemon=True).start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self, index):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        last_maintenance = 0.0
+        failing = False
+        while True:
+            try:
+                with self.app.app_context():
+                    # one thread per process does the housekeeping
+                    if index == 0 and time.monotonic() - last_maintenance >= 60:
+                        self.maintain()
+                        last_maintenance = time.monotonic()
+                    ran = self.run_one(worker_id)
+                    db.session.remove()
+                failing = False
+            except Exception:
+                # once per outage (e.g. the task table doesn't exist before init-db), not every poll
+                if not failing:
+                    self.app.logger.exception("Task worker failed")
+                failing = True
+                ran = False
+            if not ran:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def _claim(self, worker_id):
+        now = datetime.utcnow()
+        while True:
+            task_id = db.session.execute(
+                select(Task.id).where(Task.status == 'PENDING', Task.run_at <= now)
+                .order_by(Task.run_at, Task.id).limit(1)
+            ).scalar()
+            if task_id is None:
+                db.session.rollback()
+                return None
+            claimed = db.session.execute(
+                update(Task).where(Task.id == task_id, Task.status == 'PENDING')
+                .values(status='RUNNING', locked_by=worker_id, locked_at=now, attempts=Task.attempts + 1)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return db.session.get(Task, task_id)
+            # another worker won the race; look for the next one
+
+    def run_one(self, worker_id='cli'):
+        """Claim and run one due task. Returns False when nothing was due."""
+        claimed = self._claim(worker_id)
+        if claimed is None:
+            return False
+        fn = TASKS.get(claimed.name, (None,))[0]
+        try:
+            if fn is None:
+                raise KeyError(f"No handler registered for task {claimed.name!r}")
+            fn(**json.loads(claimed.payload))
+        except Exception as e:
+            db.session.rollback()
+            claimed = db.session.get(Task, claimed.id)
+            claimed.last_error = f"{type(e).__name__}: {e}"[:2000]
+            claimed.locked_by = claimed.locked_at = None
+            if claimed.attempts >= claimed.max_attempts:
+                claimed.status = 'FAILED'
+                self.app.logger.error("Task %s (%s) failed permanently: %s",
+                                      claimed.id, claimed.name, claimed.last_error)
+            else:
+                claimed.status = 'PENDING'
+                claimed.run_at = datetime.utcnow() + timedelta(seconds=self.backoff(claimed.attempts))
+            db.session.commit()
+            return True
+        # The handler's own writes commit together with the status change
+        claimed.status = 'SUCCEEDED'
+        claimed.last_error = None
+        claimed.locked_by = claimed.locked_at = None
+        db.session.commit()
+        return True
+
+    def backoff(self, attempts):
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        # jitter keeps tasks that failed together from retrying together
+        return delay * random.uniform(0.5, 1.0)
+
+    def maintain(self):
+        """Requeue tasks whose worker vanished and drop old successes."""
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=self.lease_seconds)
+        stale = (Task.status == 'RUNNING', Task.locked_at < expired)
+        db.session.execute(update(Task).where(*stale, Task.attempts >= Task.max_attempts)
+                           .values(status='FAILED', locked_by=None, last_error='Lease expired'))
+        db.session.execute(update(Task).where(*stale)
+                           .values(status='PENDING', locked_by=None, run_at=now))
+        db.session.execute(delete(Task).where(
+            Task.status == 'SUCCEEDED', Task.updated_at < now - timedelta(hours=self.retention_hours)))
+        db.session.commit()
+
+    def run_pending(self, limit=None):
+        """Run due tasks on this thread until none are left (or `limit` ran)."""
+        count = 0
+        while (limit is None or count < limit) and self.run_one():
+            count += 1
+        return count
+
+
+def init_task_queue(app, start=True):
+    pool = TaskWorkerPool(
+        app,
+        workers=app.config.get('TASK_WORKERS', 2),
+        poll_seconds=app.config.get('TASK_POLL_SECONDS', 1.0),
+        lease_seconds=app.config.get('TASK_LEASE_SECONDS', 300),
+        backoff_seconds=app.config.get('TASK_BACKOFF_SECONDS', 2.0),
+        max_backoff_seconds=app.config.get('TASK_MAX_BACKOFF_SECONDS', 600),
+        retention_hours=app.config.get('TASK_RETENTION_HOURS', 72),
+    )
+    app.extensions['task_queue'] = pool
+    if start:
+        pool.start()
+    return pool
+
+
+def get_task_queue(app):
+    return app.extensions['task_queue']
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import deque
+
+
+class SlidingWindowLimiter:
+    """Counts hits per key over the last `window` seconds, in-process."""
+
+    def __init__(self, limit, window=60):
+        self.limit = limit
+        self.window = window
+        self._hits = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def hit(self, key):
+        """
+        Record an attempt for key. Returns 0 if it is allowed, otherwise the
+        number of seconds until the oldest counted attempt leaves the window.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self.window:
+                self._sweep(now)
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return max(1, int(hits[0] + self.window - now) + 1)
+            hits.append(now)
+            return 0
+
+    def _sweep(self, now):
+        # forget keys whose attempts are all outside the window
+        cutoff = now - self.window
+        for key in [k for k, v in self._hits.items() if not v or v[-1] <= cutoff]:
+            del self._hits[key]
+        self._last_sweep = now
+
+
+def init_auth_throttle(app):
+    window = app.config.get('AUTH_RATE_WINDOW_SECONDS', 60)
+    app.extensions['auth_throttle'] = {
+        'ip': SlidingWindowLimiter(app.config.get('AUTH_RATE_LIMIT_PER_IP', 30), window),
+        'email': SlidingWindowLimiter(app.config.get('AUTH_RATE_LIMIT_PER_EMAIL', 10), window),
+    }
+
+
+def check_auth_throttle(app, ip, email=None):
+    """Returns seconds to wait if the caller is over its limit, else 0."""
+    limiters = app.extensions['auth_throttle']
+    retry_after = limiters['ip'].hit(ip)
+    if not retry_after and email:
+        retry_after = limiters['email'].hit(email.strip().lower())
+    return retry_after
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+from utils.stamp import Stamp
+
+
+class RevocationCache:
+    """
+    In-process set of revoked JTIs with TTL eviction.
+    Entries live as long as the token they revoke could still be valid,
+    so a membership check is a dict lookup instead of a SQL query.
+
+    A "not revoked" answer is only given while the cache is known to be
+    current. Every logout bumps a Stamp shared by the workers on this host.
+    A worker that sees the stamp change pulls the new blocklist rows before
+    answering. Without a stamp file, unknown JTIs are left to the database.
+    """
+
+    def __init__(self, ttl=None, max_size=100000, stamp_path=None):
+        # ttl is a timedelta (or None when access tokens never expire)
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # jti -> revoked_at (naive UTC)
+        self._lock = threading.Lock()
+        self._last_id = 0
+        # newest revocation time dropped because the cache was full;
+        # tokens issued before it must be checked against the database
+        self._evicted_until = None
+        self.stamp_path = stamp_path
+        self._stamp_file = Stamp(stamp_path) if stamp_path else None
+        self._stamp = False  # stamp value covered by the last sync (none yet)
+        self._sync_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, jti, revoked_at=None):
+        revoked_at = revoked_at or datetime.utcnow()
+        with self._lock:
+            self._entries[jti] = revoked_at
+            self._entries.move_to_end(jti)
+            while len(self._entries) > self.max_size:
+                _, dropped_at = self._entries.popitem(last=False)
+                if self._evicted_until is None or dropped_at > self._evicted_until:
+                    self._evicted_until = dropped_at
+
+    def is_revoked(self, jti, issued_at=None):
+        """
+        Returns True/False when the cache can answer on its own and None when
+        the caller has to fall back to the database.
+        """
+        if jti in self._entries:
+            return True
+        evicted_until = self._evicted_until
+        if evicted_until is not None and (issued_at is None or issued_at <= evicted_until):
+            return None
+        if self._stamp_file is None or self._read_stamp() != self._stamp:
+            # another worker may have revoked it since the last sync
+            return None
+        return False
+
+    def _read_stamp(self):
+        return self._stamp_file.read() if self._stamp_file is not None else None
+
+    def announce(self):
+        """Tell the other workers a revocation was committed; call after the commit."""
+        if self._stamp_file is not None:
+            self._stamp_file.bump()
+
+    def sync_if_stale(self, db, model):
+        """Pull new blocklist rows if any worker announced one since the last sync."""
+        if self._stamp_file is not None and self._read_stamp() != self._stamp:
+            self._pull(model)
+
+    def purge(self, now=None):
+        """Drop entries whose tokens have expired anyway."""
+        if self.ttl is None:
+            return 0
+        cutoff = (now or datetime.utcnow()) - self.ttl
+        removed = 0
+        with self._lock:
+            while self._entries:
+                jti, revoked_at = next(iter(self._entries.items()))
+                if revoked_at >= cutoff:
+                    break
+                self._entries.popitem(last=False)
+                removed += 1
+            if self._evicted_until is not None and self._evicted_until < cutoff:
+                self._evicted_until = None
+        return removed
+
+    def _pull(self, model):
+        with self._sync_lock:
+            # read before querying: an announcement made during the query triggers another pull
+            stamp = self._read_stamp()
+            query = model.query.filter(model.id > self._last_id)
+            if self.ttl is not None:
+                query = query.filter(model.created_at >= datetime.utcnow() - self.ttl)
+            for row in query.order_by(model.id).all():
+                self.add(row.jti, row.created_at)
+                self._last_id = max(self._last_id, row.id)
+            self._stamp = stamp
+
+    def sync(self, db, model):
+        """Pull revocations written since the last sync (e.g. by other workers)."""
+        try:
+            self._pull(model)
+        finally:
+            db.session.remove()
+
+    def purge_table(self, db, model):
+        """Delete blocklist rows for tokens that can no longer be presented."""
+        if self.ttl is None:
+            return 0
+        cutoff = datetime.utcnow() - self.ttl
+        deleted = model.query.filter(model.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        db.session.remove()
+        return deleted
+
+
+def _token_ttl(app):
+    expires = app.config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+    if expires is False or expires is None:
+        return None
+    if not isinstance(expires, timedelta):
+        expires = timedelta(seconds=int(expires))
+    return expires
+
+
+def init_revocation_cache(app, db, model, start=True, warm=True):
+    """Create the cache, warm it from the blocklist table and start the purger."""
+    stamp_path = app.config.get('JWT_REVOCATION_STAMP_PATH')
+    if stamp_path is None:
+        os.makedirs(app.instance_path, exist_ok=True)
+        stamp_path = os.path.join(app.instance_path, 'revocations.stamp')
+    cache = RevocationCache(ttl=_token_ttl(app),
+                            max_size=app.config.get('JWT_REVOCATION_CACHE_SIZE', 100000),
+                            stamp_path=stamp_path or None)
+    app.extensions['revocation_cache'] = cache
+
+    if warm:
+        _warm(app, db, model, cache)
+    if start:
+        start_revocation_sync(app, db, model)
+    return cache
+
+
+def _warm(app, db, model, cache):
+    with app.app_context():
+        try:
+            cache.sync(db, model)
+        except SQLAlchemyError:
+            # e.g. before `flask init-db` has created the blocklist table
+            db.session.remove()
+            app.logger.warning("Revocation cache not warmed; is the database initialized?")
+
+
+def start_revocation_sync(app, db, model):
+    """Background purge/sync thread; pre-fork servers call this in each worker."""
+    interval = app.config.get('JWT_REVOCATION_SYNC_SECONDS', 30)
+    if interval:
+        thread = threading.Thread(target=_maintain, args=(app, db, model, get_revocation_cache(app), interval),
+                                  name='revocation-cache', daemon=True)
+        thread.start()
+
+
+def _maintain(app, db, model, cache, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                cache.purge_table(db, model)
+                cache.purge()
+                cache.sync(db, model)
+        except Exception:
+            app.logger.exception("Revocation cache maintenance failed")
+
+
+def get_revocation_cache(app):
+    return app.extensions.get('revocation_cache')
@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers:
+
+    cd backend
+    flask --app app init-db
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Background threads are started per worker by gunicorn.conf.py's post_fork
+hook. Servers without such a hook (e.g. uWSGI with lazy-apps) should call
+init_worker(app) themselves once the worker process exists.
+"""
+from app import create_app
+
+app = create_app(start_background=False)